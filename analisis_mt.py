@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Análisis estático de no-terminación de máquinas de Turing.
+
+Una ejecución solo termina al llegar a qacc o qrej, al leer un símbolo sin
+δ definida (rechazo implícito o DETENIDO) o al fallar por un movimiento
+inválido. Si desde un estado ningún camino del grafo de δ lleva a una de
+esas salidas, toda ejecución que entra en él sigue para siempre: el estado
+está **condenado**, sin importar la cinta.
+
+`estados_condenados` los calcula con una búsqueda hacia atrás desde las
+salidas en O(|δ|), y los motores, con `detect_loops`, cortan con LOOP
+(motivo MOTIVO_CONDENADO) en cuanto la máquina entra en uno. Como una δ
+indefinida siempre detiene la máquina, el conjunto no depende de
+`implicit_reject_on_undef`: solo cambia si la salida es qrej o DETENIDO.
+
+El informe también lista los estados de deriva (δ(q, blanco) = (q, x, R)),
+que no paran solo si la cabeza ya dejó atrás toda celda no-blanco.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from maquina_turing import MaquinaTuring, State
+from optimizar_mt import alcanzables
+
+
+@dataclass
+class InformeAnalisis:
+    """
+    Resultado del análisis estático de una MT.
+
+    Atributos:
+        condenados: Estados desde los que no se alcanza ninguna salida
+        alcanzados: Los condenados que se alcanzan desde q0
+        deriva: Estados que avanzan a la derecha sobre blancos para siempre
+            (una cinta)
+        q0_condenado: Si q0 está condenado (la MT no para con ninguna entrada)
+    """
+    condenados: List[State] = field(default_factory=list)
+    alcanzados: List[State] = field(default_factory=list)
+    deriva: List[State] = field(default_factory=list)
+    q0_condenado: bool = False
+
+    def resumen(self) -> str:
+        """Una línea con los totales."""
+        texto = (f"{len(self.condenados)} estados condenados "
+                 f"({len(self.alcanzados)} alcanzables desde q0), "
+                 f"{len(self.deriva)} de deriva")
+        if self.q0_condenado:
+            texto += "; q0 está condenado: la MT no para con ninguna entrada"
+        return texto
+
+    def detalle(self) -> List[str]:
+        """Líneas con los estados de cada clase."""
+        lineas = []
+        if self.condenados:
+            lineas.append(f"Condenados: {', '.join(self.condenados)}")
+        alcanzados = set(self.alcanzados)
+        inalcanzables = [q for q in self.condenados if q not in alcanzados]
+        if inalcanzables:
+            lineas.append(f"  (inalcanzables desde q0: {', '.join(inalcanzables)})")
+        if self.deriva:
+            lineas.append(f"Deriva a la derecha sobre blancos: {', '.join(self.deriva)}")
+        return lineas
+
+
+def estados_condenados(mt: MaquinaTuring) -> Set[State]:
+    """
+    Estados que no son de paro y desde los que ningún camino de δ llega a
+    qacc, qrej, una δ indefinida o un movimiento inválido.
+
+    Con k cintas, un estado tiene δ indefinida si le falta alguna de las
+    |Γ|^k combinaciones de símbolos leídos.
+    """
+    paro = (mt.qacc, mt.qrej)
+    validos = {'L', 'R', 'S'} if mt.allow_S else {'L', 'R'}
+    combinaciones = len(mt.Gamma) ** mt.cintas
+
+    definidas: Dict[State, int] = {}
+    predecesores: Dict[State, Set[State]] = {}
+    salidas = set(paro)
+    for (q, _), (qp, _, m) in mt.delta.items():
+        if q in paro:
+            continue
+        definidas[q] = definidas.get(q, 0) + 1
+        predecesores.setdefault(qp, set()).add(q)
+        movs = m if mt.cintas > 1 else (m,)
+        if any(x not in validos for x in movs):
+            salidas.add(q)
+    for q in mt.Q:
+        if definidas.get(q, 0) < combinaciones:
+            salidas.add(q)
+
+    # Hacia atrás: todo estado con un sucesor que llega a una salida también llega
+    llegan = set(salidas)
+    pendientes = list(salidas)
+    while pendientes:
+        for q in predecesores.get(pendientes.pop(), ()):
+            if q not in llegan:
+                llegan.add(q)
+                pendientes.append(q)
+    return mt.Q - llegan
+
+
+def analizar(mt: MaquinaTuring) -> InformeAnalisis:
+    """
+    Analiza mt sin ejecutarla.
+
+    Args:
+        mt: Máquina a analizar
+
+    Returns:
+        InformeAnalisis con los estados condenados y de deriva
+    """
+    condenados = estados_condenados(mt)
+    vivos = set(alcanzables(mt))
+    return InformeAnalisis(
+        condenados=sorted(condenados),
+        alcanzados=sorted(condenados & vivos),
+        deriva=sorted(mt._estados_deriva()),
+        q0_condenado=mt.q0 in condenados,
+    )
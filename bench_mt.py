@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks reproducible para el simulador, el parser y el formateo.
+
+Las cargas se construyen localmente (sin red ni archivos externos):
+    - Máquinas de MT2 (palíndromos, suma, multiplicación por 2) sobre
+      entradas de longitud creciente
+    - Máquinas generadas: el busy beaver de 5 estados (47 millones de
+      pasos) y un contador binario que no para
+    - Especificaciones sintéticas de 10^4 y 10^5 transiciones para el parser
+
+Por cada máquina se mide: pasos/s sin traza (motor compilado, código
+generado por codegen_mt y motor de referencia), configuraciones/s con traza, el tiempo de formateo (traza menos
+el mismo bucle sin formatear) y la memoria pico de la traza (tracemalloc).
+El motor de referencia y la traza se cortan en un tope de pasos para que
+las cargas grandes no tarden minutos ni escriban gigabytes.
+Por cada especificación sintética: transiciones/s y MB/s del parser.
+
+Uso:
+    python bench_mt.py -o base.json                 # medir y guardar
+    python bench_mt.py --baseline base.json         # comparar (sale con 1 si empeora)
+    python bench_mt.py --quick --only palindromo    # subconjunto rápido
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from maquina_turing import MaquinaTuring
+from parser_mt import parse_spec
+
+VERSION = 1
+
+# Regresión: empeorar más que este margen relativo
+UMBRAL = 0.15
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+class _Nulo:
+    """Flujo de salida que solo cuenta caracteres."""
+
+    __slots__ = ('n',)
+
+    def __init__(self):
+        self.n = 0
+
+    def write(self, s: str):
+        self.n += len(s)
+
+
+def _mejor(repeticiones: int, f: Callable[[], object]):
+    """Ejecuta f varias veces; devuelve (mejor tiempo, último resultado)."""
+    mejor, res = float('inf'), None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        res = f()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, res
+
+
+# ---------------------------------------------------------------------------
+# Cargas de trabajo
+# ---------------------------------------------------------------------------
+
+def _mt2(nombre: str) -> MaquinaTuring:
+    mt, _ = parse_spec(os.path.join(DIRECTORIO, 'MT2', nombre))
+    return mt
+
+
+def busy_beaver_5() -> MaquinaTuring:
+    """
+    Campeón de 5 estados (Marxen-Buntrock), 47.176.870 pasos.
+
+    La cinta tiene tope izquierdo y la cabeza empieza en él, así que un
+    preludio (estados P, P2) borra la entrada 'm'^k y arranca el campeón en
+    la celda k, dejándole lugar para avanzar a la izquierda.
+    """
+    t = {
+        ('P', 'm'): ('P', '0', 'R'), ('P', '0'): ('P2', '0', 'L'),
+        ('P2', '0'): ('A', '0', 'R'),
+        ('A', '0'): ('B', '1', 'R'), ('A', '1'): ('C', '1', 'L'),
+        ('B', '0'): ('C', '1', 'R'), ('B', '1'): ('B', '1', 'R'),
+        ('C', '0'): ('D', '1', 'R'), ('C', '1'): ('E', '0', 'L'),
+        ('D', '0'): ('A', '1', 'L'), ('D', '1'): ('D', '1', 'L'),
+        ('E', '0'): ('H', '1', 'R'), ('E', '1'): ('A', '0', 'L'),
+    }
+    return MaquinaTuring({'P', 'P2', 'A', 'B', 'C', 'D', 'E', 'H', 'R'}, {'m'},
+                         {'0', '1', 'm'}, '0', 'P', 'H', 'R', t)
+
+
+def contador_binario() -> MaquinaTuring:
+    """Incrementa sin fin un contador binario (bit menos significativo a la izquierda)."""
+    t = {
+        ('q0', '$'): ('inc', '$', 'R'),
+        ('inc', '1'): ('inc', '0', 'R'),
+        ('inc', '0'): ('ret', '1', 'L'),
+        ('inc', '⊔'): ('ret', '1', 'L'),
+        ('ret', '0'): ('ret', '0', 'L'),
+        ('ret', '1'): ('ret', '1', 'L'),
+        ('ret', '$'): ('inc', '$', 'R'),
+    }
+    return MaquinaTuring({'q0', 'inc', 'ret', 'qacc', 'qrej'}, {'$'}, {'$', '0', '1', '⊔'},
+                         '⊔', 'q0', 'qacc', 'qrej', t)
+
+
+def cargas(rapido: bool) -> List[dict]:
+    """
+    Máquinas y entradas a medir: nombre, mt, w, max_steps (para el motor
+    compilado), tope (pasos para el motor de referencia y la traza) y
+    traza (False si la ventana de cada configuración es demasiado ancha).
+    """
+    rng = random.Random(12345)
+    tope = 50_000 if rapido else 100_000
+    lista = []
+    pal = _mt2('mt_palindromo.txt')
+    for n in ((300, 1000) if rapido else (1000, 3000, 10000)):
+        mitad = ''.join(rng.choice('ab') for _ in range(n // 2))
+        lista.append(dict(nombre=f'palindromo_{n}', mt=pal, w=mitad + mitad[::-1]))
+    suma = _mt2('mt_suma.txt')
+    for n in ((50, 150) if rapido else (100, 400, 1000)):
+        lista.append(dict(nombre=f'suma_{n}', mt=suma, w='1' * n + '#' + '1' * n))
+    mult = _mt2('mt_mult2.txt')
+    for n in ((100, 300) if rapido else (300, 1000, 3000)):
+        w = '1' + ''.join(rng.choice('01') for _ in range(n - 1))
+        lista.append(dict(nombre=f'mult2_{n}', mt=mult, w=w))
+    lista.append(dict(nombre='busy_beaver_5', mt=busy_beaver_5(), w='m' * 13000,
+                      max_steps=2_000_000 if rapido else None, traza=False))
+    lista.append(dict(nombre='contador_binario', mt=contador_binario(), w='$',
+                      max_steps=2_000_000 if rapido else 20_000_000))
+    for carga in lista:
+        carga.setdefault('max_steps', None)
+        carga.setdefault('traza', True)
+        carga['tope'] = tope
+    return lista
+
+
+def spec_sintetica(n_transiciones: int, path: str):
+    """Escribe una especificación válida con aproximadamente n transiciones."""
+    rng = random.Random(n_transiciones)
+    simbolos = [chr(c) for c in range(ord('a'), ord('a') + 10)] + ['⊔']
+    n_estados = max(1, n_transiciones // len(simbolos))
+    estados = [f's{i}' for i in range(n_estados)]
+    lineas = [
+        "Q = {" + ", ".join(estados + ['qacc', 'qrej']) + "}",
+        "Sigma = {a, b}",
+        "Gamma = {" + ", ".join(simbolos) + "}",
+        "blank = ⊔",
+        "q0 = s0",
+        "qaccept = qacc",
+        "qreject = qrej",
+        "",
+        "delta:",
+    ]
+    for q in estados:
+        for a in simbolos:
+            qp = rng.choice(estados) if rng.random() < 0.99 else 'qacc'
+            lineas.append(f"({q}, {a}) -> ({qp}, {rng.choice(simbolos)}, {rng.choice('LR')})")
+    lineas += ["", "input = abab"]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lineas) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Mediciones
+# ---------------------------------------------------------------------------
+
+def medir_maquina(carga: dict, repeticiones: int) -> Dict[str, float]:
+    mt, w, max_steps = carga['mt'], carga['w'], carga['max_steps']
+    tope = carga['tope'] if max_steps is None else min(max_steps, carga['tope'])
+    comp = mt.compilar()
+
+    t_run, res = _mejor(repeticiones, lambda: mt.run(w, max_steps, detect_loops=False))
+    # La primera llamada genera y compila el código; la caché deja fuera ese costo
+    t_gen, gen = _mejor(repeticiones, lambda: mt.run(w, max_steps, engine='generado',
+                                                     detect_loops=False))
+    t_ref, ref = _mejor(repeticiones, lambda: mt.run(w, tope, engine='referencia',
+                                                     detect_loops=False))
+    metricas = {
+        'pasos': res.pasos,
+        'run_pasos_por_s': res.pasos / t_run,
+        'gen_pasos_por_s': gen.pasos / t_gen,
+        'ref_pasos_por_s': ref.pasos / t_ref,
+    }
+    if not carga['traza']:
+        return metricas
+
+    def traza():
+        out = _Nulo()
+        mt.simulate(w, tope, out=out)
+        return out.n
+    t_traza, n_bytes = _mejor(repeticiones, traza)
+    # El mismo bucle compilado, sin formatear ni acelerar barridos
+    t_plano, _ = _mejor(repeticiones, lambda: comp.run(w, tope, True, sweep=False,
+                                                       detect_loops=False))
+
+    tracemalloc.start()
+    traza()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metricas.update({
+        'traza_configs_por_s': (ref.pasos + 1) / t_traza,
+        'traza_bytes': n_bytes,
+        'formato_s': max(0.0, t_traza - t_plano),
+        'memoria_pico_kb': pico / 1024,
+    })
+    return metricas
+
+
+def medir_parser(n_transiciones: int, repeticiones: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'spec.txt')
+        spec_sintetica(n_transiciones, path)
+        tam = os.path.getsize(path)
+        t, (mt, _) = _mejor(repeticiones, lambda: parse_spec(path))
+    return {
+        'transiciones': len(mt.delta),
+        'parse_s': t,
+        'parse_transiciones_por_s': len(mt.delta) / t,
+        'parse_mb_por_s': tam / t / 1e6,
+    }
+
+
+def ejecutar(rapido: bool, repeticiones: int, solo: Optional[List[str]] = None) -> dict:
+    """Corre la suite y devuelve el resultado serializable a JSON."""
+    resultados = {}
+
+    def elegido(nombre):
+        return not solo or any(s in nombre for s in solo)
+
+    for carga in cargas(rapido):
+        if elegido(carga['nombre']):
+            print(f"  {carga['nombre']}...", file=sys.stderr, flush=True)
+            resultados[carga['nombre']] = medir_maquina(carga, repeticiones)
+    for n in ((10_000,) if rapido else (10_000, 100_000)):
+        nombre = f'parser_{n}'
+        if elegido(nombre):
+            print(f"  {nombre}...", file=sys.stderr, flush=True)
+            resultados[nombre] = medir_parser(n, repeticiones)
+
+    return {
+        'version': VERSION,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'rapido': rapido,
+        'resultados': resultados,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Comparación con una línea base
+# ---------------------------------------------------------------------------
+
+def _sentido(metrica: str) -> int:
+    """+1 si más es mejor, -1 si menos es mejor, 0 si es informativa."""
+    if metrica.endswith('_por_s'):
+        return 1
+    if metrica in ('formato_s', 'parse_s', 'memoria_pico_kb'):
+        return -1
+    return 0
+
+
+def comparar(actual: dict, base: dict, umbral: float = UMBRAL) -> List[str]:
+    """
+    Compara dos resultados de `ejecutar`.
+
+    Returns:
+        Lista de regresiones ("carga.métrica: base -> actual (cambio)")
+    """
+    regresiones = []
+    print(f"\n  {'carga.métrica':<44} {'base':>12} {'actual':>12} {'cambio':>8}")
+    for nombre, metricas in actual['resultados'].items():
+        previas = base['resultados'].get(nombre)
+        if previas is None:
+            continue
+        for m, v in metricas.items():
+            s = _sentido(m)
+            b = previas.get(m)
+            if not s or not b:
+                continue
+            cambio = (v - b) / b
+            marca = ''
+            if s * cambio < -umbral:
+                marca = '  << REGRESIÓN'
+                regresiones.append(f"{nombre}.{m}: {b:.4g} -> {v:.4g} ({cambio:+.1%})")
+            print(f"  {nombre + '.' + m:<44} {b:>12.4g} {v:>12.4g} {cambio:>+8.1%}{marca}")
+    return regresiones
+
+
+def mostrar(resultado: dict):
+    for nombre, metricas in resultado['resultados'].items():
+        print(f"\n  {nombre}")
+        for m, v in metricas.items():
+            print(f"    {m:<28} {v:,.4g}" if isinstance(v, float) else f"    {m:<28} {v:,}")
+
+
+def main():
+    """Punto de entrada de la suite."""
+    parser = argparse.ArgumentParser(description='Benchmarks del simulador de MT.')
+    parser.add_argument('-o', '--out', metavar='ARCHIVO',
+                        help='Guardar los resultados en JSON.')
+    parser.add_argument('--baseline', metavar='ARCHIVO',
+                        help='Comparar contra resultados guardados; sale con 1 si hay regresiones.')
+    parser.add_argument('--threshold', type=float, default=UMBRAL,
+                        help=f'Margen relativo tolerado antes de marcar regresión (default: {UMBRAL}).')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Repeticiones por medición; se toma la mejor (default: 3).')
+    parser.add_argument('--quick', action='store_true',
+                        help='Cargas más chicas (para iterar rápido).')
+    parser.add_argument('--only', nargs='+', metavar='NOMBRE',
+                        help='Medir solo las cargas cuyo nombre contenga alguno de estos textos.')
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.quick, args.repeat, args.only)
+    mostrar(resultado)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados escritos en: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        if base.get('rapido') != resultado['rapido']:
+            print("\n[Aviso] La línea base se midió con otro tamaño de cargas (--quick).")
+        regresiones = comparar(resultado, base, args.threshold)
+        if regresiones:
+            print(f"\n[X] {len(regresiones)} regresión(es) sobre {args.threshold:.0%}:")
+            for r in regresiones:
+                print(f"    {r}")
+            return 1
+        print(f"\n[OK] Sin regresiones sobre {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
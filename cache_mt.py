@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché en disco de especificaciones ya parseadas, validadas y compiladas.
+
+La clave es el SHA-256 de los bytes del archivo de especificación, la
+bandera allow_S y el código fuente de los módulos que construyen la
+máquina (parser_mt, maquina_turing, motor_mt, motor_multicinta,
+analisis_mt, no_determinista_mt). Cambiar la especificación o actualizar
+el simulador produce otra clave, así que una entrada nunca se usa con
+datos viejos. Una entrada ilegible se ignora y se reescribe.
+
+El nombre de cada entrada empieza con una huella de la ruta del archivo:
+al guardar una entrada nueva se borran las anteriores de la misma ruta
+(que quedaron viejas). Además el directorio se poda como una LRU: cada
+acierto actualiza la fecha de la entrada y, al pasar de MAX_ENTRADAS
+entradas o MAX_BYTES bytes, se borran las usadas hace más tiempo.
+
+Cada entrada es un pickle de (MaquinaTuring compilada, entrada). Como
+cargar un pickle puede ejecutar código, el directorio de caché debe ser
+solo del usuario (por defecto ~/.cache/mt_sim, o $MT_CACHE_DIR).
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Optional, Tuple
+
+import analisis_mt
+import maquina_turing
+import motor_mt
+import motor_multicinta
+import no_determinista_mt
+import parser_mt
+from maquina_turing import MaquinaTuring
+
+# Subir si cambia el contenido de las entradas
+VERSION = 1
+
+# Tope de entradas y de bytes en el directorio de la caché
+MAX_ENTRADAS = 64
+MAX_BYTES = 256 << 20
+
+_SUFIJO = '.pickle'
+
+_version_codigo: Optional[bytes] = None
+
+
+def directorio_cache() -> str:
+    """Directorio de la caché ($MT_CACHE_DIR, o mt_sim en la caché del usuario)."""
+    d = os.environ.get('MT_CACHE_DIR')
+    if d:
+        return d
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'mt_sim')
+
+
+def _codigo() -> bytes:
+    """Huella del código que construye la máquina (se calcula una vez)."""
+    global _version_codigo
+    if _version_codigo is None:
+        h = hashlib.sha256(b'%d' % VERSION)
+        for modulo in (parser_mt, maquina_turing, motor_mt, motor_multicinta, analisis_mt,
+                       no_determinista_mt):
+            with open(modulo.__file__, 'rb') as f:
+                h.update(f.read())
+        _version_codigo = h.digest()
+    return _version_codigo
+
+
+def clave_cache(datos: bytes, allow_S: bool) -> str:
+    """Clave de una especificación: contenido, allow_S y versión del código."""
+    h = hashlib.sha256(_codigo())
+    h.update(b'S' if allow_S else b'-')
+    h.update(datos)
+    return h.hexdigest()
+
+
+def cargar_spec(path: str,
+                allow_S: bool = False,
+                usar_cache: bool = True,
+                directorio: Optional[str] = None) -> Tuple[MaquinaTuring, str]:
+    """
+    Como `parse_spec`, pero reutiliza la máquina ya construida si el mismo
+    archivo (mismo contenido) se cargó antes.
+
+    Args:
+        path: Ruta al archivo de especificación
+        allow_S: Si True, permite movimiento S (quedarse)
+        usar_cache: Si False, parsea siempre y no toca la caché
+        directorio: Directorio de la caché (default: `directorio_cache()`)
+
+    Returns:
+        Tupla (MaquinaTuring, cadena_entrada)
+
+    Raises:
+        ValueError: Si hay errores en la especificación
+    """
+    if not usar_cache:
+        return parser_mt.parse_spec(path, allow_S=allow_S)
+
+    with open(path, 'rb') as f:
+        datos = f.read()
+    directorio = directorio or directorio_cache()
+    prefijo = _prefijo(path)
+    entrada = os.path.join(directorio, prefijo + clave_cache(datos, allow_S) + _SUFIJO)
+
+    try:
+        with open(entrada, 'rb') as f:
+            mt, w = pickle.load(f)
+        if isinstance(mt, MaquinaTuring) and isinstance(w, str):
+            try:
+                os.utime(entrada)
+            except OSError:
+                pass
+            return mt, w
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # Entrada corrupta o de otra versión de Python: se reconstruye
+        pass
+
+    mt, w = parser_mt.parse_texto(datos.decode('utf-8'), allow_S=allow_S)
+    if len(mt.Gamma) <= 256:
+        mt.compilar()
+    if _guardar(entrada, (mt, w)):
+        _podar(directorio, entrada, prefijo)
+    return mt, w
+
+
+def _prefijo(path: str) -> str:
+    """Comienzo del nombre de las entradas de la ruta `path`."""
+    ruta = os.path.realpath(path).encode('utf-8', 'surrogatepass')
+    return hashlib.sha256(ruta).hexdigest()[:16] + '-'
+
+
+def _guardar(entrada: str, valor) -> bool:
+    """
+    Escribe la entrada de forma atómica; los errores de disco no son fatales.
+
+    Returns:
+        True si se escribió
+    """
+    tmp = f"{entrada}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(entrada), mode=0o700, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entrada)
+        return True
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def _podar(directorio: str, nueva: str, prefijo: str) -> None:
+    """
+    Borra las entradas viejas de la misma ruta que `nueva` y, si el
+    directorio pasa de MAX_ENTRADAS o MAX_BYTES, las usadas hace más tiempo.
+    """
+    entradas = []
+    try:
+        with os.scandir(directorio) as it:
+            for e in it:
+                if not e.name.endswith(_SUFIJO) or e.path == nueva:
+                    continue
+                try:
+                    if e.name.startswith(prefijo):
+                        os.remove(e.path)
+                    else:
+                        st = e.stat()
+                        entradas.append((st.st_mtime, st.st_size, e.path))
+                except OSError:
+                    pass
+        total = os.path.getsize(nueva)
+    except OSError:
+        return
+    # La recién escrita se conserva siempre; después, de la más reciente a la más vieja
+    entradas.sort(reverse=True)
+    for k, (_, tam, ruta) in enumerate(entradas, 2):
+        total += tam
+        if k > MAX_ENTRADAS or total > MAX_BYTES:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
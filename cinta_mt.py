@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cinta paginada del motor de referencia.
+
+Las celdas se guardan en páginas de PAGINA celdas que se crean al escribir
+por primera vez en ellas. Leer una celda nunca escrita devuelve el blanco
+sin reservar nada, así que una máquina que solo avanza sobre blancos no
+gasta memoria. Escribir un blanco en una página inexistente tampoco.
+
+Cada celda guarda el índice de su símbolo en Γ (el blanco es 0) en un
+`bytearray`: un byte por celda, más el relleno de la página. Si |Γ| > 256,
+las páginas son `array('H')` (dos bytes por celda). Las páginas se indexan
+por número de página, incluidos los negativos, así que un left_boundary
+negativo no reserva nada hasta que se escribe allí.
+
+La extensión no-blanco [lo, hi] se mantiene al escribir. `texto` y
+`simbolos` decodifican un tramo página por página.
+"""
+
+from array import array
+from codecs import charmap_decode as _charmap_decode
+from typing import Dict, Iterable, List, Sequence
+
+# Celdas por página (potencia de 2)
+BITS_PAGINA = 12
+PAGINA = 1 << BITS_PAGINA
+MASCARA_PAGINA = PAGINA - 1
+
+
+class CintaPaginada:
+    """
+    Cinta infinita en ambas direcciones sobre páginas reservadas a demanda.
+
+    Args:
+        gamma: Alfabeto de cinta
+        blank: Símbolo blanco (debe estar en gamma)
+        w: Palabra inicial, en las celdas 0..len(w)-1
+    """
+
+    __slots__ = ('blank', 'alfabeto', 'codigo', 'paginas', 'lo', 'hi',
+                 '_bytes', '_tabla_dec')
+
+    def __init__(self, gamma: Iterable[str], blank: str, w: str = ''):
+        self.blank = blank
+        self.alfabeto: List[str] = [blank] + sorted(s for s in set(gamma) if s != blank)
+        self.codigo: Dict[str, int] = {s: i for i, s in enumerate(self.alfabeto)}
+        self._bytes = len(self.alfabeto) <= 256
+        # Con símbolos de un carácter, un tramo se decodifica con una tabla charmap
+        if self._bytes and all(len(s) == 1 for s in self.alfabeto):
+            self._tabla_dec = ''.join(self.alfabeto).ljust(256, '\ufffe')
+        else:
+            self._tabla_dec = None
+        self.paginas: Dict[int, Sequence[int]] = {}
+        # Extensión no-blanco (lo > hi indica cinta en blanco)
+        self.lo, self.hi = 1, 0
+        if w:
+            self.cargar(0, w)
+
+    def pagina(self, n: int):
+        """
+        Página n, creándola si no existe.
+
+        Para bucles que leen y escriben índices directamente en las páginas
+        (celda i en `pagina(i >> BITS_PAGINA)[i & MASCARA_PAGINA]`); al
+        terminar deben llamar a `recalcular`.
+        """
+        pag = self.paginas.get(n)
+        if pag is None:
+            pag = self.paginas[n] = (bytearray(PAGINA) if self._bytes
+                                     else array('H', bytes(2 * PAGINA)))
+        return pag
+
+    def recalcular(self):
+        """Recalcula la extensión no-blanco recorriendo las páginas."""
+        orden = sorted(self.paginas)
+        self.lo, self.hi = 1, 0
+        for n in orden:
+            lo = self._primero(n << BITS_PAGINA, (n << BITS_PAGINA) + MASCARA_PAGINA)
+            if lo is not None:
+                break
+        else:
+            return
+        for n in reversed(orden):
+            inicio = n << BITS_PAGINA
+            if self._primero(inicio, inicio + MASCARA_PAGINA) is not None:
+                self.lo, self.hi = lo, self._ultimo(inicio, inicio + MASCARA_PAGINA)
+                return
+
+    def cargar(self, inicio: int, simbolos: Sequence[str]):
+        """Escribe `simbolos` desde la celda `inicio` (cinta antes en blanco)."""
+        codigo = self.codigo
+        codigos = [codigo[s] for s in simbolos]
+        i = inicio
+        k = 0
+        while k < len(codigos):
+            n = i >> BITS_PAGINA
+            off = i & MASCARA_PAGINA
+            tramo = codigos[k:k + PAGINA - off]
+            pag = self.pagina(n)
+            pag[off:off + len(tramo)] = (bytes(tramo) if self._bytes
+                                         else array('H', tramo))
+            i += len(tramo)
+            k += len(tramo)
+        no_blancos = [j for j, c in enumerate(codigos) if c]
+        if no_blancos:
+            self.lo = inicio + no_blancos[0]
+            self.hi = inicio + no_blancos[-1]
+
+    def leer(self, i: int) -> str:
+        """Símbolo de la celda i."""
+        pag = self.paginas.get(i >> BITS_PAGINA)
+        if pag is None:
+            return self.blank
+        return self.alfabeto[pag[i & MASCARA_PAGINA]]
+
+    def escribir(self, i: int, s: str):
+        """Escribe s en la celda i actualizando la extensión no-blanco."""
+        c = self.codigo[s]
+        n = i >> BITS_PAGINA
+        pag = self.paginas.get(n)
+        if pag is None:
+            if not c:
+                return
+            pag = self.pagina(n)
+        pag[i & MASCARA_PAGINA] = c
+        if c:
+            if self.lo > self.hi:
+                self.lo = self.hi = i
+            elif i < self.lo:
+                self.lo = i
+            elif i > self.hi:
+                self.hi = i
+            return
+        # Se borró una celda: encoger solo si era un extremo
+        if i == self.lo:
+            lo = self._primero(i + 1, self.hi)
+            if lo is None:
+                self.lo, self.hi = 1, 0
+            else:
+                self.lo = lo
+        elif i == self.hi:
+            self.hi = self._ultimo(self.lo, i - 1)
+
+    def _primero(self, desde: int, hasta: int):
+        """Primera celda no-blanco en [desde, hasta], o None."""
+        i = desde
+        while i <= hasta:
+            n = i >> BITS_PAGINA
+            off = i & MASCARA_PAGINA
+            fin = min(PAGINA, off + hasta - i + 1)
+            pag = self.paginas.get(n)
+            if pag is not None:
+                tramo = pag[off:fin]
+                if self._bytes:
+                    k = len(tramo) - len(tramo.lstrip(b'\x00'))
+                else:
+                    k = next((j for j, c in enumerate(tramo) if c), len(tramo))
+                if k < len(tramo):
+                    return i + k
+            i += fin - off
+        return None
+
+    def _ultimo(self, desde: int, hasta: int) -> int:
+        """Última celda no-blanco en [desde, hasta] (hay al menos una: `desde`)."""
+        i = hasta
+        while i >= desde:
+            n = i >> BITS_PAGINA
+            off = i & MASCARA_PAGINA
+            ini = max(0, off - (i - desde))
+            pag = self.paginas.get(n)
+            if pag is not None:
+                tramo = pag[ini:off + 1]
+                if self._bytes:
+                    k = len(tramo.rstrip(b'\x00'))
+                else:
+                    k = next((j + 1 for j in range(len(tramo) - 1, -1, -1) if tramo[j]), 0)
+                if k:
+                    return i - (off - ini) + k - 1
+            i -= off - ini + 1
+        return desde
+
+    def _codigos(self, L: int, R: int):
+        """Índices de símbolo de las celdas L..R, página por página."""
+        partes = []
+        i = L
+        while i <= R:
+            n = i >> BITS_PAGINA
+            off = i & MASCARA_PAGINA
+            fin = min(PAGINA, off + R - i + 1)
+            pag = self.paginas.get(n)
+            if pag is None:
+                partes.append(bytes(fin - off) if self._bytes
+                              else array('H', bytes(2 * (fin - off))))
+            else:
+                partes.append(pag[off:fin])
+            i += fin - off
+        if self._bytes:
+            return b''.join(partes)
+        return array('H', [c for p in partes for c in p])
+
+    def texto(self, L: int, R: int) -> str:
+        """Celdas L..R concatenadas ('' si L > R)."""
+        if L > R:
+            return ''
+        codigos = self._codigos(L, R)
+        if self._tabla_dec is not None:
+            return _charmap_decode(codigos, 'strict', self._tabla_dec)[0]
+        alfabeto = self.alfabeto
+        return ''.join([alfabeto[c] for c in codigos])
+
+    def simbolos(self, L: int, R: int) -> List[str]:
+        """Símbolos de las celdas L..R."""
+        if L > R:
+            return []
+        if self._tabla_dec is not None:
+            return list(self.texto(L, R))
+        alfabeto = self.alfabeto
+        return [alfabeto[c] for c in self._codigos(L, R)]
+
+    def foto(self) -> tuple:
+        """Contenido no-blanco normalizado (para comparar configuraciones)."""
+        if self.lo > self.hi:
+            return ()
+        return (self.lo,) + tuple(self.simbolos(self.lo, self.hi))
+
+    def memoria(self) -> int:
+        """Bytes reservados en páginas."""
+        return len(self.paginas) * PAGINA * (1 if self._bytes else 2)
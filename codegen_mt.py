@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generación de código Python especializado para una MaquinaTuring.
+
+En lugar de interpretar la tabla de motor_mt, se genera el texto de una
+función con un bloque por estado y se compila con `compile()`/`exec`:
+
+    - El estado actual es la posición en el código: cada bloque es un bucle
+      que lee la celda y ramifica por símbolo con constantes, así que las
+      transiciones a sí mismo no vuelven a pasar por el despacho de estados
+    - Escritura, movimiento y estado siguiente van en línea (sin tabla, sin
+      escribir cuando el símbolo no cambia)
+    - Los autolazos de barrido (q, a) -> (q, a, R|L) se cruzan de una vez,
+      con la misma búsqueda sobre la cinta que `MaquinaCompilada._run_barridos`
+    - El despacho entre estados es un árbol binario de comparaciones
+
+La función sigue exactamente la semántica de `_run_barridos` (incluida la
+detección de ciclos), así que el resultado es idéntico al de `run` con el
+motor compilado. Las funciones generadas se guardan por huella de la MT.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from maquina_turing import (MaquinaTuring, ResultadoMT, MOTIVO_CICLO, MOTIVO_CONDENADO,
+                            MOTIVO_DERIVA, MOTIVO_MAX_STEPS)
+from motor_mt import (MaquinaCompilada, MOV_L, MOV_R, MOV_S, MOV_INVALIDO, _CONDENADO,
+                      _MOV_BARRIDO_R, _MOV_BARRIDO_L, _SIN_LIMITE, _SHIFT_ESTADO,
+                      _SHIFT_SIMBOLO)
+
+# Más transiciones que esto no se especializan: el código generado crece
+# con δ y compilarlo costaría más de lo que ahorra
+MAX_TRANSICIONES = 20_000
+
+# Funciones generadas por (huella, detect_loops)
+_CACHE: Dict[Tuple[str, bool], Callable] = {}
+
+
+class _Emisor:
+    """Acumula líneas de código con su sangría."""
+
+    def __init__(self):
+        self.lineas: List[str] = []
+        self.nivel = 0
+
+    def __call__(self, linea: str):
+        self.lineas.append('    ' * self.nivel + linea)
+
+    def texto(self) -> str:
+        return '\n'.join(self.lineas) + '\n'
+
+
+def generar_fuente(comp: MaquinaCompilada, detect_loops: bool) -> str:
+    """
+    Texto de la función especializada para la MT compilada `comp`.
+
+    La función es `ejecutar(tape, lbp, fin_entrada, limit, implicit)` y
+    devuelve (q, p, steps, motivo, pmax) con q como índice de estado; la
+    cinta se modifica (y amplía) en su lugar.
+
+    Args:
+        comp: Máquina compilada
+        detect_loops: Si True, incluye la detección de ciclos, de deriva y
+            de estados condenados
+    """
+    G = comp.G
+    paro = [q for q in range(len(comp.estados)) if comp.paro[q]]
+    condenados = ({q for q in range(len(comp.estados)) if comp.paro_condenado[q] == _CONDENADO}
+                  if detect_loops else set())
+    deriva = {row // G for row in comp.filas_deriva} if detect_loops else set()
+    e = _Emisor()
+
+    e('def ejecutar(tape, lbp, fin_entrada, limit, implicit):')
+    e.nivel += 1
+    e('size = len(tape)')
+    e('p = pmax = lbp')
+    e('steps = 0')
+    e(f'q = {comp.q0}')
+    e('motivo = None')
+    e('parar = False')
+    if detect_loops:
+        e('obs = 0')
+        e('prox = 1')
+        e('gp = gq = -1')
+        e('gc = None')
+    e('while not parar and steps < limit:')
+    e.nivel += 1
+    _despacho(e, comp, list(range(len(comp.estados))), set(paro), condenados, deriva,
+              detect_loops)
+    e.nivel -= 1
+    e('if motivo is None and steps >= limit:')
+    e(f'    motivo = {MOTIVO_MAX_STEPS!r}')
+    e('return q, p, steps, motivo, pmax')
+    return e.texto()
+
+
+def _despacho(e: _Emisor, comp: MaquinaCompilada, estados: List[int], paro: set,
+              condenados: set, deriva: set, detect_loops: bool):
+    """Árbol binario de `if q < k` hasta llegar al bloque de cada estado."""
+    if len(estados) == 1:
+        q = estados[0]
+        e(f'# {comp.estados[q]}')
+        if q in paro:
+            e('parar = True')
+        elif q in condenados:
+            e(f'motivo = {MOTIVO_CONDENADO!r}')
+            e('parar = True')
+        else:
+            _bloque(e, comp, q, deriva, detect_loops)
+        return
+    mitad = len(estados) // 2
+    e(f'if q < {estados[mitad]}:')
+    e.nivel += 1
+    _despacho(e, comp, estados[:mitad], paro, condenados, deriva, detect_loops)
+    e.nivel -= 1
+    e('else:')
+    e.nivel += 1
+    _despacho(e, comp, estados[mitad:], paro, condenados, deriva, detect_loops)
+    e.nivel -= 1
+
+
+def _bloque(e: _Emisor, comp: MaquinaCompilada, q: int, deriva: set, detect_loops: bool):
+    """Bucle del estado q: una iteración de `_run_barridos` por vuelta."""
+    G = comp.G
+    row = q * G
+    e('while steps < limit:')
+    e.nivel += 1
+    if detect_loops:
+        # Esquema de Brent, igual que al principio de cada iteración de _run_barridos
+        e(f"if p == gp and gq == {q} and tape.rstrip(b'\\x00') == gc:")
+        e(f'    motivo = {MOTIVO_CICLO!r}')
+        e('    parar = True')
+        e('    break')
+        e('obs += 1')
+        e('if obs >= prox:')
+        e('    prox <<= 1')
+        e(f"    gp, gq, gc = p, {q}, tape.rstrip(b'\\x00')")
+    e('a = tape[p]')
+
+    definidas = [a for a in range(G) if comp.tabla[row + a] >= 0]
+    todas = len(definidas) == G
+    for i, a in enumerate(definidas):
+        if i == 0:
+            e(f'if a == {a}:')
+        elif todas and i == len(definidas) - 1:
+            e('else:')
+        else:
+            e(f'elif a == {a}:')
+        e.nivel += 1
+        _transicion(e, comp, q, a, deriva, detect_loops)
+        e.nivel -= 1
+    if not todas:
+        if definidas:
+            e('else:')
+            e.nivel += 1
+        e('if implicit:')
+        e(f'    q = {comp.qrej}')
+        e('parar = True')
+        e('break')
+        if definidas:
+            e.nivel -= 1
+    e.nivel -= 1
+
+
+def _transicion(e: _Emisor, comp: MaquinaCompilada, q: int, a: int, deriva: set,
+                detect_loops: bool):
+    """Código de δ(q, a) dentro del bucle del estado q."""
+    G = comp.G
+    i = q * G + a
+    ent = comp.tabla[i]
+    qp = ent >> _SHIFT_ESTADO
+    b = (ent >> _SHIFT_SIMBOLO) & 0xFF
+    m = comp.mov_barrido[i]
+
+    if m == _MOV_BARRIDO_R:
+        e(f'fin = buscar_{q}(tape, p)')
+        if q in deriva and comp.mov_barrido[q * G] == _MOV_BARRIDO_R:
+            # El blanco continúa el barrido y no hay nada que lo corte
+            e('if fin is None:')
+            e(f'    motivo = {MOTIVO_DERIVA!r}')
+            e('    parar = True')
+            e('    break')
+        e('k = (fin.start() if fin else size) - p')
+        e('if k > limit - steps:')
+        e('    k = limit - steps')
+        e('p += k')
+        e('steps += k')
+        e('if p > pmax:')
+        e('    pmax = p')
+        e('    if p >= size:')
+        e('        tape.extend(bytes(p + 1))')
+        e('        size = len(tape)')
+        e('continue')
+        return
+    if m == _MOV_BARRIDO_L:
+        e(f'j = lbp + len(tape[lbp:p + 1].rstrip(izq_{q}))')
+        e('if j == lbp and p == lbp:')
+        e.nivel += 1
+        # Tope izquierdo: cada paso restante deja todo igual
+        if detect_loops:
+            e('steps += 1')
+            e(f'motivo = {MOTIVO_CICLO!r}')
+            e('parar = True')
+            e('break')
+        else:
+            e(f'steps = steps + 1 if limit == {_SIN_LIMITE} else limit')
+            e('continue')
+        e.nivel -= 1
+        e('k = p - j + 1 if j > lbp else p - lbp')
+        e('if k > limit - steps:')
+        e('    k = limit - steps')
+        e('p -= k')
+        e('steps += k')
+        e('continue')
+        return
+    if m == MOV_INVALIDO:
+        e(f'raise error_movimiento({q}, {a})')
+        return
+
+    if b != a:
+        e(f'tape[p] = {b}')
+    if m == MOV_R:
+        e('p += 1')
+        e('if p > pmax:')
+        e('    pmax = p')
+        e('    if p == size:')
+        e('        tape.extend(bytes(size))')
+        e('        size += size')
+        if qp in deriva:
+            e('    if p > fin_entrada:')
+            e(f'        q = {qp}')
+            e('        steps += 1')
+            e(f'        motivo = {MOTIVO_DERIVA!r}')
+            e('        parar = True')
+            e('        break')
+    elif m == MOV_L:
+        e('if p > lbp:')
+        e('    p -= 1')
+    else:
+        assert m == MOV_S
+    e('steps += 1')
+    if qp != q:
+        e(f'q = {qp}')
+        e('break')
+
+
+def especializar(mt: MaquinaTuring, detect_loops: bool = True) -> Callable:
+    """
+    Devuelve la función generada para mt (ver `generar_fuente`), de la
+    caché si ya se generó para una MT con la misma huella.
+
+    Raises:
+        ValueError: Si la MT tiene varias cintas, |Γ| > 256 o más de
+            MAX_TRANSICIONES transiciones
+    """
+    if mt.cintas > 1:
+        raise ValueError("El código especializado solo admite máquinas de una cinta.")
+    if len(mt.delta) > MAX_TRANSICIONES:
+        raise ValueError(f"El código especializado admite a lo sumo {MAX_TRANSICIONES} "
+                         f"transiciones (la MT tiene {len(mt.delta)}).")
+    comp = mt.compilar()
+    # La forma compilada se descarta si la MT cambia: guardar ahí la función
+    # evita recalcular la huella en cada llamada
+    generadas = getattr(comp, '_generadas', None)
+    if generadas is None:
+        generadas = comp._generadas = {}
+    f = generadas.get(detect_loops)
+    if f is not None:
+        return f
+    clave = (mt.huella(), detect_loops)
+    f = _CACHE.get(clave)
+    if f is None:
+        espacio = {'error_movimiento': comp._error_movimiento}
+        for row, buscar in comp.barrido_der.items():
+            espacio[f'buscar_{row // comp.G}'] = buscar
+        for row, izq in comp.barrido_izq.items():
+            espacio[f'izq_{row // comp.G}'] = izq
+        fuente = generar_fuente(comp, detect_loops)
+        exec(compile(fuente, f'<mt {clave[0][:12]}>', 'exec'), espacio)
+        f = _CACHE[clave] = espacio['ejecutar']
+    generadas[detect_loops] = f
+    return f
+
+
+def run(mt: MaquinaTuring,
+        w: str,
+        max_steps: Optional[int] = None,
+        implicit_reject_on_undef: bool = True,
+        detect_loops: bool = True) -> ResultadoMT:
+    """
+    Como `MaquinaTuring.run` con el motor compilado, pero con la función
+    especializada (w ya validada).
+    """
+    f = especializar(mt, detect_loops)
+    comp = mt.compilar()
+    tape, base = comp.cinta_inicial(w, mt.left_boundary)
+    lbp = mt.left_boundary - base
+    limit = _SIN_LIMITE if max_steps is None else max(max_steps, 1)
+    q, p, steps, motivo, pmax = f(tape, lbp, len(w) - 1 - base, limit,
+                                  implicit_reject_on_undef)
+    return comp._resultado(tape, base, q, p, steps, motivo, len(w), pmax)
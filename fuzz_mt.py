@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fuzzing diferencial: los motores alternativos contra `simulate` de referencia.
+
+Genera máquinas y palabras aleatorias (reproducibles con --seed) y ejecuta
+cada caso con el motor de referencia (`iter_configs(engine='referencia')`,
+sin detección de ciclos: la semántica de `simulate` por defecto) y con cada
+motor alternativo:
+
+    - Con traza, se compara línea por línea, incluido el aviso final de
+      max_steps: 'compilado' (iter_configs del motor compilado) y
+      'traza_bin' (traza binaria convertida a texto)
+    - Sin traza, se comparan veredicto, pasos, estado, cabeza y cinta final
+      con la última configuración de la referencia: 'run_referencia',
+      'run_compilado' (con barridos), 'run_paso_a_paso' (sin barridos),
+      'generado' (codegen_mt) y 'numpy' (solo veredicto y pasos; si NumPy
+      está instalado)
+    - 'no_determinista': la misma δ como MaquinaTuringND; si la referencia
+      acepta, el camino debe ser su traza, y si para sin aceptar, ninguna
+      rama acepta
+    - 'optimizado': la traza de la MT de optimizar_mt, con cada estado
+      fusionado cambiado por el representante de su clase
+    - 'multicinta' / 'run_multicinta': la MT con 1 o 2 cintas más que solo
+      leen y escriben blancos (con movimientos al azar); la primera línea
+      de cada configuración y el estado final deben ser los de la referencia
+    - 'ciclos_*': detección de ciclos encendida ('ciclos_traza' con
+      iter_configs; 'ciclos_referencia', 'ciclos_compilado', 'ciclos_paso_a_paso'
+      y 'ciclos_generado' con run). Si la referencia para, el resultado debe
+      ser el mismo; un ciclo probado solo vale si la referencia no para en
+      max_steps, y el estado en que se probó debe ser el de la referencia en
+      ese paso
+
+Las máquinas tienen a veces el tope izquierdo (`left_boundary`) fuera de 0.
+
+Cada caso que falla se reduce (menos transiciones, palabra más corta,
+menos pasos) mientras siga fallando, y se guarda como especificación en el
+formato de parser_mt; las opciones que no caben en el formato van en
+comentarios al principio. Al final se informa la velocidad de cada motor.
+
+Uso:
+    python fuzz_mt.py --cases 2000 --seed 7
+    python fuzz_mt.py --only generado numpy -o fallos/
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import motor_numpy
+from maquina_turing import (MaquinaTuring, ResultadoMT, ACEPTA, DETENIDO, LOOP,
+                            MOTIVO_MAX_STEPS, RECHAZA)
+from no_determinista_mt import MaquinaTuringND
+from optimizar_mt import optimizar
+from traza_bin import escribir_traza_bin, a_texto
+
+BLANCO = '⊔'
+SIMBOLOS = '01abcd'
+
+
+@dataclass
+class Caso:
+    """Una máquina, una palabra y las opciones de la ejecución."""
+    mt: MaquinaTuring
+    w: str
+    max_steps: int
+    implicit_reject_on_undef: bool
+
+
+@dataclass
+class Referencia:
+    """Lo que produce `simulate` de referencia para un caso."""
+    lineas: List[str]
+    veredicto: str
+    pasos: int
+    estado: str
+    cabeza: int
+    cinta: str
+    inicio_cinta: int
+
+
+# ---------------------------------------------------------------------------
+# Generación
+# ---------------------------------------------------------------------------
+
+def maquina_aleatoria(rng: random.Random, max_estados: int = 5,
+                      max_simbolos: int = 3) -> MaquinaTuring:
+    """MT de una cinta válida con estados, alfabetos y δ al azar."""
+    n = rng.randint(1, max_estados)
+    estados = [f'q{i}' for i in range(n)]
+    Q = estados + ['qacc', 'qrej']
+    Sigma = set(rng.sample(SIMBOLOS, rng.randint(1, min(max_simbolos, len(SIMBOLOS)))))
+    Gamma = Sigma | set(rng.sample(SIMBOLOS, rng.randint(0, 2))) | {BLANCO}
+    allow_S = rng.random() < 0.3
+    movs = 'LRS' if allow_S else 'LR'
+    densidad = rng.uniform(0.5, 1.0)
+    # Más peso a los estados no terminales: si no, casi todo para enseguida
+    destinos = estados * 4 + ['qacc', 'qrej']
+    delta = {}
+    for q in estados:
+        for a in sorted(Gamma):
+            if rng.random() < densidad:
+                delta[(q, a)] = (rng.choice(destinos), rng.choice(sorted(Gamma)), rng.choice(movs))
+    left_boundary = 0 if rng.random() < 0.7 else rng.randint(-3, 3)
+    return MaquinaTuring(set(Q), Sigma, Gamma, BLANCO, 'q0', 'qacc', 'qrej', delta,
+                         allow_S=allow_S, left_boundary=left_boundary)
+
+
+def caso_aleatorio(rng: random.Random, max_estados: int, max_simbolos: int,
+                   max_long: int, max_steps: int) -> Caso:
+    """Caso completo: máquina, palabra sobre Sigma y opciones."""
+    mt = maquina_aleatoria(rng, max_estados, max_simbolos)
+    sigma = sorted(mt.Sigma)
+    w = ''.join(rng.choice(sigma) for _ in range(rng.randint(0, max_long)))
+    return Caso(mt, w, rng.randint(1, max_steps), rng.random() < 0.7)
+
+
+# ---------------------------------------------------------------------------
+# Referencia y motores
+# ---------------------------------------------------------------------------
+
+def referencia(caso: Caso) -> Referencia:
+    """Traza y estado final de `simulate` con el motor de referencia."""
+    ejecucion = caso.mt.iter_configs(caso.w, caso.max_steps,
+                                     implicit_reject_on_undef=caso.implicit_reject_on_undef,
+                                     engine='referencia')
+    lineas = list(ejecucion)
+    ultima = lineas[-1] if not lineas[-1].startswith('#') else lineas[-2]
+    u, _, v = ultima.split(' ')
+    texto = u + v
+    recorte = texto.lstrip(caso.mt.blank)
+    izq = ejecucion.cabeza - len(u) + len(texto) - len(recorte)
+    recorte = recorte.rstrip(caso.mt.blank)
+    if not recorte:
+        izq = ejecucion.cabeza
+    return Referencia(lineas, ejecucion.veredicto, ejecucion.pasos, ejecucion.estado,
+                      ejecucion.cabeza, recorte, izq)
+
+
+def _traza_compilada(caso: Caso):
+    return list(caso.mt.iter_configs(caso.w, caso.max_steps,
+                                     implicit_reject_on_undef=caso.implicit_reject_on_undef,
+                                     engine='compilado'))
+
+
+def _traza_bin(caso: Caso):
+    fd, path = tempfile.mkstemp(suffix='.bin')
+    os.close(fd)
+    try:
+        escribir_traza_bin(caso.mt, caso.w, path, caso.max_steps,
+                           caso.implicit_reject_on_undef)
+        out = io.StringIO()
+        a_texto(path, out)
+        return out.getvalue().splitlines()
+    finally:
+        os.remove(path)
+
+
+def _final(res) -> tuple:
+    return (res.veredicto, res.pasos, res.estado, res.cabeza, res.cinta, res.inicio_cinta)
+
+
+def _esperado(ref: Referencia) -> tuple:
+    return (ref.veredicto, ref.pasos, ref.estado, ref.cabeza, ref.cinta, ref.inicio_cinta)
+
+
+def _run(engine: str) -> Callable[[Caso], tuple]:
+    def correr(caso: Caso) -> tuple:
+        return _final(caso.mt.run(caso.w, caso.max_steps, caso.implicit_reject_on_undef,
+                                  engine=engine, detect_loops=False))
+    return correr
+
+
+def _run_paso_a_paso(caso: Caso) -> tuple:
+    return _final(caso.mt.compilar().run(caso.w, caso.max_steps,
+                                         caso.implicit_reject_on_undef,
+                                         sweep=False, detect_loops=False))
+
+
+def _numpy(caso: Caso) -> tuple:
+    (veredicto, pasos, _), = motor_numpy.run_lote_numpy(caso.mt, [caso.w], caso.max_steps,
+                                                        caso.implicit_reject_on_undef)
+    return veredicto, pasos
+
+
+def _no_determinista(caso: Caso):
+    mt = caso.mt
+    nd = MaquinaTuringND(mt.Q, mt.Sigma, mt.Gamma, mt.blank, mt.q0, mt.qacc, mt.qrej,
+                         {clave: (mov,) for clave, mov in mt.delta.items()},
+                         allow_S=mt.allow_S, left_boundary=mt.left_boundary, validar=False)
+    res = nd.explorar(caso.w, caso.max_steps, caso.implicit_reject_on_undef)
+    return res.veredicto, res.camino
+
+
+def _optimizado(caso: Caso) -> List[str]:
+    """Traza de la MT optimizada, con los estados llevados a su representante."""
+    opt, informe = optimizar(caso.mt)
+    clase = {q: rep for rep, otros in informe.fusionados.items() for q in otros}
+    lineas = list(opt.iter_configs(caso.w, caso.max_steps,
+                                   implicit_reject_on_undef=caso.implicit_reject_on_undef))
+    return lineas, clase
+
+
+def multicinta(mt: MaquinaTuring, semilla: str) -> MaquinaTuring:
+    """
+    La MT con 1 o 2 cintas de más que siempre leen y escriben el blanco (y
+    mueven al azar): la primera cinta debe evolucionar igual que la de `mt`.
+    """
+    rng = random.Random(semilla)
+    extra = rng.randint(1, 2)
+    blancos = (mt.blank,) * extra
+    movs = 'LRS' if mt.allow_S else 'LR'
+    delta = {}
+    for (q, a), (qp, b, m) in sorted(mt.delta.items()):
+        delta[(q, (a,) + blancos)] = (qp, (b,) + blancos,
+                                      (m,) + tuple(rng.choice(movs) for _ in blancos))
+    return MaquinaTuring(mt.Q, mt.Sigma, mt.Gamma, mt.blank, mt.q0, mt.qacc, mt.qrej, delta,
+                         allow_S=mt.allow_S, left_boundary=mt.left_boundary,
+                         cintas=1 + extra)
+
+
+def _multicinta(caso: Caso) -> MaquinaTuring:
+    return multicinta(caso.mt, caso.w + repr(sorted(caso.mt.delta.items())))
+
+
+def _traza_multicinta(caso: Caso) -> List[str]:
+    lineas = _multicinta(caso).iter_configs(
+        caso.w, caso.max_steps, implicit_reject_on_undef=caso.implicit_reject_on_undef)
+    return [linea.split('\n')[0] for linea in lineas]
+
+
+def _run_multicinta(caso: Caso) -> tuple:
+    return _final(_multicinta(caso).run(caso.w, caso.max_steps, caso.implicit_reject_on_undef,
+                                        detect_loops=False))
+
+
+def _ciclos(engine: str) -> Callable[[Caso], ResultadoMT]:
+    def correr(caso: Caso) -> ResultadoMT:
+        if engine == 'paso_a_paso':
+            return caso.mt.compilar().run(caso.w, caso.max_steps, caso.implicit_reject_on_undef,
+                                          sweep=False, detect_loops=True)
+        return caso.mt.run(caso.w, caso.max_steps, caso.implicit_reject_on_undef,
+                           engine=engine, detect_loops=True)
+    return correr
+
+
+def _traza_ciclos(caso: Caso) -> List[str]:
+    return list(caso.mt.iter_configs(caso.w, caso.max_steps,
+                                     implicit_reject_on_undef=caso.implicit_reject_on_undef,
+                                     detect_loops=True))
+
+
+# Motores con traza: comparan la lista de líneas
+MOTORES_TRAZA: Dict[str, Callable[[Caso], List[str]]] = {
+    'compilado': _traza_compilada,
+    'traza_bin': _traza_bin,
+    'multicinta': _traza_multicinta,
+}
+
+# Motores sin traza: comparan el estado final
+MOTORES_FINAL: Dict[str, Callable[[Caso], tuple]] = {
+    'run_referencia': _run('referencia'),
+    'run_compilado': _run('compilado'),
+    'run_paso_a_paso': _run_paso_a_paso,
+    'generado': _run('generado'),
+    'numpy': _numpy,
+    'run_multicinta': _run_multicinta,
+}
+
+# Motores con detección de ciclos: resultado de run
+MOTORES_CICLOS: Dict[str, Callable[[Caso], ResultadoMT]] = {
+    'ciclos_referencia': _ciclos('referencia'),
+    'ciclos_compilado': _ciclos('compilado'),
+    'ciclos_paso_a_paso': _ciclos('paso_a_paso'),
+    'ciclos_generado': _ciclos('generado'),
+}
+
+MOTORES = (list(MOTORES_TRAZA) + list(MOTORES_FINAL) + ['no_determinista', 'optimizado',
+                                                         'ciclos_traza'] + list(MOTORES_CICLOS))
+
+
+def _comparar_lineas(esperadas: List[str], obtenidas: List[str]) -> Optional[str]:
+    for k, (esperada, obtenida) in enumerate(zip(esperadas, obtenidas)):
+        if esperada != obtenida:
+            return f"línea {k}: se esperaba {esperada!r}, se obtuvo {obtenida!r}"
+    if len(obtenidas) != len(esperadas):
+        return f"{len(obtenidas)} líneas en lugar de {len(esperadas)}"
+    return None
+
+
+def _comparar_ciclos(res: ResultadoMT, caso: Caso, ref: Referencia) -> Optional[str]:
+    """Un resultado con detección de ciclos contra la referencia sin ella."""
+    if res.veredicto != LOOP or res.motivo == MOTIVO_MAX_STEPS:
+        obtenido = _final(res)
+        if obtenido != _esperado(ref):
+            return f"se esperaba {_esperado(ref)!r}, se obtuvo {obtenido!r}"
+        return None
+    if ref.veredicto != LOOP:
+        return f"prueba un ciclo ({res.motivo}) pero la referencia termina con {ref.veredicto}"
+    if res.pasos > caso.max_steps:
+        return f"prueba un ciclo en el paso {res.pasos}, después de max_steps"
+    estado = ref.lineas[res.pasos].split(' ')[1]
+    if res.estado != estado:
+        return (f"prueba un ciclo ({res.motivo}) en el paso {res.pasos} en el estado "
+                f"{res.estado!r}, pero la referencia está en {estado!r}")
+    return None
+
+
+def comparar(motor: str, caso: Caso, ref: Referencia) -> Optional[str]:
+    """
+    Ejecuta `motor` sobre el caso y lo compara con la referencia.
+
+    Returns:
+        Descripción de la primera diferencia, o None si coinciden
+    """
+    try:
+        if motor in MOTORES_TRAZA:
+            return _comparar_lineas(ref.lineas, MOTORES_TRAZA[motor](caso))
+        if motor in MOTORES_CICLOS:
+            return _comparar_ciclos(MOTORES_CICLOS[motor](caso), caso, ref)
+        if motor == 'optimizado':
+            lineas, clase = _optimizado(caso)
+            esperadas = []
+            for linea in ref.lineas:
+                if not linea.startswith('#'):
+                    u, q, v = linea.split(' ')
+                    linea = f"{u} {clase.get(q, q)} {v}"
+                esperadas.append(linea)
+            return _comparar_lineas(esperadas, lineas)
+        if motor == 'ciclos_traza':
+            lineas = _traza_ciclos(caso)
+            if not lineas[-1].startswith('#') or lineas[-1] == ref.lineas[-1]:
+                return _comparar_lineas(ref.lineas, lineas)
+            # Cortada por un ciclo probado: prefijo de la referencia, que no para
+            if ref.veredicto != LOOP:
+                return f"prueba un ciclo pero la referencia termina con {ref.veredicto}"
+            return _comparar_lineas(ref.lineas[:len(lineas) - 1], lineas[:-1])
+        if motor == 'numpy':
+            esperado = (ref.veredicto, ref.pasos)
+            obtenido = _numpy(caso)
+        elif motor == 'no_determinista':
+            veredicto, camino = _no_determinista(caso)
+            if ref.veredicto == ACEPTA:
+                # simulate avisa de max_steps aunque el último paso llegue a qacc
+                lineas = [c for c in ref.lineas if not c.startswith('#')]
+                esperado, obtenido = (ACEPTA, lineas), (veredicto, camino)
+            elif ref.veredicto in (RECHAZA, DETENIDO):
+                esperado, obtenido = RECHAZA, veredicto
+            elif veredicto == ACEPTA:
+                return "acepta aunque la referencia no para"
+            else:
+                return None
+        else:
+            esperado = _esperado(ref)
+            obtenido = MOTORES_FINAL[motor](caso)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    if esperado != obtenido:
+        return f"se esperaba {esperado!r}, se obtuvo {obtenido!r}"
+    return None
+
+
+def _falla(motor: str, caso: Caso) -> bool:
+    try:
+        ref = referencia(caso)
+    except Exception:
+        # La reducción no debe llevar a un caso que rompa la referencia
+        return False
+    return comparar(motor, caso, ref) is not None
+
+
+# ---------------------------------------------------------------------------
+# Reducción
+# ---------------------------------------------------------------------------
+
+def _con_delta(caso: Caso, delta: dict) -> Caso:
+    mt = caso.mt
+    usados = {mt.q0, mt.qacc, mt.qrej}
+    for (q, _), (qp, _, _) in delta.items():
+        usados.update((q, qp))
+    nueva = MaquinaTuring(usados, mt.Sigma, mt.Gamma, mt.blank, mt.q0, mt.qacc, mt.qrej,
+                          delta, allow_S=mt.allow_S, left_boundary=mt.left_boundary,
+                          validar=False)
+    return replace(caso, mt=nueva)
+
+
+def reducir(motor: str, caso: Caso) -> Caso:
+    """
+    Achica un caso que falla mientras siga fallando: quita transiciones,
+    acorta la palabra, baja max_steps y simplifica los símbolos escritos y
+    los movimientos. Repite hasta que ningún cambio se sostenga.
+    """
+    cambio = True
+    while cambio:
+        cambio = False
+        for clave in sorted(caso.mt.delta):
+            delta = dict(caso.mt.delta)
+            del delta[clave]
+            candidato = _con_delta(caso, delta)
+            if _falla(motor, candidato):
+                caso, cambio = candidato, True
+        for i in range(len(caso.w) - 1, -1, -1):
+            candidato = replace(caso, w=caso.w[:i] + caso.w[i + 1:])
+            if _falla(motor, candidato):
+                caso, cambio = candidato, True
+        while caso.max_steps > 1:
+            candidato = replace(caso, max_steps=caso.max_steps // 2)
+            if not _falla(motor, candidato):
+                break
+            caso, cambio = candidato, True
+        for pasos in range(1, caso.max_steps):
+            candidato = replace(caso, max_steps=pasos)
+            if _falla(motor, candidato):
+                caso, cambio = candidato, True
+                break
+        # Escribir lo leído y mover a la derecha, cada cambio por separado
+        for clave in sorted(caso.mt.delta):
+            for simplificar in (lambda qp, b, m: (qp, clave[1], m),
+                                lambda qp, b, m: (qp, b, 'R')):
+                actual = caso.mt.delta[clave]
+                mas_simple = simplificar(*actual)
+                if mas_simple == actual:
+                    continue
+                delta = dict(caso.mt.delta)
+                delta[clave] = mas_simple
+                candidato = _con_delta(caso, delta)
+                if _falla(motor, candidato):
+                    caso, cambio = candidato, True
+    return caso
+
+
+def especificacion(caso: Caso, motor: str = '', detalle: str = '') -> str:
+    """El caso en el formato de parser_mt, con las opciones en comentarios."""
+    mt = caso.mt
+    lineas = []
+    if motor:
+        lineas.append(f"# Diferencia en el motor '{motor}': {detalle}")
+    opciones = [f"--max-steps {caso.max_steps}"]
+    if mt.allow_S:
+        opciones.append("--allow-S")
+    if not caso.implicit_reject_on_undef:
+        opciones.append("--no-implicit-reject")
+    lineas.append(f"# Opciones: {' '.join(opciones)}")
+    if mt.left_boundary:
+        lineas.append(f"# Tope izquierdo (no cabe en el formato): "
+                      f"MaquinaTuring(..., left_boundary={mt.left_boundary})")
+    lineas += [
+        "Q = {" + ", ".join(sorted(mt.Q)) + "}",
+        "Sigma = {" + ", ".join(sorted(mt.Sigma)) + "}",
+        "Gamma = {" + ", ".join(sorted(mt.Gamma)) + "}",
+        f"blank = {mt.blank}",
+        f"q0 = {mt.q0}",
+        f"qaccept = {mt.qacc}",
+        f"qreject = {mt.qrej}",
+        "",
+        "delta:",
+    ]
+    for (q, a), (qp, b, m) in sorted(mt.delta.items()):
+        lineas.append(f"({q}, {a}) -> ({qp}, {b}, {m})")
+    if caso.w:
+        lineas += ["", f"input = {caso.w}"]
+    return "\n".join(lineas) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Campaña
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Fallo:
+    """Un caso reducido en que un motor difiere de la referencia."""
+    motor: str
+    numero: int
+    detalle: str
+    caso: Caso
+
+
+def fuzz(casos: int,
+         semilla: int = 0,
+         motores: Optional[List[str]] = None,
+         max_estados: int = 5,
+         max_simbolos: int = 3,
+         max_long: int = 8,
+         max_steps: int = 200,
+         max_fallos: int = 10,
+         al_fallo: Optional[Callable[[Fallo], None]] = None
+         ) -> Tuple[List[Fallo], Dict[str, Tuple[int, float]]]:
+    """
+    Ejecuta la campaña.
+
+    Args:
+        casos: Casos a generar
+        semilla: Semilla del generador (la campaña es reproducible)
+        motores: Motores a comparar (default: todos los disponibles)
+        max_estados / max_simbolos / max_long / max_steps: Cotas de los casos
+        max_fallos: Dejar de reducir (y de probar) un motor tras tantos fallos
+        al_fallo: Recibe cada Fallo ya reducido
+
+    Returns:
+        Tupla (fallos, velocidad) con velocidad[motor] = (pasos, segundos);
+        la referencia se informa como 'simulate'
+    """
+    motores = list(motores or MOTORES)
+    if 'numpy' in motores and not motor_numpy.disponible():
+        motores.remove('numpy')
+    rng = random.Random(semilla)
+    fallos: List[Fallo] = []
+    por_motor = {m: 0 for m in motores}
+    velocidad = {m: [0, 0.0] for m in ['simulate'] + motores}
+    for numero in range(casos):
+        caso = caso_aleatorio(rng, max_estados, max_simbolos, max_long, max_steps)
+        t0 = time.perf_counter()
+        ref = referencia(caso)
+        velocidad['simulate'][0] += ref.pasos
+        velocidad['simulate'][1] += time.perf_counter() - t0
+        for motor in motores:
+            if por_motor[motor] >= max_fallos:
+                continue
+            t0 = time.perf_counter()
+            detalle = comparar(motor, caso, ref)
+            velocidad[motor][0] += ref.pasos
+            velocidad[motor][1] += time.perf_counter() - t0
+            if detalle is None:
+                continue
+            reducido = reducir(motor, caso)
+            detalle = comparar(motor, reducido, referencia(reducido)) or detalle
+            fallo = Fallo(motor, numero, detalle, reducido)
+            fallos.append(fallo)
+            por_motor[motor] += 1
+            if al_fallo is not None:
+                al_fallo(fallo)
+    return fallos, {m: (p, s) for m, (p, s) in velocidad.items()}
+
+
+def main():
+    """Punto de entrada del fuzzer."""
+    parser = argparse.ArgumentParser(
+        description='Fuzzing diferencial de los motores contra simulate de referencia.')
+    parser.add_argument('--cases', type=int, default=500,
+                        help='Casos a generar (default: 500).')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Semilla del generador (default: 0).')
+    parser.add_argument('--only', nargs='+', metavar='MOTOR', choices=MOTORES,
+                        help=f"Probar solo estos motores ({', '.join(MOTORES)}).")
+    parser.add_argument('--max-states', type=int, default=5,
+                        help='Máximo de estados no terminales por máquina (default: 5).')
+    parser.add_argument('--max-symbols', type=int, default=3,
+                        help='Máximo de símbolos de Sigma (default: 3).')
+    parser.add_argument('--max-len', type=int, default=8,
+                        help='Longitud máxima de la palabra (default: 8).')
+    parser.add_argument('--max-steps', type=int, default=200,
+                        help='Tope de pasos de cada caso, elegido al azar hasta este valor (default: 200).')
+    parser.add_argument('--max-failures', type=int, default=10,
+                        help='Fallos a reducir por motor antes de dejar de probarlo (default: 10).')
+    parser.add_argument('-o', '--out', metavar='DIRECTORIO',
+                        help='Guardar cada caso reducido como especificación en DIRECTORIO.')
+    args = parser.parse_args()
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    def al_fallo(fallo: Fallo):
+        print(f"[X] {fallo.motor} (caso {fallo.numero}): {fallo.detalle}")
+        spec = especificacion(fallo.caso, fallo.motor, fallo.detalle)
+        if args.out:
+            path = os.path.join(args.out, f"fallo_{fallo.motor}_{fallo.numero}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(spec)
+            print(f"    Caso reducido en: {path}")
+        else:
+            print('    ' + spec.rstrip('\n').replace('\n', '\n    '))
+
+    fallos, velocidad = fuzz(args.cases, args.seed, args.only, args.max_states,
+                             args.max_symbols, args.max_len, args.max_steps,
+                             args.max_failures, al_fallo)
+
+    print(f"\n{args.cases} casos (semilla {args.seed})")
+    for motor, (pasos, segundos) in velocidad.items():
+        ritmo = f"{pasos / segundos:,.0f} pasos/s" if segundos else "-"
+        print(f"  {motor:<18} {pasos:>10,} pasos  {segundos:8.3f}s  {ritmo}")
+    if fallos:
+        print(f"\n[X] {len(fallos)} caso(s) con diferencias")
+        return 1
+    print("\n[OK] Todos los motores coinciden con la referencia")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulación por lotes: una MT contra muchas palabras.
+
+Las palabras se reparten en bloques sobre un ProcessPoolExecutor. Cada
+proceso recibe la máquina una sola vez (en su inicializador) y la compila
+una sola vez; luego solo se envían bloques de palabras y vuelven tuplas
+(índice, palabra, veredicto, pasos, motivo).
+
+Con una CacheResultados (ver resultados_mt), cada bloque se busca primero
+en la caché: los aciertos se entregan sin simular y solo los fallos van al
+pool, que en ese caso devuelve el ResultadoMT completo para guardarlo.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice, product
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from maquina_turing import Limites, MaquinaTuring, ResultadoMT
+
+# (índice en la entrada, palabra, veredicto, pasos, motivo)
+FilaLote = Tuple[int, str, str, int, Optional[str]]
+
+# Palabras por tarea enviada al pool
+TAM_BLOQUE = 256
+
+# Máquina del proceso trabajador (ver _iniciar_trabajador)
+_MT: Optional[MaquinaTuring] = None
+_OPCIONES: dict = {}
+
+
+def palabras_de_archivo(path: str) -> Iterator[str]:
+    """
+    Lee palabras de un archivo, una por línea.
+
+    Se ignoran las líneas vacías y las que empiezan con '#'.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for raw in f:
+            w = raw.strip()
+            if w and not w.startswith('#'):
+                yield w
+
+
+def enumerar_palabras(Sigma: Iterable[str], n: int) -> Iterator[str]:
+    """Todas las palabras sobre Sigma de longitud 0..n, en orden shortlex."""
+    simbolos = sorted(Sigma)
+    for k in range(n + 1):
+        for t in product(simbolos, repeat=k):
+            yield ''.join(t)
+
+
+def _iniciar_trabajador(mt: MaquinaTuring, opciones: dict):
+    """Inicializador del pool: guarda y compila la máquina una vez por proceso."""
+    global _MT, _OPCIONES
+    _MT = mt
+    _OPCIONES = opciones
+    if len(mt.Gamma) <= 256:
+        mt.compilar()
+
+
+def _ejecutar_bloque(inicio: int, palabras: List[str]) -> List[FilaLote]:
+    """Ejecuta un bloque de palabras con la máquina del proceso."""
+    filas = []
+    for k, w in enumerate(palabras):
+        res = _MT.run(w, **_OPCIONES)
+        filas.append((inicio + k, w, res.veredicto, res.pasos, res.motivo))
+    return filas
+
+
+def _ejecutar_bloque_completo(inicio: int,
+                              palabras: List[str]) -> List[Tuple[int, str, ResultadoMT]]:
+    """Como `_ejecutar_bloque`, pero con el ResultadoMT entero (para la caché)."""
+    return [(inicio + k, w, _MT.run(w, **_OPCIONES)) for k, w in enumerate(palabras)]
+
+
+def _bloques(palabras: Iterable[str], tam: int) -> Iterator[Tuple[int, List[str]]]:
+    it = iter(palabras)
+    inicio = 0
+    while True:
+        bloque = list(islice(it, tam))
+        if not bloque:
+            return
+        yield inicio, bloque
+        inicio += len(bloque)
+
+
+def ejecutar_lote(mt: MaquinaTuring,
+                  palabras: Iterable[str],
+                  max_steps: Optional[int] = None,
+                  implicit_reject_on_undef: bool = True,
+                  detect_loops: bool = True,
+                  jobs: Optional[int] = None,
+                  ordenado: bool = False,
+                  tam_bloque: int = TAM_BLOQUE,
+                  backend: str = 'python',
+                  resultados=None,
+                  limites: Optional[Limites] = None) -> Iterator[FilaLote]:
+    """
+    Ejecuta `mt.run` sobre cada palabra y entrega los resultados en flujo.
+
+    Args:
+        mt: Máquina a ejecutar
+        palabras: Iterable de palabras (puede ser perezoso e ilimitado)
+        max_steps: Límite de pasos por palabra
+        implicit_reject_on_undef: Si True, rechaza cuando no hay transición
+        detect_loops: Cortar al probarse un ciclo infinito (ver `run`)
+        jobs: Procesos del pool (None = núcleos disponibles; 1 = sin pool)
+        ordenado: Si True, entrega en el orden de entrada; si no, en orden
+            de finalización de los bloques
+        tam_bloque: Palabras por tarea
+        backend: 'python' (pool de procesos) o 'numpy' (motor vectorizado
+            en este proceso, sin detección de ciclos; siempre en orden y
+            con max_steps obligatorio)
+        resultados: CacheResultados de la que servir los aciertos y en la
+            que guardar lo simulado (solo con backend 'python')
+        limites: Presupuestos de celdas, tiempo y memoria de cada palabra
+            (ver `MaquinaTuring.run`; solo con backend 'python'). Los
+            resultados cortados por un límite no se guardan en la caché
+
+    Yields:
+        Tuplas (índice, palabra, veredicto, pasos, motivo)
+    """
+    if backend == 'numpy':
+        if resultados is not None:
+            raise ValueError("La caché de resultados no aplica al backend 'numpy'")
+        if limites is not None and limites.activos():
+            raise ValueError("Los límites de recursos no aplican al backend 'numpy'")
+        if max_steps is None:
+            raise ValueError("El backend 'numpy' requiere max_steps (no detecta ciclos)")
+        yield from _lote_numpy(mt, palabras, max_steps, implicit_reject_on_undef)
+        return
+    if backend != 'python':
+        raise ValueError("backend debe ser 'python' o 'numpy'")
+
+    opciones = dict(max_steps=max_steps,
+                    implicit_reject_on_undef=implicit_reject_on_undef,
+                    detect_loops=detect_loops)
+    # Los límites solo llegan a run si hay alguno (MaquinaTuringND no los admite)
+    del_pool = dict(opciones)
+    if limites is not None and limites.activos():
+        del_pool['limites'] = limites
+    jobs = jobs or os.cpu_count() or 1
+    if resultados is not None:
+        yield from _lote_con_cache(mt, palabras, opciones, resultados, jobs,
+                                   ordenado, tam_bloque, del_pool)
+        return
+    for filas in _en_pool(mt, _bloques(palabras, tam_bloque), del_pool,
+                          jobs, ordenado, _ejecutar_bloque):
+        yield from filas
+
+
+def _en_pool(mt: MaquinaTuring, bloques: Iterator[Tuple[int, List[str]]],
+             opciones: dict, jobs: int, ordenado: bool,
+             tarea: Callable[[int, List[str]], list]) -> Iterator[list]:
+    """
+    Ejecuta `tarea` sobre cada bloque, en este proceso o en un pool, y
+    entrega la lista de resultados de cada bloque. Un bloque vacío no se
+    envía: se entrega enseguida una lista vacía.
+    """
+    if jobs == 1:
+        _iniciar_trabajador(mt, opciones)
+        for inicio, bloque in bloques:
+            yield tarea(inicio, bloque)
+        return
+
+    # Se mantienen a lo sumo 4 bloques por proceso en vuelo, para no
+    # materializar entradas enormes (p. ej. --enumerate) en memoria. En
+    # orden, los bloques ya terminados que esperan a uno anterior también
+    # cuentan, y el tope es de 2 por proceso: si el primero tarda, no se
+    # sigue leyendo la entrada y `listos` no crece sin límite
+    max_en_vuelo = 2 * jobs if ordenado else 4 * jobs
+    pendientes = {}
+    listos = {}
+    siguiente = 0
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_iniciar_trabajador,
+                             initargs=(mt, opciones)) as pool:
+        agotado = False
+        while True:
+            while not agotado and len(pendientes) + len(listos) < max_en_vuelo:
+                try:
+                    inicio, bloque = next(bloques)
+                except StopIteration:
+                    agotado = True
+                    break
+                if not bloque:
+                    yield []
+                    continue
+                pendientes[pool.submit(tarea, inicio, bloque)] = inicio
+            if not pendientes:
+                break
+
+            hechos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                inicio = pendientes.pop(fut)
+                filas = fut.result()
+                if not ordenado:
+                    yield filas
+                    continue
+                listos[inicio] = filas
+                while siguiente in listos:
+                    filas = listos.pop(siguiente)
+                    siguiente += len(filas)
+                    yield filas
+
+
+def _lote_con_cache(mt: MaquinaTuring, palabras: Iterable[str], opciones: dict,
+                    resultados, jobs: int, ordenado: bool,
+                    tam_bloque: int, del_pool: dict) -> Iterator[FilaLote]:
+    """
+    Modo lote con caché de resultados: cada bloque se consulta en la caché
+    antes de enviarse; al pool solo van las palabras que faltan. `opciones`
+    son las de la clave de la caché; `del_pool`, las que recibe run (con
+    los límites, si hay).
+    """
+    aciertos: List[FilaLote] = []
+    # Índice en la entrada de cada palabra enviada al pool, por índice en el pool
+    originales = {}
+
+    def fallos() -> Iterator[Tuple[int, List[str]]]:
+        enviados = 0
+        for inicio, bloque in _bloques(palabras, tam_bloque):
+            guardados = resultados.consultar_muchos(mt, bloque, **opciones)
+            faltan = []
+            for k, w in enumerate(bloque):
+                res = guardados.get(w)
+                if res is None:
+                    originales[enviados + len(faltan)] = inicio + k
+                    faltan.append(w)
+                else:
+                    aciertos.append((inicio + k, w, res.veredicto, res.pasos, res.motivo))
+            # Un bloque vacío no llega al pool, pero deja entregar los aciertos
+            if faltan or len(aciertos) >= tam_bloque:
+                yield enviados, faltan
+                enviados += len(faltan)
+
+    siguiente = 0
+    listos = {}
+
+    def entregar(filas: List[FilaLote]) -> Iterator[FilaLote]:
+        nonlocal siguiente
+        if not ordenado:
+            yield from filas
+            return
+        for fila in filas:
+            listos[fila[0]] = fila
+        while siguiente in listos:
+            yield listos.pop(siguiente)
+            siguiente += 1
+
+    for bloque in _en_pool(mt, fallos(), del_pool, jobs, ordenado,
+                           _ejecutar_bloque_completo):
+        filas = aciertos[:]
+        aciertos.clear()
+        filas += [(originales.pop(k), w, res.veredicto, res.pasos, res.motivo)
+                  for k, w, res in bloque]
+        resultados.guardar_muchos(mt, [(w, res) for _, w, res in bloque], **opciones)
+        yield from entregar(filas)
+    yield from entregar(aciertos)
+
+
+def _lote_numpy(mt: MaquinaTuring, palabras: Iterable[str],
+                max_steps: Optional[int],
+                implicit_reject_on_undef: bool) -> Iterator[FilaLote]:
+    """Modo lote sobre el motor vectorizado, por bloques de motor_numpy.TAM_BLOQUE."""
+    from motor_numpy import run_lote_numpy, TAM_BLOQUE as TAM_NUMPY
+
+    for inicio, bloque in _bloques(palabras, TAM_NUMPY):
+        res = run_lote_numpy(mt, bloque, max_steps, implicit_reject_on_undef)
+        for k, (w, (veredicto, pasos, motivo)) in enumerate(zip(bloque, res)):
+            yield inicio + k, w, veredicto, pasos, motivo
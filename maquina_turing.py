@@ -4,19 +4,507 @@
 Clase MaquinaTuring - Representa y simula una Máquina de Turing determinista.
 """
 
+import hashlib
+import math
+import os
+import sys
+import time
 from collections import defaultdict
-from typing import Dict, Tuple, Set, List, Optional
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple, Set, List, Optional, TextIO
+
+from cinta_mt import CintaPaginada, BITS_PAGINA, MASCARA_PAGINA
 
 Move = str  # 'L' | 'R' | 'S'
 State = str
 Symbol = str
 Delta = Dict[Tuple[State, Symbol], Tuple[State, Symbol, Move]]
+# Con k > 1 cintas: δ(q, (a1..ak)) = (q', (b1..bk), (M1..Mk))
+DeltaK = Dict[Tuple[State, Tuple[Symbol, ...]],
+              Tuple[State, Tuple[Symbol, ...], Tuple[Move, ...]]]
+
+
+
+class _FormateadorConfig:
+    """
+    Formatea configuraciones en notación u q v a partir de una CintaPaginada.
+
+    La ventana mostrada es [min(left_boundary, cabeza, lo), max(cabeza, hi)]
+    y se obtiene en O(1) gracias a la extensión no-blanco de la cinta; cada
+    mitad se decodifica de una vez: el costo por paso es O(ventana).
+    """
+
+    __slots__ = ('tape', 'left_boundary', 'sep')
+
+    def __init__(self, tape: CintaPaginada, variant: str, left_boundary: int):
+        if variant == 'u q v':
+            self.sep = ' '
+        elif variant == 'uqv':
+            self.sep = ''
+        else:
+            raise ValueError("config_variant debe ser 'uqv' o 'u q v'")
+        self.tape = tape
+        self.left_boundary = left_boundary
+
+    def render(self, q: State, head: int) -> str:
+        """Devuelve la configuración actual formateada."""
+        tape = self.tape
+        L = min(self.left_boundary, head)
+        R = head
+        if tape.lo <= tape.hi:
+            if tape.lo < L:
+                L = tape.lo
+            if tape.hi > R:
+                R = tape.hi
+        sep = self.sep
+        return tape.texto(L, head - 1) + sep + q + sep + tape.texto(head, R)
+
+
+# Veredictos de una ejecución
+ACEPTA = 'ACEPTA'
+RECHAZA = 'RECHAZA'
+LOOP = 'LOOP'            # No se detuvo (ver `motivo`)
+DETENIDO = 'DETENIDO'    # Paró sin transición en un estado que no es de paro
+
+# Motivos por los que una ejecución termina con LOOP
+MOTIVO_MAX_STEPS = 'max_steps'   # Se agotó el límite de pasos (posible ciclo)
+MOTIVO_CICLO = 'ciclo'           # Probado: se repitió una configuración
+MOTIVO_DERIVA = 'deriva'         # Probado: avanza a la derecha sobre blancos sin fin
+MOTIVO_CONDENADO = 'condenado'   # Probado: entró en un estado sin salida (ver analisis_mt)
+
+# Motivos por los que una ejecución con `Limites` se corta sin parar
+MOTIVO_MAX_CELDAS = 'max_celdas'     # El tramo de cinta en uso pasó de max_celdas
+MOTIVO_MAX_TIEMPO = 'max_tiempo'     # Se agotó el tiempo de pared
+MOTIVO_MAX_TRAZA = 'max_traza'       # La traza entregada pasó de max_bytes_traza
+MOTIVO_MAX_MEMORIA = 'max_memoria'   # La memoria residente pasó de max_memoria
+
+# Línea de aviso con que termina la traza en cada caso
+AVISOS = {
+    MOTIVO_MAX_STEPS: "# [Aviso] Se alcanzó el límite de pasos ({max_steps}). Posible ciclo infinito.",
+    MOTIVO_CICLO: "# [Aviso] Ciclo infinito detectado en el paso {pasos}: se repitió una configuración.",
+    MOTIVO_DERIVA: "# [Aviso] Ciclo infinito detectado en el paso {pasos}: "
+                   "la cabeza avanza a la derecha sobre blancos sin fin.",
+    MOTIVO_CONDENADO: "# [Aviso] Ciclo infinito detectado en el paso {pasos}: "
+                      "desde el estado actual ninguna transición lleva a parar.",
+}
+
+
+# Línea con que termina la traza al agotarse un límite de recursos; los
+# campos son clave=valor para que otras herramientas la lean sin ambigüedad
+AVISO_LIMITE = "# [Límite] motivo={motivo} limite={limite} valor={valor} pasos={pasos}"
+
+# Texto y símbolo a mostrar para cada veredicto
+RESULTADOS = {
+    ACEPTA: ("ACEPTADO", "[OK]"),
+    RECHAZA: ("RECHAZADO", "[X]"),
+    LOOP: ("NO TERMINO (posible bucle infinito)", "[LOOP]"),
+    DETENIDO: ("DETENIDO (sin transición definida)", "[STOP]"),
+}
+
+# Descripción de los ciclos probados por la detección de ciclos
+CICLOS_PROBADOS = {
+    MOTIVO_CICLO: "se repitió una configuración",
+    MOTIVO_DERIVA: "avanza a la derecha sobre blancos sin fin",
+    MOTIVO_CONDENADO: "entró en un estado desde el que no se puede parar",
+}
+
+# Descripción de cada límite de recursos (ver `Limites`)
+LIMITES_AGOTADOS = {
+    MOTIVO_MAX_CELDAS: "celdas de cinta",
+    MOTIVO_MAX_TIEMPO: "tiempo",
+    MOTIVO_MAX_TRAZA: "tamaño de la traza",
+    MOTIVO_MAX_MEMORIA: "memoria",
+}
+
+
+def describir_resultado(veredicto: str, motivo, pasos: int):
+    """Devuelve (texto, símbolo) del resultado, distinguiendo ciclos probados."""
+    if veredicto == LOOP and motivo in CICLOS_PROBADOS:
+        return (f"NO TERMINA (ciclo infinito probado en el paso {pasos}: "
+                f"{CICLOS_PROBADOS[motivo]})", "[LOOP]")
+    if veredicto == LOOP and motivo in LIMITES_AGOTADOS:
+        return (f"NO TERMINO (se agotó el límite de {LIMITES_AGOTADOS[motivo]} "
+                f"en el paso {pasos})", "[LIMIT]")
+    return RESULTADOS[veredicto]
+
+
+# Pasos entre comprobaciones de los límites de recursos (por defecto)
+PASOS_POR_LOTE = 1024
+
+
+def memoria_residente() -> Optional[int]:
+    """
+    Memoria residente del proceso en bytes, o None si no se puede medir.
+
+    En Linux se lee /proc/self/statm (la actual); si no, se usa el pico de
+    `resource.getrusage`, que solo crece.
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KiB salvo en macOS, donde está en bytes
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+@dataclass
+class Limites:
+    """
+    Presupuestos de recursos de una ejecución (ver `iter_configs` y `run`).
+
+    Se comprueban por lotes de a lo sumo `cada_pasos` pasos, y no en cada
+    uno; cerca del límite de celdas o de traza los lotes se acortan para no
+    pasarse más que lo que crece una configuración. El primero
+    que se agota termina la traza con una línea AVISO_LIMITE en lugar del
+    aviso '# [Aviso]', y el veredicto es LOOP con el MOTIVO_MAX_* de ese
+    límite (también en `run`, que no tiene traza ni admite
+    max_bytes_traza). None deja un recurso sin límite.
+
+    Atributos:
+        max_celdas: Celdas del tramo de cinta en uso, el que muestra la
+            configuración (con k cintas, la suma)
+        max_segundos: Tiempo de pared desde que empieza la ejecución
+        max_bytes_traza: Bytes en UTF-8 de las configuraciones entregadas,
+            con un salto de línea por configuración
+        max_memoria: Memoria residente del proceso en bytes (aproximada,
+            ver `memoria_residente`)
+        cada_pasos: Pasos entre comprobaciones
+    """
+    max_celdas: Optional[int] = None
+    max_segundos: Optional[float] = None
+    max_bytes_traza: Optional[int] = None
+    max_memoria: Optional[int] = None
+    cada_pasos: int = PASOS_POR_LOTE
+
+    def activos(self) -> bool:
+        """True si hay al menos un límite."""
+        return any(x is not None for x in (self.max_celdas, self.max_segundos,
+                                           self.max_bytes_traza, self.max_memoria))
+
+
+class _ControlLimites:
+    """
+    Mide los recursos de una ejecución para `Limites`.
+
+    Los motores cuentan los caracteres de las configuraciones entregadas y
+    llaman a `agotado` una vez por lote; los caracteres se pasan a bytes de
+    una vez (exacto si la cinta y los estados son ASCII, y si no, con la
+    proporción de la última configuración). Tras cada llamada, `espera` es
+    el tamaño del lote siguiente: como mucho `cada_pasos`, y menos si en
+    esos pasos la cinta o la traza podrían pasar su límite. Ambas crecen a
+    lo sumo una celda por cinta y paso, así que la traza de los n pasos
+    siguientes no pasa de n·ℓ + c·n(n+1)/2 bytes (ℓ: última configuración,
+    c: bytes del símbolo más largo por cinta).
+    """
+
+    __slots__ = ('limites', 'inicio', 'ascii', 'cintas', 'crecimiento', 'caracteres',
+                 'bytes', 'limite', 'valor', 'espera')
+
+    def __init__(self, limites: Limites, mt: 'MaquinaTuring'):
+        if limites.cada_pasos < 1:
+            raise ValueError("cada_pasos debe ser positivo")
+        if limites.max_memoria is not None and memoria_residente() is None:
+            raise ValueError("No se puede medir la memoria residente en esta plataforma.")
+        self.limites = limites
+        self.inicio = time.monotonic()
+        simbolos = mt.Gamma if mt.cintas == 1 else {s for t in mt.Gamma for s in t}
+        self.ascii = all(s.isascii() for s in simbolos) and all(q.isascii() for q in mt.Q)
+        self.cintas = mt.cintas
+        self.crecimiento = mt.cintas * max(len(s.encode('utf-8')) for s in simbolos)
+        self.caracteres = 0
+        self.bytes = 0.0
+        self.limite = self.valor = None
+        self.espera = limites.cada_pasos
+
+    def agotado(self, celdas: int, caracteres: int, ultima: str,
+                configs: int) -> Optional[str]:
+        """
+        El motivo del primer límite agotado, o None.
+
+        Args:
+            celdas: Celdas del tramo de cinta en uso
+            caracteres: Caracteres de las configuraciones entregadas
+            ultima: Última configuración entregada
+            configs: Configuraciones entregadas
+        """
+        lim = self.limites
+        espera = lim.cada_pasos
+        if lim.max_celdas is not None:
+            if celdas > lim.max_celdas:
+                return self._agotar(lim.max_celdas, celdas, MOTIVO_MAX_CELDAS)
+            espera = min(espera, (lim.max_celdas - celdas) // self.cintas + 1)
+        if lim.max_bytes_traza is not None:
+            nuevos = caracteres - self.caracteres
+            por_linea = len(ultima) + 1
+            if not self.ascii and ultima:
+                proporcion = len(ultima.encode('utf-8')) / len(ultima)
+                nuevos *= proporcion
+                por_linea = len(ultima) * proporcion + 1
+            self.bytes += nuevos
+            self.caracteres = caracteres
+            total = round(self.bytes) + configs
+            if total > lim.max_bytes_traza:
+                return self._agotar(lim.max_bytes_traza, total, MOTIVO_MAX_TRAZA)
+            # Mayor n con n·ℓ + c·n(n+1)/2 <= lo que queda
+            c = self.crecimiento
+            resto = lim.max_bytes_traza - total
+            n = (math.sqrt((por_linea + c / 2) ** 2 + 2 * c * resto) - por_linea - c / 2) / c
+            espera = min(espera, int(n) + 1)
+        self.espera = espera
+        if lim.max_segundos is not None:
+            segundos = time.monotonic() - self.inicio
+            if segundos > lim.max_segundos:
+                return self._agotar(lim.max_segundos, round(segundos, 3), MOTIVO_MAX_TIEMPO)
+        if lim.max_memoria is not None:
+            memoria = memoria_residente()
+            if memoria > lim.max_memoria:
+                return self._agotar(lim.max_memoria, memoria, MOTIVO_MAX_MEMORIA)
+        return None
+
+    def supera_celdas(self, cota: int) -> bool:
+        """
+        True si una cota del tramo en uso pasa de max_celdas. Sin traza, los
+        motores miden el tramo exacto solo entonces, y si no pasan la cota.
+        """
+        tope = self.limites.max_celdas
+        return tope is not None and cota > tope
+
+    def _agotar(self, limite, valor, motivo: str) -> str:
+        self.limite, self.valor = limite, valor
+        return motivo
+
+    def aviso(self, motivo: str, pasos: int) -> str:
+        """La línea AVISO_LIMITE del límite agotado."""
+        return AVISO_LIMITE.format(motivo=motivo, limite=self.limite, valor=self.valor,
+                                   pasos=pasos)
+
+
+def _control_limites(limites: Optional[Limites],
+                     mt: 'MaquinaTuring') -> Optional[_ControlLimites]:
+    """Control de límites de una ejecución, o None si no hay ninguno."""
+    if limites is None or not limites.activos():
+        return None
+    return _ControlLimites(limites, mt)
+
+
+class _DetectorCiclos:
+    """
+    Detecta configuraciones repetidas con el esquema de Brent.
+
+    Guarda una sola configuración (la observada en el paso 1, 2, 4, 8...) y
+    compara cada configuración nueva contra ella: si la máquina entra en un
+    ciclo, se detecta en O(μ + λ) pasos usando memoria O(cinta). La cinta
+    solo se compara cuando coinciden estado y cabeza.
+    """
+
+    __slots__ = ('prox', 'obs', 'estado', 'cabeza', 'cinta')
+
+    def __init__(self):
+        self.prox = 1
+        self.obs = 0
+        self.estado = None
+        self.cabeza = None
+        self.cinta = None
+
+    def repetida(self, q, head: int, foto) -> bool:
+        """
+        Registra una configuración; True si repite la guardada.
+
+        Args:
+            q: Estado actual
+            head: Posición de la cabeza
+            foto: Función sin argumentos que devuelve la cinta normalizada
+        """
+        self.obs += 1
+        if head == self.cabeza and q == self.estado and foto() == self.cinta:
+            return True
+        if self.obs >= self.prox:
+            self.prox *= 2
+            self.estado, self.cabeza, self.cinta = q, head, foto()
+        return False
+
+
+@dataclass
+class PuntoControl:
+    """
+    Estado completo de una ejecución de `iter_configs` tras un paso.
+
+    Basta para reanudarla exactamente desde ahí (ver `iter_configs(desde=...)`).
+    De la cinta solo se guarda el tramo no-blanco, así que su tamaño no
+    depende de cuántos pasos (ni cuántas configuraciones) lleva la ejecución.
+
+    Atributos:
+        estado: Estado actual
+        cabeza: Posición de la cabeza
+        pasos: Transiciones aplicadas
+        configuraciones: Configuraciones ya entregadas
+        inicio_cinta: Celda del primer símbolo de `cinta` (None si está en blanco)
+        cinta: Símbolos entre la primera y la última celda no-blanco
+        detector: Estado de la detección de ciclos como lista
+            [prox, obs, estado, cabeza, inicio_cinta, cinta], o None
+    """
+    estado: State
+    cabeza: int
+    pasos: int
+    configuraciones: int
+    inicio_cinta: Optional[int]
+    cinta: List[Symbol]
+    detector: Optional[list] = None
+
+
+class EjecucionMT:
+    """
+    Iterador sobre las configuraciones de una ejecución (ver `iter_configs`).
+
+    Mientras se itera no guarda las configuraciones ya entregadas. Una vez
+    agotado, `terminada` es True y los atributos describen el estado final:
+
+        estado: Estado en que se detuvo la máquina
+        cabeza: Posición final de la cabeza (con varias cintas, una tupla
+            con la de cada una)
+        pasos: Transiciones aplicadas
+        configuraciones: Configuraciones entregadas (sin contar avisos '#')
+        motivo: Por qué terminó sin parar (MOTIVO_*), o None
+        aviso_limite: Si se agotó uno de los `Limites`, la línea
+            AVISO_LIMITE con que terminó (None en los demás casos)
+    """
+
+    def __init__(self, mt: 'MaquinaTuring'):
+        self.mt = mt
+        self.estado: Optional[State] = None
+        self.cabeza: Optional[int] = None
+        self.pasos = 0
+        self.configuraciones = 0
+        self.motivo: Optional[str] = None
+        self.aviso_limite: Optional[str] = None
+        self.terminada = False
+        self._gen = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self._gen)
+
+    @property
+    def limite_alcanzado(self) -> bool:
+        """True si la ejecución se cortó por max_steps."""
+        return self.motivo == MOTIVO_MAX_STEPS
+
+    def _terminar(self, q: State, head: int, steps: int, configs: int,
+                  motivo: Optional[str] = None):
+        self.estado = q
+        self.motivo = motivo
+        self.cabeza = head
+        self.pasos = steps
+        self.configuraciones = configs
+        self.terminada = True
+
+    @property
+    def veredicto(self) -> Optional[str]:
+        """ACEPTA, RECHAZA, LOOP o DETENIDO (None si aún no termina)."""
+        if not self.terminada:
+            return None
+        if self.estado == self.mt.qacc:
+            return ACEPTA
+        if self.estado == self.mt.qrej:
+            return RECHAZA
+        if self.motivo is not None:
+            return LOOP
+        return DETENIDO
+
+
+@dataclass
+class ResultadoMT:
+    """
+    Resultado de `MaquinaTuring.run` (ejecución sin traza).
+
+    Atributos:
+        veredicto: ACEPTA, RECHAZA, LOOP o DETENIDO
+        pasos: Transiciones aplicadas
+        estado: Estado final
+        cabeza: Posición final de la cabeza
+        cinta: Contenido final entre la primera y la última celda no-blanco
+        inicio_cinta: Índice de la primera celda de `cinta`
+        extension: Celdas del tramo más amplio de cinta usado (entrada y
+            posiciones visitadas por la cabeza)
+        motivo: Con LOOP, MOTIVO_MAX_STEPS o el ciclo probado (y `pasos`
+            es el paso en que se probó); None en los demás casos
+        cintas: Con varias cintas, (cabeza, cinta, inicio_cinta) de cada
+            una; cabeza, cinta e inicio_cinta describen la primera
+    """
+    veredicto: str
+    pasos: int
+    estado: State
+    cabeza: int
+    cinta: str
+    inicio_cinta: int
+    extension: int
+    motivo: Optional[str] = None
+    cintas: Optional[List[Tuple[int, str, int]]] = None
+
+
+@dataclass
+class EstadisticasMT:
+    """
+    Instrumentación de una ejecución (ver `MaquinaTuring.estadisticas`).
+
+    Los histogramas agrupan por potencias de 2: la clave k cuenta los
+    valores en [k, 2k).
+
+    Atributos:
+        veredicto, pasos, motivo: Como en ResultadoMT
+        transiciones: Veces que se aplicó cada δ(q, a)
+        pasos_por_estado: Pasos dados desde cada estado
+        movimientos: Cantidad de movimientos 'L', 'R', 'S' y 'L_tope'
+            (L en el tope izquierdo: la cabeza no se mueve)
+        inversiones: Cambios de sentido de la cabeza (L tras R o R tras L)
+        tramos: Histograma de la longitud de los tramos de movimiento en
+            un mismo sentido
+        extension: Histograma, sobre los pasos, del ancho del tramo
+            no-blanco de la cinta
+    """
+    veredicto: str
+    pasos: int
+    motivo: Optional[str]
+    transiciones: Dict[Tuple[State, Symbol], int]
+    pasos_por_estado: Dict[State, int]
+    movimientos: Dict[str, int]
+    inversiones: int
+    tramos: Dict[int, int]
+    extension: Dict[int, int]
+
+    def a_json(self) -> dict:
+        """Versión serializable a JSON (claves como texto, más usadas primero)."""
+        trans = sorted(self.transiciones.items(), key=lambda kv: (-kv[1], kv[0]))
+        return {
+            'veredicto': self.veredicto,
+            'pasos': self.pasos,
+            'motivo': self.motivo,
+            'transiciones': [{'estado': q, 'simbolo': a, 'veces': n} for (q, a), n in trans],
+            'pasos_por_estado': dict(sorted(self.pasos_por_estado.items(),
+                                            key=lambda kv: (-kv[1], kv[0]))),
+            'movimientos': self.movimientos,
+            'inversiones': self.inversiones,
+            'tramos': {str(k): n for k, n in sorted(self.tramos.items())},
+            'extension': {str(k): n for k, n in sorted(self.extension.items())},
+        }
 
 
 class MaquinaTuring:
     """
     Máquina de Turing determinista según notación de clase.
     M = (Q, Σ, Γ, δ, q0, q_accept, q_reject)
+
+    Con `cintas` = k > 1, δ lee y escribe una tupla de k símbolos y mueve
+    cada cabeza por separado (ver `DeltaK`); la entrada va en la primera
+    cinta y las demás empiezan en blanco.
     """
     
     def __init__(self,
@@ -29,7 +517,9 @@ class MaquinaTuring:
                  qrej: State,
                  delta: Delta,
                  allow_S: bool = False,
-                 left_boundary: int = 0):
+                 left_boundary: int = 0,
+                 validar: bool = True,
+                 cintas: int = 1):
         """
         Inicializa la Máquina de Turing.
         
@@ -44,6 +534,9 @@ class MaquinaTuring:
             delta: Función de transición
             allow_S: Permitir movimiento S (quedarse)
             left_boundary: Índice mínimo de la cinta (tope izquierdo)
+            validar: Si False, no se llama a `validate` (quien construye la
+                MT ya la validó, como hace el parser)
+            cintas: Número de cintas k (con k > 1, delta es un DeltaK)
         """
         self.Q = Q
         self.Sigma = Sigma
@@ -55,7 +548,33 @@ class MaquinaTuring:
         self.delta = delta
         self.allow_S = allow_S
         self.left_boundary = left_boundary
-        self.validate()
+        self.cintas = cintas
+        if validar:
+            self.validate()
+
+    def __setstate__(self, state):
+        # Al deserializar (p. ej. en un proceso del pool) la compilación
+        # guardada sigue siendo válida, pero su firma usa id(delta)
+        state.setdefault('cintas', 1)
+        self.__dict__.update(state)
+        comp = state.get('_compilada')
+        if comp is not None:
+            comp._firma = comp.firma_de(self)
+
+    def huella(self) -> str:
+        """
+        Huella SHA-256 de la especificación (independiente del orden de
+        los conjuntos y de δ). Identifica la máquina en los puntos de control.
+        """
+        partes = [
+            repr(sorted(self.Q)), repr(sorted(self.Sigma)), repr(sorted(self.Gamma)),
+            repr((self.blank, self.q0, self.qacc, self.qrej,
+                  self.allow_S, self.left_boundary)),
+            repr(sorted(self.delta.items())),
+        ]
+        if self.cintas > 1:
+            partes.append(repr(self.cintas))
+        return hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()
 
     def validate(self):
         """Valida la especificación de la MT."""
@@ -75,21 +594,34 @@ class MaquinaTuring:
         if not self.Sigma.issubset(self.Gamma):
             raise ValueError("Sigma debe ser subconjunto de Gamma.")
 
-        # Validar transiciones
+        # Validar transiciones (con una cinta, como tuplas de un elemento)
         allowed_moves = {'L', 'R'} | ({'S'} if self.allow_S else set())
+        k = self.cintas
+        if k < 1:
+            raise ValueError("El número de cintas debe ser al menos 1.")
         for (q, a), (qp, b, m) in self.delta.items():
+            if k == 1:
+                a, b, m = (a,), (b,), (m,)
+            elif not (isinstance(a, tuple) and isinstance(b, tuple) and isinstance(m, tuple)
+                      and len(a) == len(b) == len(m) == k):
+                raise ValueError(f"δ({q},{a}) debe leer, escribir y mover {k} cintas.")
             if q not in self.Q or qp not in self.Q:
-                raise ValueError(f"Estados en δ({q},{a}) deben pertenecer a Q.")
-            if a not in self.Gamma or b not in self.Gamma:
-                raise ValueError(f"Símbolos en δ({q},{a}) deben pertenecer a Gamma.")
-            if m not in allowed_moves:
-                raise ValueError(f"Movimiento inválido '{m}'. Permitidos: {sorted(allowed_moves)}")
+                raise ValueError(f"Estados en δ({q},{','.join(a)}) deben pertenecer a Q.")
+            if not self.Gamma.issuperset(a) or not self.Gamma.issuperset(b):
+                raise ValueError(f"Símbolos en δ({q},{','.join(a)}) deben pertenecer a Gamma.")
+            for mi in m:
+                if mi not in allowed_moves:
+                    raise ValueError(f"Movimiento inválido '{mi}'. Permitidos: {sorted(allowed_moves)}")
 
     def simulate(self,
                  w: str,
                  max_steps: Optional[int] = None,
                  config_variant: str = 'u q v',
-                 implicit_reject_on_undef: bool = True) -> List[str]:
+                 implicit_reject_on_undef: bool = True,
+                 out: Optional[TextIO] = None,
+                 engine: str = 'auto',
+                 detect_loops: bool = False,
+                 limites: Optional[Limites] = None) -> List[str]:
         """
         Simula la ejecución de la MT sobre la cadena w.
         
@@ -98,44 +630,391 @@ class MaquinaTuring:
             max_steps: Límite de pasos (None = sin límite)
             config_variant: Formato de configuración ('u q v' o 'uqv')
             implicit_reject_on_undef: Si True, rechaza cuando no hay transición
+            out: Flujo de salida opcional; si se indica, cada configuración se
+                escribe directamente en él (una por línea) en lugar de acumularse
+            engine: Motor a usar: 'auto', 'compilado' o 'referencia'
+            detect_loops: Cortar al probarse un ciclo infinito (ver `iter_configs`)
+            limites: Límites de celdas, tiempo, traza y memoria (ver `Limites`)
             
         Returns:
             Lista de configuraciones desde la inicial hasta el paro
+            (vacía si se indicó `out`)
         """
-        # Inicializar cinta con blanco por defecto
-        tape = defaultdict(lambda: self.blank)
-        head = self.left_boundary
-        
-        # Escribir la palabra de entrada
-        for i, ch in enumerate(w):
+        ejecucion = self.iter_configs(w, max_steps, config_variant, implicit_reject_on_undef,
+                                      engine=engine, detect_loops=detect_loops,
+                                      limites=limites)
+        if out is None:
+            return list(ejecucion)
+        write = out.write
+        for c in ejecucion:
+            write(c)
+            write('\n')
+        return []
+
+    def iter_configs(self,
+                     w: str,
+                     max_steps: Optional[int] = None,
+                     config_variant: str = 'u q v',
+                     implicit_reject_on_undef: bool = True,
+                     engine: str = 'auto',
+                     detect_loops: bool = False,
+                     desde: Optional[PuntoControl] = None,
+                     cada_pasos: Optional[int] = None,
+                     al_punto: Optional[Callable[[PuntoControl], None]] = None,
+                     limites: Optional[Limites] = None
+                     ) -> 'EjecucionMT':
+        """
+        Versión en flujo de `simulate`: entrega cada configuración al producirse.
+
+        La memoria usada no depende del número de pasos. Al agotarse el
+        iterador, su estado final (estado, pasos, veredicto...) queda
+        disponible en el objeto devuelto.
+
+        Args:
+            w: Cadena de entrada
+            max_steps: Límite de pasos (None = sin límite)
+            config_variant: Formato de configuración ('u q v' o 'uqv')
+            implicit_reject_on_undef: Si True, rechaza cuando no hay transición
+            engine: 'auto' usa el motor compilado cuando es posible (|Γ| <= 256),
+                'compilado' lo exige y 'referencia' usa el intérprete sobre δ
+                (con varias cintas siempre se usa motor_multicinta)
+            detect_loops: Si True, corta en cuanto se prueba que la máquina no
+                para (configuración repetida, deriva a la derecha sobre
+                blancos o estado condenado, ver analisis_mt) y termina la
+                traza con el aviso correspondiente
+            desde: Reanudar desde este punto de control en lugar de empezar
+                en q0 (las configuraciones hasta él no se vuelven a entregar)
+            cada_pasos: Cada cuántos pasos llamar a `al_punto`
+            al_punto: Recibe un PuntoControl cada `cada_pasos` pasos, justo
+                después de entregarse la configuración de ese paso
+            limites: Límites de recursos; el primero que se agota corta la
+                traza con una línea AVISO_LIMITE (ver `Limites`)
+
+        Returns:
+            EjecucionMT iterable sobre las configuraciones
+        """
+        # Validar la palabra de entrada (antes de empezar a iterar)
+        for ch in w:
             if ch not in self.Sigma:
                 raise ValueError(f"Símbolo de entrada '{ch}' no pertenece a Sigma.")
-            tape[i] = ch
-        
-        q = self.q0
-        configs: List[str] = []
-        configs.append(self._format_config(tape, q, head, config_variant))
 
+        if engine not in ('auto', 'compilado', 'referencia'):
+            raise ValueError("engine debe ser 'auto', 'compilado' o 'referencia'")
+        if self.cintas > 1:
+            if desde is not None or cada_pasos:
+                raise ValueError("Los puntos de control solo admiten máquinas de una cinta.")
+            return self.compilar().iter_configs(w, max_steps, config_variant,
+                                                implicit_reject_on_undef, detect_loops,
+                                                limites)
+        if engine == 'compilado' or (engine == 'auto' and len(self.Gamma) <= 256):
+            return self.compilar().iter_configs(w, max_steps, config_variant,
+                                                implicit_reject_on_undef, detect_loops,
+                                                desde, cada_pasos, al_punto, limites)
+
+        # Cinta paginada con extensión no-blanco incremental
+        if desde is None:
+            tape = CintaPaginada(self.Gamma, self.blank, w)
+        else:
+            tape = CintaPaginada(self.Gamma, self.blank)
+            if desde.cinta:
+                tape.cargar(desde.inicio_cinta, desde.cinta)
+        fmt = _FormateadorConfig(tape, config_variant, self.left_boundary)
+        ejecucion = EjecucionMT(self)
+        ejecucion._gen = self._generar_configs(tape, fmt, ejecucion, max_steps,
+                                               implicit_reject_on_undef, detect_loops,
+                                               desde, cada_pasos, al_punto,
+                                               _control_limites(limites, self))
+        return ejecucion
+
+    def run(self,
+            w: str,
+            max_steps: Optional[int] = None,
+            implicit_reject_on_undef: bool = True,
+            engine: str = 'auto',
+            detect_loops: bool = True,
+            limites: Optional[Limites] = None) -> ResultadoMT:
+        """
+        Ejecuta la MT sobre w sin formatear configuraciones.
+
+        Sigue exactamente la misma semántica que `simulate`, pero solo
+        devuelve el resultado final: pensado para cuando basta el veredicto.
+
+        Args:
+            w: Cadena de entrada
+            max_steps: Límite de pasos (None = sin límite)
+            implicit_reject_on_undef: Si True, rechaza cuando no hay transición
+            engine: 'auto', 'compilado' o 'referencia' (ver `iter_configs`), o
+                'generado' para el código Python especializado de codegen_mt
+            detect_loops: Si True (por defecto), termina con LOOP en cuanto
+                se prueba que la máquina no para, sin agotar max_steps
+            limites: Presupuestos de celdas, tiempo y memoria (ver `Limites`;
+                sin traza no hay max_bytes_traza). El que se agota primero
+                termina con LOOP y su MOTIVO_MAX_*; no aplica a 'generado'
+
+        Returns:
+            ResultadoMT con veredicto, pasos, estado, cabeza y cinta final
+        """
+        for ch in w:
+            if ch not in self.Sigma:
+                raise ValueError(f"Símbolo de entrada '{ch}' no pertenece a Sigma.")
+
+        if engine not in ('auto', 'compilado', 'referencia', 'generado'):
+            raise ValueError("engine debe ser 'auto', 'compilado', 'referencia' o 'generado'")
+        if limites is not None and limites.max_bytes_traza is not None:
+            raise ValueError("max_bytes_traza solo aplica a iter_configs (run no tiene traza)")
+        control = _control_limites(limites, self)
+        if engine == 'generado' and self.cintas == 1:
+            if control is not None:
+                raise ValueError("El motor 'generado' no admite límites de recursos.")
+            import codegen_mt
+            return codegen_mt.run(self, w, max_steps, implicit_reject_on_undef, detect_loops)
+        if self.cintas > 1 or engine == 'compilado' or (engine == 'auto'
+                                                       and len(self.Gamma) <= 256):
+            return self.compilar().run(w, max_steps, implicit_reject_on_undef,
+                                       detect_loops=detect_loops, control=control)
+
+        # Lectura y escritura directas sobre la página de la cabeza; la
+        # extensión no-blanco se recalcula solo cuando hace falta
+        tape = CintaPaginada(self.Gamma, self.blank, w)
+        paginas, alfabeto, codigo = tape.paginas, tape.alfabeto, tape.codigo
+        head = head_max = self.left_boundary
+        n_pag = head >> BITS_PAGINA
+        pag = paginas.get(n_pag)
+        blank = self.blank
+        fin_entrada = len(w) - 1
+        deriva = self._estados_deriva() if detect_loops else set()
+        condenados = self._estados_condenados() if detect_loops else frozenset()
+        detector = _DetectorCiclos() if detect_loops else None
+
+        def foto():
+            tape.recalcular()
+            return tape.foto()
+
+        # Cota del tramo en uso para max_celdas: la entrada y lo visitado
+        izq = min(self.left_boundary, 0) if w else self.left_boundary
+        prox_limite = 1 if control else -1
+
+        q = self.q0
         steps = 0
+        motivo = None
+        while q != self.qacc and q != self.qrej:
+            if q in condenados:
+                motivo = MOTIVO_CONDENADO
+                break
+            a = blank if pag is None else alfabeto[pag[head & MASCARA_PAGINA]]
+            key = (q, a)
+            if key not in self.delta:
+                if implicit_reject_on_undef:
+                    q = self.qrej
+                break
+
+            qp, b, m = self.delta[key]
+            if b != a:
+                if pag is None:
+                    pag = tape.pagina(n_pag)
+                pag[head & MASCARA_PAGINA] = codigo[b]
+            if m == 'L':
+                if head > self.left_boundary:
+                    head -= 1
+            elif m == 'R':
+                head += 1
+                if head > head_max:
+                    head_max = head
+                    # Celda nunca visitada tras la entrada: todo a la derecha es blanco
+                    if qp in deriva and head > fin_entrada:
+                        motivo = MOTIVO_DERIVA
+            elif m == 'S':
+                if not self.allow_S:
+                    raise RuntimeError("Movimiento 'S' no permitido.")
+            else:
+                raise RuntimeError(f"Movimiento inválido '{m}' en ejecución.")
+            q = qp
+            if head >> BITS_PAGINA != n_pag:
+                n_pag = head >> BITS_PAGINA
+                pag = paginas.get(n_pag)
+
+            steps += 1
+            if motivo is None and detector is not None and detector.repetida(q, head, foto):
+                motivo = MOTIVO_CICLO
+            if motivo is not None:
+                break
+            if max_steps is not None and steps >= max_steps:
+                motivo = MOTIVO_MAX_STEPS
+                break
+            if steps == prox_limite:
+                celdas = max(head_max, fin_entrada) - izq + 1
+                if control.supera_celdas(celdas):
+                    tape.recalcular()
+                    L, R = min(self.left_boundary, head), head
+                    if tape.lo <= tape.hi:
+                        L, R = min(L, tape.lo), max(R, tape.hi)
+                    celdas = R - L + 1
+                motivo = control.agotado(celdas, 0, '', 0)
+                prox_limite = steps + control.espera
+                if motivo is not None:
+                    break
+
+        tape.recalcular()
+        if tape.lo <= tape.hi:
+            cinta, inicio = tape.texto(tape.lo, tape.hi), tape.lo
+        else:
+            cinta, inicio = '', head
+        return self._resultado(q, head, steps, motivo, cinta, inicio, len(w), head_max)
+
+    def estadisticas(self,
+                     w: str,
+                     max_steps: Optional[int] = None,
+                     implicit_reject_on_undef: bool = True,
+                     detect_loops: bool = True) -> EstadisticasMT:
+        """
+        Ejecuta la MT sobre w contando transiciones, pasos por estado,
+        movimientos, inversiones y extensión de la cinta.
+
+        Es una pasada aparte con su propio bucle (motor compilado), así que
+        `simulate` y `run` no pagan nada por la instrumentación.
+
+        Args:
+            w: Cadena de entrada
+            max_steps: Límite de pasos (None = sin límite)
+            implicit_reject_on_undef: Si True, rechaza cuando no hay transición
+            detect_loops: Cortar al probarse un ciclo infinito (ver `run`)
+
+        Returns:
+            EstadisticasMT
+        """
+        if self.cintas > 1:
+            raise ValueError("Las estadísticas solo admiten máquinas de una cinta.")
+        for ch in w:
+            if ch not in self.Sigma:
+                raise ValueError(f"Símbolo de entrada '{ch}' no pertenece a Sigma.")
+        return self.compilar().estadisticas(w, max_steps, implicit_reject_on_undef,
+                                            detect_loops)
+
+    def _estados_deriva(self) -> Set[State]:
+        """
+        Estados q con δ(q, blanco) = (q, x, R).
+
+        Si la máquina está en uno de ellos con la cabeza a la derecha de
+        toda celda no-blanco, avanza para siempre sobre blancos.
+        """
+        deriva = set()
+        for q in self.Q - {self.qacc, self.qrej}:
+            t = self.delta.get((q, self.blank))
+            if t is not None and t[0] == q and t[2] == 'R':
+                deriva.add(q)
+        return deriva
+
+    def _estados_condenados(self) -> frozenset:
+        """
+        Estados condenados de la MT (ver `analisis_mt.estados_condenados`),
+        recalculados solo si la especificación cambia.
+        """
+        from analisis_mt import estados_condenados
+
+        firma = (id(self.delta), len(self.delta), self.allow_S, self.qacc, self.qrej,
+                 len(self.Q), len(self.Gamma), self.cintas)
+        guardado = getattr(self, '_condenados', None)
+        if guardado is None or guardado[0] != firma:
+            guardado = self._condenados = (firma, frozenset(estados_condenados(self)))
+        return guardado[1]
+
+    def _resultado(self, q: State, head: int, steps: int, motivo: Optional[str],
+                   cinta: str, inicio: int, n: int, head_max: int) -> ResultadoMT:
+        """Arma el ResultadoMT final de una ejecución."""
+        if q == self.qacc or q == self.qrej:
+            veredicto = ACEPTA if q == self.qacc else RECHAZA
+            motivo = None
+        elif motivo is not None:
+            veredicto = LOOP
+        else:
+            veredicto = DETENIDO
+        izq = min(self.left_boundary, 0) if n else self.left_boundary
+        der = max(n - 1, head_max)
+        return ResultadoMT(veredicto, steps, q, head, cinta, inicio, der - izq + 1, motivo)
+
+    def compilar(self):
+        """
+        Devuelve la forma compilada de la MT (ver motor_mt, o motor_multicinta
+        con varias cintas), reutilizando la última compilación mientras la
+        especificación no cambie.
+        """
+        if self.cintas > 1:
+            from motor_multicinta import compilar
+        else:
+            from motor_mt import compilar
+
+        comp = getattr(self, '_compilada', None)
+        if comp is None or comp.firma() != comp.firma_de(self):
+            comp = self._compilada = compilar(self)
+        return comp
+
+    def _generar_configs(self,
+                         tape: CintaPaginada,
+                         fmt: '_FormateadorConfig',
+                         ejecucion: 'EjecucionMT',
+                         max_steps: Optional[int],
+                         implicit_reject_on_undef: bool,
+                         detect_loops: bool = False,
+                         desde: Optional[PuntoControl] = None,
+                         cada_pasos: Optional[int] = None,
+                         al_punto: Optional[Callable[[PuntoControl], None]] = None,
+                         control: Optional[_ControlLimites] = None):
+        """Bucle principal de la simulación como generador de configuraciones."""
+        deriva = self._estados_deriva() if detect_loops else set()
+        condenados = self._estados_condenados() if detect_loops else frozenset()
+        detector = _DetectorCiclos() if detect_loops else None
+        motivo = None
+        # Caracteres entregados y última configuración (para max_bytes_traza)
+        traza = 0
+        linea = ''
+        if desde is None:
+            q = self.q0
+            head = self.left_boundary
+            linea = fmt.render(q, head)
+            traza += len(linea)
+            yield linea
+            configs = 1
+            steps = 0
+        else:
+            # La configuración actual ya se entregó antes del punto de control
+            q, head = desde.estado, desde.cabeza
+            configs, steps = desde.configuraciones, desde.pasos
+            if detector is not None and desde.detector is not None:
+                prox, obs, dq, dhead, dinicio, dcinta = desde.detector
+                detector.prox, detector.obs = prox, obs
+                detector.estado, detector.cabeza = dq, dhead
+                if dq is not None:
+                    detector.cinta = () if dinicio is None else (dinicio,) + tuple(dcinta)
+        prox_punto = steps + cada_pasos if cada_pasos else -1
+        prox_limite = steps + 1 if control else -1
+
         while True:
             # Verificar si alcanzamos un estado de paro
             if q == self.qacc or q == self.qrej:
                 break
+            # Con detect_loops: no para desde aquí (se comprueba al entrar en q)
+            if q in condenados:
+                motivo = MOTIVO_CONDENADO
+                ejecucion._terminar(q, head, steps, configs, motivo)
+                yield AVISOS[motivo].format(max_steps=max_steps, pasos=steps)
+                return
             
             # Leer símbolo actual
-            a = tape[head]
+            a = tape.leer(head)
             key = (q, a)
             
             # Buscar transición
             if key not in self.delta:
                 if implicit_reject_on_undef:
                     q = self.qrej
-                    configs.append(self._format_config(tape, q, head, config_variant))
+                    yield fmt.render(q, head)
+                    configs += 1
                 break
             
             # Aplicar transición
             qp, b, m = self.delta[key]
-            tape[head] = b
+            if b != a:
+                tape.escribir(head, b)
             
             # Mover cabeza
             if m == 'L':
@@ -153,63 +1032,75 @@ class MaquinaTuring:
             
             # Cambiar estado
             q = qp
-            configs.append(self._format_config(tape, q, head, config_variant))
+            linea = fmt.render(q, head)
+            traza += len(linea)
+            yield linea
+            configs += 1
 
             steps += 1
-            if max_steps is not None and steps >= max_steps:
-                configs.append(f"# [Aviso] Se alcanzó el límite de pasos ({max_steps}). Posible ciclo infinito.")
-                break
-        
-        return configs
+            if detect_loops:
+                if q in deriva and (tape.lo > tape.hi or head > tape.hi):
+                    motivo = MOTIVO_DERIVA
+                elif detector.repetida(q, head, tape.foto):
+                    motivo = MOTIVO_CICLO
+            if motivo is None and max_steps is not None and steps >= max_steps:
+                motivo = MOTIVO_MAX_STEPS
+            if motivo is not None:
+                ejecucion._terminar(q, head, steps, configs, motivo)
+                yield AVISOS[motivo].format(max_steps=max_steps, pasos=steps)
+                return
+            if steps == prox_limite and q != self.qacc and q != self.qrej:
+                L = min(self.left_boundary, head)
+                R = head
+                if tape.lo <= tape.hi:
+                    L = min(L, tape.lo)
+                    R = max(R, tape.hi)
+                motivo = control.agotado(R - L + 1, traza, linea, configs)
+                prox_limite = steps + control.espera
+                if motivo is not None:
+                    ejecucion._terminar(q, head, steps, configs, motivo)
+                    ejecucion.aviso_limite = control.aviso(motivo, steps)
+                    yield ejecucion.aviso_limite
+                    return
+            if steps == prox_punto:
+                prox_punto += cada_pasos
+                al_punto(self._punto_control(tape, q, head, steps, configs, detector))
 
-    def _format_config(self, tape: defaultdict, q: State, head: int, variant: str) -> str:
-        """
-        Formatea una configuración en notación u q v.
-        
-        Args:
-            tape: Cinta actual
-            q: Estado actual
-            head: Posición de la cabeza
-            variant: 'u q v' (con espacios) o 'uqv' (compacto)
-            
-        Returns:
-            Configuración formateada
-        """
-        L, R = self._window_bounds(tape, head)
-        
-        # Parte izquierda (antes de la cabeza)
-        u = ''.join(tape[i] for i in range(L, head))
-        
-        # Parte derecha (desde la cabeza)
-        v = ''.join(tape[i] for i in range(head, R + 1))
-        
-        if variant == 'u q v':
-            return f"{u} {q} {v}"
-        elif variant == 'uqv':
-            return f"{u}{q}{v}"
-        else:
-            raise ValueError("config_variant debe ser 'uqv' o 'u q v'")
+        ejecucion._terminar(q, head, steps, configs)
 
-    def _window_bounds(self, tape: defaultdict, head: int) -> Tuple[int, int]:
-        """
-        Determina el rango [L, R] de la cinta a mostrar.
-        Incluye celdas no-blanco y la posición de la cabeza.
-        """
-        nonblank = [i for i, s in tape.items() if s != self.blank]
-        if nonblank:
-            L = min(min(nonblank), head)
-            R = max(max(nonblank), head)
+    def _punto_control(self, tape: CintaPaginada, q: State, head: int, steps: int,
+                       configs: int, detector: Optional[_DetectorCiclos]) -> PuntoControl:
+        """PuntoControl del motor de referencia (cinta como CintaPaginada)."""
+        if tape.lo <= tape.hi:
+            inicio = tape.lo
+            cinta = tape.simbolos(tape.lo, tape.hi)
         else:
-            L = R = head
-        
-        # No permitir L < left_boundary
-        L = min(L, self.left_boundary)
-        return L, R
+            inicio, cinta = None, []
+        det = None
+        if detector is not None:
+            foto = detector.cinta or (None,)
+            det = [detector.prox, detector.obs, detector.estado, detector.cabeza,
+                   foto[0], list(foto[1:])]
+        return PuntoControl(q, head, steps, configs, inicio, cinta, det)
+
+    def _transiciones(self):
+        """Pares ((q, a), (q', b, M)) de δ, como los dibuja `to_dot`."""
+        return self.delta.items()
 
-    def to_dot(self) -> str:
+    def to_dot(self, conteos: Optional[Dict[Tuple[State, Symbol], int]] = None,
+               condenados: Optional[Set[State]] = None) -> str:
         """
         Genera representación en formato Graphviz DOT.
         
+        Args:
+            conteos: Veces que se aplicó cada δ(q, a) (p. ej.
+                `estadisticas(w).transiciones`); si se indica, cada etiqueta
+                muestra su conteo y las aristas más usadas se dibujan más
+                gruesas y en rojo
+            condenados: Estados a resaltar como condenados (p. ej.
+                `analisis_mt.estados_condenados(mt)`): se rellenan en rojo
+                claro con borde rojo
+        
         Returns:
             String con el código DOT del diagrama
         """
@@ -221,7 +1112,7 @@ class MaquinaTuring:
         
         # Determinar estados que realmente se usan
         used_states = {self.q0}  # Siempre incluir estado inicial
-        for (q, _), (qp, _, _) in self.delta.items():
+        for (q, _), (qp, _, _) in self._transiciones():
             used_states.add(q)
             used_states.add(qp)
         
@@ -229,6 +1120,9 @@ class MaquinaTuring:
         for state in sorted(used_states):
             if state == self.qacc or state == self.qrej:
                 lines.append(f'  {state} [shape=doublecircle, label="{state}"];')
+            elif condenados and state in condenados:
+                lines.append(f'  {state} [label="{state}", style=filled, '
+                             f'fillcolor="#f4cccc", color=red];')
             else:
                 lines.append(f'  {state} [label="{state}"];')
         
@@ -238,14 +1132,35 @@ class MaquinaTuring:
         
         # Agrupar transiciones por (estado_origen, estado_destino)
         transitions = defaultdict(list)
-        for (q, a), (qp, b, m) in sorted(self.delta.items()):
-            label = f"{a}→{b},{m}"
+        hits = defaultdict(int)
+        for (q, a), (qp, b, m) in sorted(self._transiciones()):
+            if self.cintas > 1:
+                # Una componente por cinta: a1/a2→b1/b2,M1/M2
+                label = f"{'/'.join(a)}→{'/'.join(b)},{'/'.join(m)}"
+            else:
+                label = f"{a}→{b},{m}"
+            if conteos is not None:
+                n = conteos.get((q, a), 0)
+                label += f" ×{n}"
+                hits[(q, qp)] += n
             transitions[(q, qp)].append(label)
+        max_hits = max(hits.values(), default=0)
         
         # Generar aristas
         for (q, qp), labels in sorted(transitions.items()):
             label_str = "\\n".join(labels)
-            lines.append(f'  {q} -> {qp} [label="{label_str}"];')
+            if conteos is None:
+                lines.append(f'  {q} -> {qp} [label="{label_str}"];')
+                continue
+            # Grosor proporcional al uso; rojo desde la mitad del máximo
+            n = hits[(q, qp)]
+            ancho = 1 + 4 * n / max_hits if max_hits else 1
+            estilo = f'penwidth={ancho:.2f}'
+            if max_hits and n * 2 >= max_hits:
+                estilo += ', color=red, fontcolor=red'
+            elif n == 0:
+                estilo += ', style=dashed, color=gray'
+            lines.append(f'  {q} -> {qp} [label="{label_str}", {estilo}];')
         
         lines.append("}")
         return "\n".join(lines)
@@ -0,0 +1,976 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor compilado para MaquinaTuring.
+
+Traduce la especificación a enteros (estados y símbolos de Γ internados como
+índices pequeños) y a una tabla de transiciones plana indexada por
+`estado * |Γ| + símbolo`. La simulación corre sobre una cinta `bytearray`
+y produce exactamente las mismas configuraciones que el motor de referencia.
+"""
+
+import re
+from array import array
+from codecs import charmap_decode as _charmap_decode
+from itertools import count
+from typing import Callable, Dict, List, Optional
+
+from maquina_turing import (MaquinaTuring, EjecucionMT, ResultadoMT, PuntoControl,
+                            EstadisticasMT, Limites, State, Symbol, AVISOS, MOTIVO_CICLO,
+                            MOTIVO_CONDENADO, MOTIVO_DERIVA, MOTIVO_MAX_STEPS,
+                            _ControlLimites, _DetectorCiclos, _control_limites)
+
+# Códigos de movimiento empaquetados en la tabla
+MOV_L = 0
+MOV_R = 1
+MOV_S = 2
+MOV_INVALIDO = 3   # 'S' sin allow_S u otro movimiento no reconocido
+_MOV_INDEFINIDA = 4  # Solo en `mov`: δ(q, a) no definida
+_MOV_PARO = 5        # Solo en `mov`: q es un estado de paro
+_MOV_BARRIDO_R = 6   # Solo en `mov_barrido`: δ(q, a) = (q, a, R)
+_MOV_BARRIDO_L = 7   # Solo en `mov_barrido`: δ(q, a) = (q, a, L)
+_MOV_CONDENADO = 8   # Solo en las copias `*_condenado`: q no para (ver analisis_mt)
+
+# En `paro_condenado`: estado condenado
+_CONDENADO = 2
+
+# En `iter_pasos`: rechazo implícito (solo cambia el estado)
+MOV_SOLO_ESTADO = MOV_INVALIDO
+
+# Cota para "sin límite de pasos" en los bucles con contador explícito
+_SIN_LIMITE = 1 << 62
+
+# Entrada de la tabla: (q' << 10) | (b << 2) | mov ; -1 = δ no definida
+SIN_TRANSICION = -1
+_SHIFT_ESTADO = 10
+_SHIFT_SIMBOLO = 2
+
+
+class MaquinaCompilada:
+    """
+    Forma compilada (codificada con enteros) de una MaquinaTuring.
+
+    Atributos:
+        estados: Nombre de cada estado por índice
+        simbolos: Símbolo de Γ por índice (el blanco siempre es el 0)
+        id_estado / id_simbolo: Mapas inversos nombre -> índice
+        G: |Γ| (ancho de cada fila de la tabla)
+        tabla: array con la transición empaquetada de cada (q, a)
+        paro: bytearray con 1 en los estados de paro (qacc, qrej)
+        sig / esc / mov: La misma tabla desempaquetada para el bucle sin
+            traza: fila destino (q' * |Γ|), símbolo escrito y código de
+            movimiento (que además marca δ indefinida y estados de paro)
+        mov_barrido: Copia de `mov` que marca los autolazos de barrido
+        barrido_der / barrido_izq: Por fila de estado, búsqueda del primer
+            símbolo que corta un barrido a la derecha / símbolos que lo
+            continúan hacia la izquierda
+        filas_deriva: Filas de los estados con δ(q, blanco) = (q, x, R)
+        paro_condenado / mov_condenado / mov_barrido_condenado: Copias de
+            `paro`, `mov` y `mov_barrido` que además marcan los estados
+            condenados (2 en `paro_condenado`, _MOV_CONDENADO en toda su
+            fila), para cortar con `detect_loops` sin comprobación extra
+    """
+
+    def __init__(self, mt: MaquinaTuring):
+        if len(mt.Gamma) > 256:
+            raise ValueError("El motor compilado admite a lo sumo 256 símbolos en Gamma.")
+
+        self.mt = mt
+        self.estados: List[State] = sorted(mt.Q)
+        self.simbolos: List[Symbol] = [mt.blank] + sorted(mt.Gamma - {mt.blank})
+        self.id_estado: Dict[State, int] = {q: i for i, q in enumerate(self.estados)}
+        self.id_simbolo: Dict[Symbol, int] = {s: i for i, s in enumerate(self.simbolos)}
+        self.G = len(self.simbolos)
+        self.q0 = self.id_estado[mt.q0]
+        self.qacc = self.id_estado[mt.qacc]
+        self.qrej = self.id_estado[mt.qrej]
+
+        self.paro = bytearray(len(self.estados))
+        self.paro[self.qacc] = self.paro[self.qrej] = 1
+
+        movs = {'L': MOV_L, 'R': MOV_R}
+        if mt.allow_S:
+            movs['S'] = MOV_S
+        self.tabla = array('l', [SIN_TRANSICION]) * (len(self.estados) * self.G)
+        for (q, a), (qp, b, m) in mt.delta.items():
+            self.tabla[self.id_estado[q] * self.G + self.id_simbolo[a]] = (
+                (self.id_estado[qp] << _SHIFT_ESTADO)
+                | (self.id_simbolo[b] << _SHIFT_SIMBOLO)
+                | movs.get(m, MOV_INVALIDO)
+            )
+
+        n = len(self.tabla)
+        self.sig = array('l', [0]) * n
+        self.esc = bytearray(n)
+        self.mov = bytearray([_MOV_INDEFINIDA]) * n
+        for i, e in enumerate(self.tabla):
+            if self.paro[i // self.G]:
+                self.mov[i] = _MOV_PARO
+            elif e >= 0:
+                self.sig[i] = (e >> _SHIFT_ESTADO) * self.G
+                self.esc[i] = (e >> _SHIFT_SIMBOLO) & 0xFF
+                self.mov[i] = e & 3
+
+        # Barridos: δ(q, a) = (q, a, R|L) no cambia ni el estado ni la celda,
+        # así que un tramo de símbolos con ese autolazo se recorre de una vez
+        self.mov_barrido = bytearray(self.mov)
+        self.barrido_der: Dict[int, Callable] = {}
+        self.barrido_izq: Dict[int, bytes] = {}
+        for row in range(0, n, self.G):
+            der = bytearray()
+            izq = bytearray()
+            for a in range(self.G):
+                i = row + a
+                if self.sig[i] == row and self.esc[i] == a:
+                    if self.mov[i] == MOV_R:
+                        der.append(a)
+                        self.mov_barrido[i] = _MOV_BARRIDO_R
+                    elif self.mov[i] == MOV_L:
+                        izq.append(a)
+                        self.mov_barrido[i] = _MOV_BARRIDO_L
+            if der:
+                clase = b''.join(b'\\x%02x' % a for a in der)
+                self.barrido_der[row] = re.compile(b'[^' + clase + b']').search
+            if izq:
+                self.barrido_izq[row] = bytes(izq)
+
+        # Con la cabeza más allá de toda celda no-blanco, estos estados
+        # avanzan a la derecha para siempre
+        self.filas_deriva = frozenset(
+            row for row in range(0, n, self.G)
+            if self.mov[row] == MOV_R and self.sig[row] == row
+        )
+
+        # Desde estos estados ningún camino de δ lleva a parar
+        condenados = [self.id_estado[q] for q in mt._estados_condenados()]
+        if condenados:
+            self.paro_condenado = bytearray(self.paro)
+            self.mov_condenado = bytearray(self.mov)
+            self.mov_barrido_condenado = bytearray(self.mov_barrido)
+            fila = bytes([_MOV_CONDENADO]) * self.G
+            for q in condenados:
+                self.paro_condenado[q] = _CONDENADO
+                self.mov_condenado[q * self.G:(q + 1) * self.G] = fila
+                self.mov_barrido_condenado[q * self.G:(q + 1) * self.G] = fila
+        else:
+            self.paro_condenado = self.paro
+            self.mov_condenado = self.mov
+            self.mov_barrido_condenado = self.mov_barrido
+
+        # Decodificación rápida de la cinta a texto: con símbolos de un
+        # carácter basta una tabla charmap; si no, str.translate
+        if all(len(s) == 1 for s in self.simbolos):
+            self._tabla_dec = ''.join(self.simbolos).ljust(256, '\ufffe')
+        else:
+            self._tabla_dec = None
+        self._mapa_dec = dict(enumerate(self.simbolos))
+
+        self._firma = self.firma_de(mt)
+
+    @staticmethod
+    def firma_de(mt: MaquinaTuring) -> tuple:
+        """Datos de la MT de los que depende una compilación."""
+        return (id(mt.delta), len(mt.delta), mt.allow_S, mt.blank,
+                mt.q0, mt.qacc, mt.qrej, len(mt.Q), len(mt.Gamma), mt.cintas)
+
+    def firma(self) -> tuple:
+        """Firma de la MT en el momento de compilar."""
+        return self._firma
+
+    def decodificar(self, data) -> str:
+        """Convierte un tramo de cinta (bytes de índices) a texto."""
+        if self._tabla_dec is not None:
+            return _charmap_decode(data, 'strict', self._tabla_dec)[0]
+        return bytes(data).decode('latin-1').translate(self._mapa_dec)
+
+    def cinta_inicial(self, w: str, left_boundary: int):
+        """
+        Construye la cinta para la palabra w.
+
+        Returns:
+            Tupla (cinta, base) donde la celda i está en `cinta[i - base]`
+        """
+        base = min(0, left_boundary)
+        size = max(len(w) - base, left_boundary - base + 1, 64)
+        tape = bytearray(size)
+        ids = self.id_simbolo
+        tape[-base:len(w) - base] = bytes(ids[ch] for ch in w)
+        return tape, base
+
+    def cinta_desde(self, punto: PuntoControl, left_boundary: int):
+        """Como `cinta_inicial`, pero con la cinta guardada en un PuntoControl."""
+        tape, base = self.cinta_inicial('', left_boundary)
+        fin = punto.cabeza
+        if punto.cinta:
+            fin = max(fin, punto.inicio_cinta + len(punto.cinta) - 1)
+        if fin - base >= len(tape):
+            tape.extend(bytes(fin - base + 1 - len(tape)))
+        if punto.cinta:
+            i = punto.inicio_cinta - base
+            ids = self.id_simbolo
+            tape[i:i + len(punto.cinta)] = bytes(ids[s] for s in punto.cinta)
+        return tape, base
+
+    def _error_movimiento(self, q: int, a: int) -> RuntimeError:
+        m = self.mt.delta[(self.estados[q], self.simbolos[a])][2]
+        if m == 'S':
+            return RuntimeError("Movimiento 'S' no permitido.")
+        return RuntimeError(f"Movimiento inválido '{m}' en ejecución.")
+
+    def iter_configs(self,
+                     w: str,
+                     max_steps: Optional[int],
+                     config_variant: str,
+                     implicit_reject_on_undef: bool,
+                     detect_loops: bool = False,
+                     desde: Optional[PuntoControl] = None,
+                     cada_pasos: Optional[int] = None,
+                     al_punto: Optional[Callable[[PuntoControl], None]] = None,
+                     limites: Optional[Limites] = None
+                     ) -> EjecucionMT:
+        """Equivalente compilado de `MaquinaTuring.iter_configs` (w ya validada)."""
+        if config_variant == 'u q v':
+            sep = ' '
+        elif config_variant == 'uqv':
+            sep = ''
+        else:
+            raise ValueError("config_variant debe ser 'uqv' o 'u q v'")
+
+        if desde is None:
+            tape, base = self.cinta_inicial(w, self.mt.left_boundary)
+        else:
+            tape, base = self.cinta_desde(desde, self.mt.left_boundary)
+        ejecucion = EjecucionMT(self.mt)
+        ejecucion._gen = self._generar_configs(tape, base, len(w), sep, ejecucion,
+                                               max_steps, implicit_reject_on_undef,
+                                               detect_loops, desde, cada_pasos, al_punto,
+                                               _control_limites(limites, self.mt))
+        return ejecucion
+
+    def iter_pasos(self,
+                   w: str,
+                   max_steps: Optional[int],
+                   implicit_reject_on_undef: bool,
+                   detect_loops: bool = False,
+                   cada_pasos: Optional[int] = None,
+                   al_punto: Optional[Callable[[PuntoControl], None]] = None,
+                   limites: Optional[Limites] = None) -> EjecucionMT:
+        """
+        Como `iter_configs`, pero sin formatear: por cada configuración
+        posterior a la inicial entrega la entrada empaquetada de la tabla que
+        la produjo, (q' << 10) | (b << 2) | mov. El rechazo implícito se
+        entrega con mov = MOV_SOLO_ESTADO (b es el símbolo leído). Al
+        terminar no se entrega la línea de aviso: ver `motivo` y
+        `aviso_limite` del resultado. Sin configuraciones de texto no hay
+        max_bytes_traza.
+        """
+        if limites is not None and limites.max_bytes_traza is not None:
+            raise ValueError("max_bytes_traza solo aplica a iter_configs")
+        tape, base = self.cinta_inicial(w, self.mt.left_boundary)
+        ejecucion = EjecucionMT(self.mt)
+        ejecucion._gen = self._generar_pasos(tape, base, len(w), ejecucion, max_steps,
+                                             implicit_reject_on_undef, detect_loops,
+                                             cada_pasos, al_punto,
+                                             _control_limites(limites, self.mt))
+        return ejecucion
+
+    def run(self,
+            w: str,
+            max_steps: Optional[int],
+            implicit_reject_on_undef: bool,
+            sweep: bool = True,
+            detect_loops: bool = True,
+            control: Optional[_ControlLimites] = None) -> ResultadoMT:
+        """
+        Equivalente compilado de `MaquinaTuring.run` (w ya validada).
+
+        Con `sweep` y si la MT tiene autolazos de barrido, usa el bucle que
+        salta tramos completos (ver `_run_barridos`).
+
+        Con `detect_loops`, los estados condenados se marcan en la propia
+        tabla de movimientos (sin costo por paso), la deriva a la derecha se
+        comprueba solo cuando la cabeza pisa una celda nueva, y las
+        repeticiones con el esquema de Brent: una configuración guardada en
+        los pasos 1, 2, 4, 8... contra la que se compara (estado y cabeza
+        primero, la cinta solo si coinciden).
+
+        Con `control` (ver `MaquinaTuring.run`), los límites se comprueban
+        una vez por lote de pasos; el tramo en uso se acota con la entrada y
+        la celda más a la derecha visitada (ver `_celdas`).
+        """
+        if sweep and (self.barrido_der or self.barrido_izq):
+            return self._run_barridos(w, max_steps, implicit_reject_on_undef, detect_loops,
+                                      control)
+
+        sig, esc, G = self.sig, self.esc, self.G
+        mov = self.mov_condenado if detect_loops else self.mov
+        tape, base = self.cinta_inicial(w, self.mt.left_boundary)
+        size = len(tape)
+        lbp = self.mt.left_boundary - base
+        fin_entrada = len(w) - 1 - base
+        p = pmax = lbp
+        r = self.q0 * G
+        motivo = None
+
+        # Detección de ciclos (centinelas inalcanzables si está apagada)
+        deriva = self.filas_deriva if detect_loops else frozenset()
+        prox = 1 if detect_loops else _SIN_LIMITE
+        guardada_p = guardada_r = -1
+        guardada_cinta = None
+        # Límites de recursos: `evento` es el próximo paso en que hay que
+        # guardar la configuración o comprobar los límites, así el bucle
+        # sigue teniendo una sola comparación por paso para ambas cosas
+        prox_limite = 1 if control else _SIN_LIMITE
+        evento = min(prox, prox_limite)
+        izq = min(lbp, -base) if w else lbp
+
+        # `steps` es el número del paso en curso; si el bucle se agota sin
+        # break es que se alcanzó max_steps (como `steps >= max_steps`)
+        steps = 0
+        for steps in count(1) if max_steps is None else range(1, max(max_steps, 1) + 1):
+            i = r + tape[p]
+            m = mov[i]
+            if m == MOV_R:
+                tape[p] = esc[i]
+                p += 1
+                if p > pmax:
+                    pmax = p
+                    if p == size:
+                        tape.extend(bytes(size))
+                        size += size
+                    if p > fin_entrada and sig[i] in deriva:
+                        r = sig[i]
+                        motivo = MOTIVO_DERIVA
+                        break
+            elif m == MOV_L:
+                tape[p] = esc[i]
+                if p > lbp:
+                    p -= 1
+            elif m == MOV_S:
+                tape[p] = esc[i]
+            else:
+                steps -= 1
+                if m == _MOV_INDEFINIDA:
+                    if implicit_reject_on_undef:
+                        r = self.qrej * G
+                elif m == _MOV_CONDENADO:
+                    motivo = MOTIVO_CONDENADO
+                elif m == MOV_INVALIDO:
+                    raise self._error_movimiento(r // G, tape[p])
+                break
+            r = sig[i]
+            if p == guardada_p and r == guardada_r and tape.rstrip(b'\x00') == guardada_cinta:
+                motivo = MOTIVO_CICLO
+                break
+            if steps >= evento:
+                if steps >= prox:
+                    prox <<= 1
+                    guardada_p, guardada_r, guardada_cinta = p, r, tape.rstrip(b'\x00')
+                if steps >= prox_limite:
+                    celdas = self._celdas(tape, izq, lbp, p, max(pmax, fin_entrada), control)
+                    motivo = control.agotado(celdas, 0, '', 0)
+                    prox_limite = steps + control.espera
+                    if motivo is not None:
+                        break
+                evento = min(prox, prox_limite)
+        else:
+            motivo = MOTIVO_MAX_STEPS
+
+        return self._resultado(tape, base, r // G, p, steps, motivo, len(w), pmax)
+
+    @staticmethod
+    def _celdas(tape: bytearray, izq: int, lbp: int, p: int, derecha: int,
+                control: _ControlLimites) -> int:
+        """
+        Celdas del tramo en uso para `control`: la cota izq..derecha (la
+        entrada y lo visitado), o el tramo exacto que muestra la
+        configuración si la cota pasa de max_celdas.
+        """
+        cota = derecha - izq + 1
+        if not control.supera_celdas(cota):
+            return cota
+        recorte = tape[:derecha + 1].rstrip(b'\x00')
+        hi = len(recorte) - 1
+        lo = len(recorte) - len(recorte.lstrip(b'\x00'))
+        L = lbp if lbp < p else p
+        R = p
+        if lo <= hi:
+            if lo < L:
+                L = lo
+            if hi > R:
+                R = hi
+        return R - L + 1
+
+    def _run_barridos(self,
+                      w: str,
+                      max_steps: Optional[int],
+                      implicit_reject_on_undef: bool,
+                      detect_loops: bool = True,
+                      control: Optional[_ControlLimites] = None) -> ResultadoMT:
+        """
+        Bucle sin traza que recorre cada barrido en una sola operación.
+
+        Si δ(q, a) = (q, a, R) para todo símbolo de un tramo, la cabeza lo
+        cruza sin cambiar nada más: el fin del tramo se busca con una
+        expresión regular sobre la cinta (hacia la derecha) o con rstrip
+        (hacia la izquierda), y el contador de pasos avanza en la longitud
+        del tramo, acotada por los pasos restantes. El resultado es idéntico
+        al bucle paso a paso.
+
+        La detección de ciclos funciona igual que en `run`, pero el esquema
+        de Brent cuenta iteraciones del bucle (pasos o barridos completos):
+        la sucesión de configuraciones observadas sigue siendo determinista.
+        Los límites de `control` se comprueban igual que en `run`: un
+        barrido se corta al cumplirse el lote.
+        """
+        sig, esc, G = self.sig, self.esc, self.G
+        mov = self.mov_barrido_condenado if detect_loops else self.mov_barrido
+        buscar_der, simbolos_izq = self.barrido_der, self.barrido_izq
+        tape, base = self.cinta_inicial(w, self.mt.left_boundary)
+        size = len(tape)
+        lbp = self.mt.left_boundary - base
+        p = pmax = lbp
+        r = self.q0 * G
+        steps = 0
+        limit = _SIN_LIMITE if max_steps is None else max(max_steps, 1)
+        fin_entrada = len(w) - 1 - base
+        motivo = None
+
+        deriva = self.filas_deriva if detect_loops else frozenset()
+        obs = 0
+        prox = 1 if detect_loops else _SIN_LIMITE
+        guardada_p = guardada_r = -1
+        guardada_cinta = None
+        prox_limite = 1 if control else _SIN_LIMITE
+        izq = min(lbp, -base) if w else lbp
+
+        while steps < limit:
+            if p == guardada_p and r == guardada_r and tape.rstrip(b'\x00') == guardada_cinta:
+                motivo = MOTIVO_CICLO
+                break
+            if steps >= prox_limite:
+                celdas = self._celdas(tape, izq, lbp, p, max(pmax, fin_entrada), control)
+                motivo = control.agotado(celdas, 0, '', 0)
+                prox_limite = steps + control.espera
+                if motivo is not None:
+                    break
+            obs += 1
+            if obs >= prox:
+                prox <<= 1
+                guardada_p, guardada_r, guardada_cinta = p, r, tape.rstrip(b'\x00')
+
+            i = r + tape[p]
+            m = mov[i]
+            if m == MOV_R:
+                tape[p] = esc[i]
+                p += 1
+                if p > pmax:
+                    pmax = p
+                    if p == size:
+                        tape.extend(bytes(size))
+                        size += size
+                    if p > fin_entrada and sig[i] in deriva:
+                        r = sig[i]
+                        steps += 1
+                        motivo = MOTIVO_DERIVA
+                        break
+            elif m == MOV_L:
+                tape[p] = esc[i]
+                if p > lbp:
+                    p -= 1
+            elif m == _MOV_BARRIDO_R:
+                fin = buscar_der[r](tape, p)
+                if fin is None and r in deriva and mov[r] == _MOV_BARRIDO_R:
+                    # El blanco continúa el barrido y no hay nada que lo corte
+                    motivo = MOTIVO_DERIVA
+                    break
+                k = (fin.start() if fin else size) - p
+                if k > limit - steps:
+                    k = limit - steps
+                if k > prox_limite - steps:
+                    k = prox_limite - steps
+                p += k
+                steps += k
+                if p > pmax:
+                    pmax = p
+                    if p >= size:
+                        tape.extend(bytes(p + 1))
+                        size = len(tape)
+                continue
+            elif m == _MOV_BARRIDO_L:
+                j = lbp + len(tape[lbp:p + 1].rstrip(simbolos_izq[r]))
+                if j == lbp and p == lbp:
+                    # Tope izquierdo: cada paso restante deja todo igual
+                    if detect_loops:
+                        steps += 1
+                        motivo = MOTIVO_CICLO
+                        break
+                    if limit == _SIN_LIMITE:
+                        steps += 1
+                    else:
+                        steps = limit if limit < prox_limite else prox_limite
+                    continue
+                # Cruza las celdas j..p; si j > lbp termina sobre j - 1
+                k = p - j + 1 if j > lbp else p - lbp
+                if k > limit - steps:
+                    k = limit - steps
+                if k > prox_limite - steps:
+                    k = prox_limite - steps
+                p -= k
+                steps += k
+                continue
+            elif m == MOV_S:
+                tape[p] = esc[i]
+            else:
+                if m == _MOV_INDEFINIDA:
+                    if implicit_reject_on_undef:
+                        r = self.qrej * G
+                elif m == _MOV_CONDENADO:
+                    motivo = MOTIVO_CONDENADO
+                elif m == MOV_INVALIDO:
+                    raise self._error_movimiento(r // G, tape[p])
+                break
+            r = sig[i]
+            steps += 1
+
+        if motivo is None and steps >= limit:
+            motivo = MOTIVO_MAX_STEPS
+        return self._resultado(tape, base, r // G, p, steps, motivo, len(w), pmax)
+
+    def estadisticas(self,
+                     w: str,
+                     max_steps: Optional[int],
+                     implicit_reject_on_undef: bool,
+                     detect_loops: bool = True) -> EstadisticasMT:
+        """Bucle instrumentado de `MaquinaTuring.estadisticas` (w ya validada)."""
+        tabla, G = self.tabla, self.G
+        paro = self.paro_condenado if detect_loops else self.paro
+        tape, base = self.cinta_inicial(w, self.mt.left_boundary)
+        size = len(tape)
+        lbp = self.mt.left_boundary - base
+        n = len(w)
+        lo, hi = (-base, n - 1 - base) if n else (1, 0)
+        deriva = self.filas_deriva if detect_loops else frozenset()
+        detector = _DetectorCiclos() if detect_loops else None
+        motivo = None
+
+        def foto():
+            return (lo, bytes(tape[lo:hi + 1])) if lo <= hi else ()
+
+        hits = array('q', [0]) * len(tabla)
+        movs = [0, 0, 0, 0]       # L, R, S, L en el tope
+        tramos = [0] * 64         # por bit_length de la longitud
+        extension = [0] * 64      # por bit_length del ancho no-blanco
+        inversiones = 0
+        sentido = 0               # -1 izquierda, 1 derecha, 0 aún ninguno
+        tramo = 0
+
+        q = self.q0
+        p = lbp
+        steps = 0
+        limit = -1 if max_steps is None else max(max_steps, 1)
+        while not paro[q]:
+            a = tape[p]
+            i = q * G + a
+            e = tabla[i]
+            if e < 0:
+                if implicit_reject_on_undef:
+                    q = self.qrej
+                break
+            hits[i] += 1
+
+            b = (e >> _SHIFT_SIMBOLO) & 0xFF
+            if b != a:
+                tape[p] = b
+                if b:
+                    if lo > hi:
+                        lo = hi = p
+                    elif p < lo:
+                        lo = p
+                    elif p > hi:
+                        hi = p
+                elif p == lo:
+                    while lo <= hi and not tape[lo]:
+                        lo += 1
+                elif p == hi:
+                    while hi >= lo and not tape[hi]:
+                        hi -= 1
+
+            mov = e & 3
+            d = 0
+            if mov == MOV_R:
+                p += 1
+                if p == size:
+                    tape.extend(bytes(size))
+                    size += size
+                movs[1] += 1
+                d = 1
+            elif mov == MOV_L:
+                if p > lbp:
+                    p -= 1
+                    movs[0] += 1
+                    d = -1
+                else:
+                    movs[3] += 1
+            elif mov == MOV_S:
+                movs[2] += 1
+            else:
+                raise self._error_movimiento(q, a)
+            if d:
+                if d == sentido:
+                    tramo += 1
+                else:
+                    if sentido:
+                        inversiones += 1
+                        tramos[tramo.bit_length()] += 1
+                    sentido, tramo = d, 1
+            extension[(hi - lo + 1).bit_length() if lo <= hi else 0] += 1
+
+            q = e >> _SHIFT_ESTADO
+            steps += 1
+            if detect_loops:
+                if q * G in deriva and (lo > hi or p > hi):
+                    motivo = MOTIVO_DERIVA
+                elif detector.repetida(q, p, foto):
+                    motivo = MOTIVO_CICLO
+            if motivo is None and steps == limit:
+                motivo = MOTIVO_MAX_STEPS
+            if motivo is not None:
+                break
+        if paro[q] == _CONDENADO:
+            motivo = MOTIVO_CONDENADO
+        if tramo:
+            tramos[tramo.bit_length()] += 1
+
+        transiciones = {}
+        pasos_por_estado = {}
+        for i, k in enumerate(hits):
+            if k:
+                qn = self.estados[i // G]
+                transiciones[(qn, self.simbolos[i % G])] = k
+                pasos_por_estado[qn] = pasos_por_estado.get(qn, 0) + k
+        res = self.mt._resultado(self.estados[q], p + base, steps, motivo, '', 0, n, p + base)
+
+        def histograma(cuentas):
+            return {(1 << k) >> 1: c for k, c in enumerate(cuentas) if c}
+
+        return EstadisticasMT(
+            veredicto=res.veredicto,
+            pasos=steps,
+            motivo=res.motivo,
+            transiciones=transiciones,
+            pasos_por_estado=pasos_por_estado,
+            movimientos=dict(zip(('L', 'R', 'S', 'L_tope'), movs)),
+            inversiones=inversiones,
+            tramos=histograma(tramos),
+            extension=histograma(extension),
+        )
+
+    def _resultado(self, tape: bytearray, base: int, q: int, p: int, steps: int,
+                   motivo: Optional[str], n: int, pmax: int) -> ResultadoMT:
+        """Arma el ResultadoMT a partir del estado final en enteros."""
+        recorte = tape.lstrip(b'\x00')
+        inicio = len(tape) - len(recorte)
+        recorte = recorte.rstrip(b'\x00')
+        if recorte:
+            cinta, inicio = self.decodificar(recorte), inicio + base
+        else:
+            cinta, inicio = '', p + base
+        return self.mt._resultado(self.estados[q], p + base, steps, motivo,
+                                  cinta, inicio, n, pmax + base)
+
+    def _generar_configs(self, tape: bytearray, base: int, n: int, sep: str,
+                         ejecucion: EjecucionMT, max_steps: Optional[int],
+                         implicit_reject_on_undef: bool, detect_loops: bool = False,
+                         desde: Optional[PuntoControl] = None,
+                         cada_pasos: Optional[int] = None,
+                         al_punto: Optional[Callable[[PuntoControl], None]] = None,
+                         control: Optional[_ControlLimites] = None):
+        """Bucle principal sobre enteros; p = cabeza - base."""
+        tabla, G = self.tabla, self.G
+        paro = self.paro_condenado if detect_loops else self.paro
+        nombres = [sep + s + sep for s in self.estados]
+        dec = self.decodificar
+        size = len(tape)
+        lbp = self.mt.left_boundary - base
+        deriva = self.filas_deriva if detect_loops else frozenset()
+        detector = _DetectorCiclos() if detect_loops else None
+        motivo = None
+
+        def foto():
+            return (lo, bytes(tape[lo:hi + 1])) if lo <= hi else ()
+
+        # Caracteres entregados y última configuración (para max_bytes_traza)
+        traza = 0
+        linea = ''
+        if desde is None:
+            # Extensión no-blanco en índices de buffer (lo > hi: cinta en blanco)
+            lo, hi = (-base, n - 1 - base) if n else (1, 0)
+            q = self.q0
+            p = lbp
+            L = R = p
+            if lo <= hi:
+                L = min(L, lo)
+                R = max(R, hi)
+            linea = dec(tape[L:p]) + nombres[q] + dec(tape[p:R + 1])
+            traza += len(linea)
+            yield linea
+            configs = 1
+            steps = 0
+        else:
+            # La configuración actual ya se entregó antes del punto de control
+            if desde.cinta:
+                lo = desde.inicio_cinta - base
+                hi = lo + len(desde.cinta) - 1
+            else:
+                lo, hi = 1, 0
+            q = self.id_estado[desde.estado]
+            p = desde.cabeza - base
+            configs, steps = desde.configuraciones, desde.pasos
+            if detector is not None and desde.detector is not None:
+                self._cargar_detector(detector, desde.detector, base)
+        prox_punto = steps + cada_pasos if cada_pasos else -1
+        prox_limite = steps + 1 if control else -1
+
+        # Igual que `steps >= max_steps` comprobado tras cada paso
+        limit = -1 if max_steps is None else max(max_steps, 1)
+        while True:
+            if paro[q]:
+                if paro[q] == _CONDENADO:
+                    motivo = MOTIVO_CONDENADO
+                    ejecucion._terminar(self.estados[q], p + base, steps, configs, motivo)
+                    yield AVISOS[motivo].format(max_steps=max_steps, pasos=steps)
+                    return
+                break
+
+            a = tape[p]
+            e = tabla[q * G + a]
+            if e < 0:
+                if implicit_reject_on_undef:
+                    q = self.qrej
+                    L = lbp if lbp < p else p
+                    R = p
+                    if lo <= hi:
+                        if lo < L:
+                            L = lo
+                        if hi > R:
+                            R = hi
+                    yield dec(tape[L:p]) + nombres[q] + dec(tape[p:R + 1])
+                    configs += 1
+                break
+
+            b = (e >> _SHIFT_SIMBOLO) & 0xFF
+            if b != a:
+                tape[p] = b
+                if b:
+                    if lo > hi:
+                        lo = hi = p
+                    elif p < lo:
+                        lo = p
+                    elif p > hi:
+                        hi = p
+                elif p == lo:
+                    while lo <= hi and not tape[lo]:
+                        lo += 1
+                elif p == hi:
+                    while hi >= lo and not tape[hi]:
+                        hi -= 1
+
+            mov = e & 3
+            if mov == MOV_R:
+                p += 1
+                if p == size:
+                    tape.extend(bytes(size))
+                    size += size
+            elif mov == MOV_L:
+                if p > lbp:
+                    p -= 1
+            elif mov == MOV_INVALIDO:
+                raise self._error_movimiento(q, a)
+
+            q = e >> _SHIFT_ESTADO
+            L = lbp if lbp < p else p
+            R = p
+            if lo <= hi:
+                if lo < L:
+                    L = lo
+                if hi > R:
+                    R = hi
+            linea = dec(tape[L:p]) + nombres[q] + dec(tape[p:R + 1])
+            traza += len(linea)
+            yield linea
+            configs += 1
+
+            steps += 1
+            if detect_loops:
+                if q * G in deriva and (lo > hi or p > hi):
+                    motivo = MOTIVO_DERIVA
+                elif detector.repetida(q, p, foto):
+                    motivo = MOTIVO_CICLO
+            if motivo is None and steps == limit:
+                motivo = MOTIVO_MAX_STEPS
+            if motivo is not None:
+                ejecucion._terminar(self.estados[q], p + base, steps, configs, motivo)
+                yield AVISOS[motivo].format(max_steps=max_steps, pasos=steps)
+                return
+            if steps == prox_limite and not paro[q]:
+                motivo = control.agotado(R - L + 1, traza, linea, configs)
+                prox_limite = steps + control.espera
+                if motivo is not None:
+                    ejecucion._terminar(self.estados[q], p + base, steps, configs, motivo)
+                    ejecucion.aviso_limite = control.aviso(motivo, steps)
+                    yield ejecucion.aviso_limite
+                    return
+            if steps == prox_punto:
+                prox_punto += cada_pasos
+                al_punto(self._punto_control(tape, base, lo, hi, q, p, steps,
+                                             configs, detector))
+
+        ejecucion._terminar(self.estados[q], p + base, steps, configs)
+
+    def _generar_pasos(self, tape: bytearray, base: int, n: int, ejecucion: EjecucionMT,
+                       max_steps: Optional[int], implicit_reject_on_undef: bool,
+                       detect_loops: bool, cada_pasos: Optional[int],
+                       al_punto: Optional[Callable[[PuntoControl], None]],
+                       control: Optional[_ControlLimites] = None):
+        """Bucle de `_generar_configs` sin formatear configuraciones."""
+        tabla, G = self.tabla, self.G
+        paro = self.paro_condenado if detect_loops else self.paro
+        size = len(tape)
+        lbp = self.mt.left_boundary - base
+        lo, hi = (-base, n - 1 - base) if n else (1, 0)
+        deriva = self.filas_deriva if detect_loops else frozenset()
+        detector = _DetectorCiclos() if detect_loops else None
+        motivo = None
+
+        def foto():
+            return (lo, bytes(tape[lo:hi + 1])) if lo <= hi else ()
+
+        q = self.q0
+        p = lbp
+        configs = 1
+        steps = 0
+        limit = -1 if max_steps is None else max(max_steps, 1)
+        prox_punto = cada_pasos if cada_pasos else -1
+        prox_limite = 1 if control else -1
+        while True:
+            if paro[q]:
+                if paro[q] == _CONDENADO:
+                    ejecucion._terminar(self.estados[q], p + base, steps, configs,
+                                        MOTIVO_CONDENADO)
+                    return
+                break
+
+            a = tape[p]
+            e = tabla[q * G + a]
+            if e < 0:
+                if implicit_reject_on_undef:
+                    q = self.qrej
+                    yield (q << _SHIFT_ESTADO) | (a << _SHIFT_SIMBOLO) | MOV_SOLO_ESTADO
+                    configs += 1
+                break
+
+            b = (e >> _SHIFT_SIMBOLO) & 0xFF
+            if b != a:
+                tape[p] = b
+                if b:
+                    if lo > hi:
+                        lo = hi = p
+                    elif p < lo:
+                        lo = p
+                    elif p > hi:
+                        hi = p
+                elif p == lo:
+                    while lo <= hi and not tape[lo]:
+                        lo += 1
+                elif p == hi:
+                    while hi >= lo and not tape[hi]:
+                        hi -= 1
+
+            mov = e & 3
+            if mov == MOV_R:
+                p += 1
+                if p == size:
+                    tape.extend(bytes(size))
+                    size += size
+            elif mov == MOV_L:
+                if p > lbp:
+                    p -= 1
+            elif mov == MOV_INVALIDO:
+                raise self._error_movimiento(q, a)
+
+            q = e >> _SHIFT_ESTADO
+            yield e
+            configs += 1
+
+            steps += 1
+            if detect_loops:
+                if q * G in deriva and (lo > hi or p > hi):
+                    motivo = MOTIVO_DERIVA
+                elif detector.repetida(q, p, foto):
+                    motivo = MOTIVO_CICLO
+            if motivo is None and steps == limit:
+                motivo = MOTIVO_MAX_STEPS
+            if motivo is not None:
+                ejecucion._terminar(self.estados[q], p + base, steps, configs, motivo)
+                return
+            if steps == prox_punto:
+                prox_punto += cada_pasos
+                al_punto(self._punto_control(tape, base, lo, hi, q, p, steps,
+                                             configs, detector))
+            if steps == prox_limite and not paro[q]:
+                L = lbp if lbp < p else p
+                R = p
+                if lo <= hi:
+                    if lo < L:
+                        L = lo
+                    if hi > R:
+                        R = hi
+                motivo = control.agotado(R - L + 1, 0, '', configs)
+                prox_limite = steps + control.espera
+                if motivo is not None:
+                    ejecucion._terminar(self.estados[q], p + base, steps, configs, motivo)
+                    ejecucion.aviso_limite = control.aviso(motivo, steps)
+                    return
+
+        ejecucion._terminar(self.estados[q], p + base, steps, configs)
+
+    def _punto_control(self, tape: bytearray, base: int, lo: int, hi: int, q: int,
+                       p: int, steps: int, configs: int,
+                       detector: Optional[_DetectorCiclos]) -> PuntoControl:
+        """PuntoControl con nombres de estados y símbolos (no índices)."""
+        simbolos = self.simbolos
+        if lo <= hi:
+            inicio, cinta = lo + base, [simbolos[a] for a in tape[lo:hi + 1]]
+        else:
+            inicio, cinta = None, []
+        det = None
+        if detector is not None:
+            dq = None if detector.estado is None else self.estados[detector.estado]
+            dhead = None if detector.cabeza is None else detector.cabeza + base
+            if detector.cinta:
+                dlo, datos = detector.cinta
+                dinicio, dcinta = dlo + base, [simbolos[a] for a in datos]
+            else:
+                dinicio, dcinta = None, []
+            det = [detector.prox, detector.obs, dq, dhead, dinicio, dcinta]
+        return PuntoControl(self.estados[q], p + base, steps, configs, inicio, cinta, det)
+
+    def _cargar_detector(self, detector: _DetectorCiclos, datos: list, base: int):
+        """Restaura en `detector` el estado guardado por `_punto_control`."""
+        prox, obs, dq, dhead, dinicio, dcinta = datos
+        detector.prox, detector.obs = prox, obs
+        if dq is None:
+            return
+        detector.estado = self.id_estado[dq]
+        detector.cabeza = dhead - base
+        if dinicio is None:
+            detector.cinta = ()
+        else:
+            ids = self.id_simbolo
+            detector.cinta = (dinicio - base, bytes(ids[s] for s in dcinta))
+
+
+def compilar(mt: MaquinaTuring) -> MaquinaCompilada:
+    """Compila la MT a su forma codificada con enteros."""
+    return MaquinaCompilada(mt)
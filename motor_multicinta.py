@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor para máquinas de Turing de k cintas (MaquinaTuring con cintas > 1).
+
+Como en motor_mt, estados y símbolos se internan como enteros pequeños (el
+blanco es el 0) y cada cinta es un `bytearray`; todas comparten la misma
+base, así que la celda i de cualquier cinta está en `cinta[i - base]`.
+La transición δ(q, (a1..ak)) se busca en un dict por la clave entera
+`q * |Γ|^k + a1 * |Γ|^(k-1) + ... + ak`.
+
+Cada configuración tiene una línea `u q v` por cinta (separadas por '\\n'),
+con la misma ventana de celdas que una configuración de una sola cinta.
+"""
+
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from maquina_turing import (MaquinaTuring, EjecucionMT, Limites, ResultadoMT, State, Symbol,
+                            AVISOS, MOTIVO_CICLO, MOTIVO_CONDENADO, MOTIVO_DERIVA,
+                            MOTIVO_MAX_STEPS, _ControlLimites, _DetectorCiclos,
+                            _control_limites)
+from motor_mt import MOV_L, MOV_R, MOV_S, MOV_INVALIDO, _CONDENADO
+
+
+class MaquinaMulticinta:
+    """
+    Forma compilada de una MaquinaTuring de k cintas.
+
+    Atributos:
+        k: Número de cintas
+        estados / simbolos: Nombre de cada estado / símbolo por índice
+            (mismo orden que MaquinaCompilada)
+        id_estado / id_simbolo: Mapas inversos nombre -> índice
+        G: |Γ|
+        tabla: Clave de (q, a1..ak) -> (q', bytes escritos, bytes de movimientos)
+        paro: bytearray con 1 en los estados de paro (qacc, qrej)
+        deriva: Estados con δ(q, blancos) = (q, b, M) que avanzan a la derecha
+            sobre blancos para siempre -> por cinta, True si esa cabeza va a
+            la derecha (las demás se quedan sobre un blanco)
+        paro_condenado: Copia de `paro` con 2 en los estados condenados
+            (ver analisis_mt)
+    """
+
+    def __init__(self, mt: MaquinaTuring):
+        if len(mt.Gamma) > 256:
+            raise ValueError("El motor multicinta admite a lo sumo 256 símbolos en Gamma.")
+
+        self.mt = mt
+        self.k = k = mt.cintas
+        self.estados: List[State] = sorted(mt.Q)
+        self.simbolos: List[Symbol] = [mt.blank] + sorted(mt.Gamma - {mt.blank})
+        self.id_estado: Dict[State, int] = {q: i for i, q in enumerate(self.estados)}
+        self.id_simbolo: Dict[Symbol, int] = {s: i for i, s in enumerate(self.simbolos)}
+        self.G = G = len(self.simbolos)
+        self.q0 = self.id_estado[mt.q0]
+        self.qacc = self.id_estado[mt.qacc]
+        self.qrej = self.id_estado[mt.qrej]
+
+        self.paro = bytearray(len(self.estados))
+        self.paro[self.qacc] = self.paro[self.qrej] = 1
+
+        movs = {'L': MOV_L, 'R': MOV_R}
+        if mt.allow_S:
+            movs['S'] = MOV_S
+        ids = self.id_simbolo
+        self.tabla: Dict[int, Tuple[int, bytes, bytes]] = {}
+        for (q, a), (qp, b, m) in mt.delta.items():
+            clave = self.id_estado[q]
+            for s in a:
+                clave = clave * G + ids[s]
+            self.tabla[clave] = (self.id_estado[qp], bytes(ids[s] for s in b),
+                                 bytes(movs.get(x, MOV_INVALIDO) for x in m))
+
+        self.deriva: Dict[int, Tuple[bool, ...]] = {}
+        for q in range(len(self.estados)):
+            t = self.tabla.get(q * G ** k)
+            if self.paro[q] or t is None or t[0] != q:
+                continue
+            qp, b, m = t
+            if (MOV_R in m
+                    and all(x == MOV_R or (x == MOV_S and not s) for x, s in zip(m, b))):
+                self.deriva[q] = tuple(x == MOV_R for x in m)
+
+        self.paro_condenado = bytearray(self.paro)
+        for q in mt._estados_condenados():
+            self.paro_condenado[self.id_estado[q]] = _CONDENADO
+
+        self._mapa_dec = dict(enumerate(self.simbolos))
+        self._firma = self.firma_de(mt)
+
+    @staticmethod
+    def firma_de(mt: MaquinaTuring) -> tuple:
+        """Datos de la MT de los que depende una compilación."""
+        return (id(mt.delta), len(mt.delta), mt.allow_S, mt.blank,
+                mt.q0, mt.qacc, mt.qrej, len(mt.Q), len(mt.Gamma), mt.cintas)
+
+    def firma(self) -> tuple:
+        """Firma de la MT en el momento de compilar."""
+        return self._firma
+
+    def decodificar(self, data) -> str:
+        """Convierte un tramo de cinta (bytes de índices) a texto."""
+        return bytes(data).decode('latin-1').translate(self._mapa_dec)
+
+    def cintas_iniciales(self, w: str):
+        """
+        Construye las k cintas: w en la primera y las demás en blanco.
+
+        Returns:
+            Tupla (cintas, base) donde la celda i está en `cinta[i - base]`
+        """
+        lb = self.mt.left_boundary
+        base = min(0, lb)
+        size = max(len(w) - base, lb - base + 1, 64)
+        cintas = [bytearray(size) for _ in range(self.k)]
+        ids = self.id_simbolo
+        cintas[0][-base:len(w) - base] = bytes(ids[ch] for ch in w)
+        return cintas, base
+
+    def extension_inicial(self, n: int, base: int) -> Tuple[List[int], List[int]]:
+        """
+        Tramo no-blanco de cada cinta recién construida (w de longitud n).
+
+        Returns:
+            Listas (los, his) en índices de buffer; los[i] > his[i] si la
+            cinta i está en blanco
+        """
+        los = [1] * self.k
+        his = [0] * self.k
+        if n:
+            los[0], his[0] = -base, n - 1 - base
+        return los, his
+
+    def _error_movimiento(self, q: int, leidos: List[int], m: int) -> RuntimeError:
+        a = tuple(self.simbolos[s] for s in leidos)
+        mov = self.mt.delta[(self.estados[q], a)][2][m]
+        if mov == 'S':
+            return RuntimeError("Movimiento 'S' no permitido.")
+        return RuntimeError(f"Movimiento inválido '{mov}' en ejecución.")
+
+    def _paso(self, cintas: List[bytearray], ps: List[int], los: List[int], his: List[int],
+              t: Tuple[int, bytes, bytes], q: int, lbp: int) -> int:
+        """
+        Aplica la transición t: escribe, mueve cada cabeza (sin pasar de
+        lbp) y amplía las cintas si alguna cabeza llega al final.
+
+        los[i]..his[i] es el tramo no-blanco de la cinta i (los[i] > his[i]:
+        cinta en blanco) y se actualiza con cada escritura, como en motor_mt.
+
+        Returns:
+            El estado siguiente
+        """
+        qp, escritos, movs = t
+        for i in range(self.k):
+            tape = cintas[i]
+            p = ps[i]
+            b = escritos[i]
+            if b != tape[p]:
+                tape[p] = b
+                lo = los[i]
+                hi = his[i]
+                if b:
+                    if lo > hi:
+                        los[i] = his[i] = p
+                    elif p < lo:
+                        los[i] = p
+                    elif p > hi:
+                        his[i] = p
+                elif p == lo:
+                    while lo <= hi and not tape[lo]:
+                        lo += 1
+                    los[i] = lo
+                elif p == hi:
+                    while hi >= lo and not tape[hi]:
+                        hi -= 1
+                    his[i] = hi
+            m = movs[i]
+            if m == MOV_R:
+                p += 1
+                if p == len(tape):
+                    for c in cintas:
+                        c.extend(bytes(len(c)))
+                ps[i] = p
+            elif m == MOV_L:
+                if p > lbp:
+                    ps[i] = p - 1
+            elif m == MOV_INVALIDO:
+                raise self._error_movimiento(q, [c[x] for c, x in zip(cintas, ps)], i)
+        return qp
+
+    def _en_deriva(self, q: int, cintas: List[bytearray], ps: List[int],
+                   los: List[int], his: List[int]) -> bool:
+        """True si q deriva y las cabezas que avanzan ya no tienen nada a su derecha."""
+        avanza = self.deriva.get(q)
+        if avanza is None:
+            return False
+        for tape, p, lo, hi, der in zip(cintas, ps, los, his, avanza):
+            if der:
+                if lo <= hi and p <= hi:
+                    return False
+            elif tape[p]:
+                return False
+        return True
+
+    def _clave(self, q: int, cintas: List[bytearray], ps: List[int]) -> int:
+        clave = q
+        G = self.G
+        for tape, p in zip(cintas, ps):
+            clave = clave * G + tape[p]
+        return clave
+
+    def iter_configs(self,
+                     w: str,
+                     max_steps: Optional[int],
+                     config_variant: str,
+                     implicit_reject_on_undef: bool,
+                     detect_loops: bool = False,
+                     limites: Optional[Limites] = None) -> EjecucionMT:
+        """Equivalente de `MaquinaTuring.iter_configs` para k cintas (w ya validada)."""
+        if config_variant == 'u q v':
+            sep = ' '
+        elif config_variant == 'uqv':
+            sep = ''
+        else:
+            raise ValueError("config_variant debe ser 'uqv' o 'u q v'")
+
+        cintas, base = self.cintas_iniciales(w)
+        los, his = self.extension_inicial(len(w), base)
+        ejecucion = EjecucionMT(self.mt)
+        ejecucion._gen = self._generar_configs(cintas, base, los, his, sep, ejecucion, max_steps,
+                                               implicit_reject_on_undef, detect_loops,
+                                               _control_limites(limites, self.mt))
+        return ejecucion
+
+    def _generar_configs(self, cintas: List[bytearray], base: int,
+                         los: List[int], his: List[int], sep: str,
+                         ejecucion: EjecucionMT, max_steps: Optional[int],
+                         implicit_reject_on_undef: bool, detect_loops: bool,
+                         control: Optional[_ControlLimites] = None):
+        """
+        Bucle principal sobre enteros; ps[i] = cabeza de la cinta i - base y
+        los[i]..his[i] su tramo no-blanco (ver `_paso`).
+        """
+        tabla = self.tabla
+        paro = self.paro_condenado if detect_loops else self.paro
+        nombres = [sep + s + sep for s in self.estados]
+        dec = self.decodificar
+        lbp = self.mt.left_boundary - base
+        ps = [lbp] * self.k
+        detector = _DetectorCiclos() if detect_loops else None
+        motivo = None
+
+        def ventana(p, lo, hi):
+            # Misma ventana que una cinta: [min(lb, cabeza, lo), max(cabeza, hi)]
+            L = lbp if lbp < p else p
+            R = p
+            if lo <= hi:
+                if lo < L:
+                    L = lo
+                if hi > R:
+                    R = hi
+            return L, R
+
+        def config(q):
+            lineas = []
+            for tape, p, lo, hi in zip(cintas, ps, los, his):
+                L, R = ventana(p, lo, hi)
+                lineas.append(dec(tape[L:p]) + nombres[q] + dec(tape[p:R + 1]))
+            return '\n'.join(lineas)
+
+        def foto():
+            return tuple((lo, bytes(tape[lo:hi + 1])) if lo <= hi else ()
+                         for tape, lo, hi in zip(cintas, los, his))
+
+        q = self.q0
+        linea = config(q)
+        # Caracteres entregados (para max_bytes_traza)
+        traza = len(linea)
+        yield linea
+        configs = 1
+        steps = 0
+        prox_limite = 1 if control else -1
+
+        # Igual que `steps >= max_steps` comprobado tras cada paso
+        limit = -1 if max_steps is None else max(max_steps, 1)
+        while not paro[q]:
+            t = tabla.get(self._clave(q, cintas, ps))
+            if t is None:
+                if implicit_reject_on_undef:
+                    q = self.qrej
+                    yield config(q)
+                    configs += 1
+                break
+
+            q = self._paso(cintas, ps, los, his, t, q, lbp)
+            linea = config(q)
+            traza += len(linea)
+            yield linea
+            configs += 1
+
+            steps += 1
+            if detect_loops:
+                if self._en_deriva(q, cintas, ps, los, his):
+                    motivo = MOTIVO_DERIVA
+                elif detector.repetida(q, tuple(ps), foto):
+                    motivo = MOTIVO_CICLO
+            if motivo is None and steps == limit:
+                motivo = MOTIVO_MAX_STEPS
+            if motivo is not None:
+                ejecucion._terminar(self.estados[q], tuple(p + base for p in ps), steps,
+                                    configs, motivo)
+                yield AVISOS[motivo].format(max_steps=max_steps, pasos=steps)
+                return
+            if steps == prox_limite and not paro[q]:
+                celdas = 0
+                for p, lo, hi in zip(ps, los, his):
+                    L, R = ventana(p, lo, hi)
+                    celdas += R - L + 1
+                motivo = control.agotado(celdas, traza, linea, configs)
+                prox_limite = steps + control.espera
+                if motivo is not None:
+                    ejecucion._terminar(self.estados[q], tuple(p + base for p in ps), steps,
+                                        configs, motivo)
+                    ejecucion.aviso_limite = control.aviso(motivo, steps)
+                    yield ejecucion.aviso_limite
+                    return
+
+        if paro[q] == _CONDENADO:
+            motivo = MOTIVO_CONDENADO
+            ejecucion._terminar(self.estados[q], tuple(p + base for p in ps), steps,
+                                configs, motivo)
+            yield AVISOS[motivo].format(max_steps=max_steps, pasos=steps)
+            return
+        ejecucion._terminar(self.estados[q], tuple(p + base for p in ps), steps, configs)
+
+    def run(self,
+            w: str,
+            max_steps: Optional[int],
+            implicit_reject_on_undef: bool,
+            detect_loops: bool = True,
+            control: Optional[_ControlLimites] = None) -> ResultadoMT:
+        """
+        Equivalente de `MaquinaTuring.run` para k cintas (w ya validada); los
+        límites de `control` se comprueban por lotes, como en `iter_configs`.
+        """
+        tabla = self.tabla
+        paro = self.paro_condenado if detect_loops else self.paro
+        cintas, base = self.cintas_iniciales(w)
+        los, his = self.extension_inicial(len(w), base)
+        lbp = self.mt.left_boundary - base
+        ps = [lbp] * self.k
+        pmax = lbp
+        q = self.q0
+        detector = _DetectorCiclos() if detect_loops else None
+        motivo = None
+
+        def foto():
+            return tuple((lo, bytes(tape[lo:hi + 1])) if lo <= hi else ()
+                         for tape, lo, hi in zip(cintas, los, his))
+
+        prox_limite = 1 if control else -1
+        steps = 0
+        for steps in count(1) if max_steps is None else range(1, max(max_steps, 1) + 1):
+            if paro[q]:
+                steps -= 1
+                if paro[q] == _CONDENADO:
+                    motivo = MOTIVO_CONDENADO
+                break
+            t = tabla.get(self._clave(q, cintas, ps))
+            if t is None:
+                steps -= 1
+                if implicit_reject_on_undef:
+                    q = self.qrej
+                break
+            q = self._paso(cintas, ps, los, his, t, q, lbp)
+            pmax = max(pmax, *ps)
+            if detect_loops:
+                if self._en_deriva(q, cintas, ps, los, his):
+                    motivo = MOTIVO_DERIVA
+                    break
+                if detector.repetida(q, tuple(ps), foto):
+                    motivo = MOTIVO_CICLO
+                    break
+            if steps == prox_limite:
+                celdas = 0
+                for p, lo, hi in zip(ps, los, his):
+                    L = lbp if lbp < p else p
+                    R = p
+                    if lo <= hi:
+                        L = min(L, lo)
+                        R = max(R, hi)
+                    celdas += R - L + 1
+                motivo = control.agotado(celdas, 0, '', 0)
+                prox_limite = steps + control.espera
+                if motivo is not None:
+                    break
+        else:
+            motivo = MOTIVO_MAX_STEPS
+
+        return self._resultado(cintas, base, q, ps, steps, motivo, len(w), pmax)
+
+    def _resultado(self, cintas: List[bytearray], base: int, q: int, ps: List[int],
+                   steps: int, motivo: Optional[str], n: int, pmax: int) -> ResultadoMT:
+        """
+        Arma el ResultadoMT: los campos de cinta describen la primera. Solo
+        aquí se recorren las cintas completas, una vez por ejecución.
+        """
+        finales = []
+        for tape, p in zip(cintas, ps):
+            recorte = tape.lstrip(b'\x00')
+            inicio = len(tape) - len(recorte)
+            recorte = recorte.rstrip(b'\x00')
+            if recorte:
+                finales.append((p + base, self.decodificar(recorte), inicio + base))
+            else:
+                finales.append((p + base, '', p + base))
+        cabeza, cinta, inicio = finales[0]
+        res = self.mt._resultado(self.estados[q], cabeza, steps, motivo,
+                                 cinta, inicio, n, pmax + base)
+        res.cintas = finales
+        return res
+
+
+def compilar(mt: MaquinaTuring) -> MaquinaMulticinta:
+    """Compila la MT de k cintas a su forma codificada con enteros."""
+    return MaquinaMulticinta(mt)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor vectorizado (NumPy): muchas palabras sobre la misma MT en paralelo.
+
+Las N cintas se guardan como una matriz `uint8` (una fila por palabra) y el
+estado y la cabeza como vectores de longitud N. En cada paso, todas las
+palabras que siguen corriendo avanzan a la vez mediante indexación sobre la
+tabla entera del motor compilado (ver motor_mt). Las que paran se retiran y
+la matriz se compacta cuando quedan pocas vivas.
+
+La semántica es la de `MaquinaTuring.run` sin detección de ciclos: mismo
+tope izquierdo, mismo `implicit_reject_on_undef` y mismo conteo de pasos.
+NumPy es opcional: solo se necesita para usar este módulo.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from maquina_turing import (MaquinaTuring, ACEPTA, RECHAZA, LOOP, DETENIDO,
+                            MOTIVO_MAX_STEPS)
+from motor_mt import MOV_L, MOV_R, MOV_INVALIDO, _MOV_PARO
+
+# (veredicto, pasos, motivo) por palabra
+ResultadoVector = Tuple[str, int, Optional[str]]
+
+# Palabras simuladas a la vez (acota la memoria: filas x ancho de cinta)
+TAM_BLOQUE = 65536
+
+
+def disponible() -> bool:
+    """True si NumPy está instalado."""
+    return np is not None
+
+
+def run_lote_numpy(mt: MaquinaTuring,
+                   palabras: Sequence[str],
+                   max_steps: Optional[int] = None,
+                   implicit_reject_on_undef: bool = True,
+                   tam_bloque: int = TAM_BLOQUE) -> List[ResultadoVector]:
+    """
+    Ejecuta la MT sobre todas las palabras en paso sincronizado.
+
+    Args:
+        mt: Máquina de una cinta (|Γ| <= 256)
+        palabras: Palabras de entrada
+        max_steps: Límite de pasos por palabra (obligatorio: sin detección
+            de ciclos, una palabra que no para haría crecer su fila de cinta
+            hasta agotar la memoria)
+        implicit_reject_on_undef: Si True, rechaza cuando no hay transición
+        tam_bloque: Palabras simuladas simultáneamente
+
+    Returns:
+        Lista (veredicto, pasos, motivo) en el orden de `palabras`
+
+    Raises:
+        RuntimeError: Si NumPy no está instalado
+        ValueError: Si falta max_steps, alguna palabra usa símbolos fuera
+            de Sigma o la MT tiene varias cintas
+    """
+    if np is None:
+        raise RuntimeError("El motor vectorizado requiere NumPy (pip install numpy).")
+    if max_steps is None:
+        raise ValueError("El motor vectorizado requiere max_steps (no detecta ciclos).")
+    if mt.cintas > 1:
+        raise ValueError("El motor vectorizado solo admite máquinas de una cinta.")
+    for w in palabras:
+        for ch in w:
+            if ch not in mt.Sigma:
+                raise ValueError(f"Símbolo de entrada '{ch}' no pertenece a Sigma.")
+
+    resultados: List[ResultadoVector] = []
+    for k in range(0, len(palabras), tam_bloque):
+        resultados.extend(_run_bloque(mt, palabras[k:k + tam_bloque],
+                                      max_steps, implicit_reject_on_undef))
+    return resultados
+
+
+def _run_bloque(mt: MaquinaTuring, palabras: Sequence[str],
+                max_steps: Optional[int],
+                implicit_reject_on_undef: bool) -> List[ResultadoVector]:
+    comp = mt.compilar()
+    G = comp.G
+    # Fila extra (todo _MOV_PARO) a la que se envían las palabras ya
+    # terminadas mientras no se compacta la matriz
+    fila_muerta = len(comp.mov)
+    sig = np.concatenate([np.array(comp.sig, np.int64), np.zeros(G, np.int64)])
+    esc = np.concatenate([np.frombuffer(comp.esc, np.uint8), np.zeros(G, np.uint8)])
+    mov = np.concatenate([np.frombuffer(comp.mov, np.uint8),
+                          np.full(G, _MOV_PARO, np.uint8)])
+
+    n = len(palabras)
+    base = min(0, mt.left_boundary)
+    lbp = mt.left_boundary - base
+    ancho = max(max((len(w) for w in palabras), default=0) - base, lbp + 1) + 1
+    ancho = max(64, 1 << (ancho - 1).bit_length())
+    cintas = np.zeros((n, ancho), np.uint8)
+    for k, w in enumerate(palabras):
+        if w:
+            cintas[k, -base:len(w) - base] = np.frombuffer(
+                bytes(comp.id_simbolo[ch] for ch in w), np.uint8)
+
+    cabeza = np.full(n, lbp, np.int64)
+    fila = np.full(n, comp.q0 * G, np.int64)
+    origen = np.arange(n)
+    vivas = n
+    limit = None if max_steps is None else max(max_steps, 1)
+    resultados: List[Optional[ResultadoVector]] = [None] * n
+
+    def veredicto_paro(f: int) -> str:
+        return ACEPTA if f // G == comp.qacc else RECHAZA
+
+    paso = 0
+    while vivas:
+        idx = fila + cintas[np.arange(len(fila)), cabeza]
+        m = mov[idx]
+
+        # Terminan sin dar paso: estado de paro, δ indefinida o inválida
+        fin = np.flatnonzero((m > MOV_INVALIDO) & (fila != fila_muerta))
+        if len(fin):
+            for k, mk, fk in zip(fin.tolist(), m[fin].tolist(), fila[fin].tolist()):
+                if mk == _MOV_PARO:
+                    v = veredicto_paro(fk)
+                elif implicit_reject_on_undef:
+                    v = RECHAZA
+                else:
+                    v = DETENIDO
+                resultados[origen[k]] = (v, paso, None)
+            fila[fin] = fila_muerta
+            vivas -= len(fin)
+        if (m == MOV_INVALIDO).any():
+            k = int(np.flatnonzero(m == MOV_INVALIDO)[0])
+            raise comp._error_movimiento(int(fila[k]) // G, int(cintas[k, cabeza[k]]))
+        if not vivas:
+            break
+
+        # Un paso para todas las que siguen
+        corre = np.flatnonzero(m < MOV_INVALIDO)
+        ic = idx[corre]
+        mc = m[corre]
+        pc = cabeza[corre]
+        cintas[corre, pc] = esc[ic]
+        pc = pc + (mc == MOV_R) - ((mc == MOV_L) & (pc > lbp))
+        cabeza[corre] = pc
+        fila[corre] = sig[ic]
+        paso += 1
+
+        if limit is not None and paso >= limit:
+            for k, fk in zip(corre.tolist(), fila[corre].tolist()):
+                if comp.paro[fk // G]:
+                    resultados[origen[k]] = (veredicto_paro(fk), paso, None)
+                else:
+                    resultados[origen[k]] = (LOOP, paso, MOTIVO_MAX_STEPS)
+            break
+
+        # Crecer la cinta si alguna cabeza llegó al final
+        if pc.size and int(pc.max()) >= cintas.shape[1] - 1:
+            cintas = np.concatenate([cintas, np.zeros_like(cintas)], axis=1)
+
+        # Compactar cuando las terminadas son mayoría
+        if vivas <= len(fila) // 2:
+            keep = np.flatnonzero(fila != fila_muerta)
+            cintas = cintas[keep]
+            cabeza = cabeza[keep]
+            fila = fila[keep]
+            origen = origen[keep]
+
+    return resultados
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Máquinas de Turing no deterministas (una cinta).
+
+δ(q, a) es una tupla de movimientos posibles. La máquina acepta w si alguna
+rama del árbol de configuraciones llega a qacc; `explorar` recorre ese árbol
+en anchura, nivel por nivel:
+
+    - Cada configuración se codifica como un solo `bytes`: estado y cabeza
+      empaquetados seguidos de la cinta (índices de Γ, sin blancos al final).
+      Es la clave de un diccionario que guarda, además, de qué configuración
+      salió: así las ya vistas se descartan (una rama que repite una
+      configuración o llega a la de otra rama no se vuelve a expandir) y el
+      camino de aceptación se reconstruye al final sin guardar trazas
+    - El presupuesto es doble: profundidad (max_steps) y configuraciones
+      distintas (max_configs)
+    - Con jobs > 1, los niveles grandes se reparten en bloques sobre un
+      ProcessPoolExecutor; los resultados se combinan en el orden del nivel,
+      así que el camino encontrado es el mismo que sin pool
+
+Termina en la primera configuración de aceptación (la de menor
+profundidad). Si el árbol se agota sin aceptar, toda rama paró sin aceptar
+o repitió una configuración: la máquina no acepta w (veredicto RECHAZA).
+"""
+
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from maquina_turing import (MaquinaTuring, EjecucionMT, ResultadoMT, PuntoControl,
+                            State, Symbol, Move, ACEPTA, RECHAZA, LOOP, AVISOS,
+                            MOTIVO_MAX_STEPS, Limites)
+
+# δ(q, a) = ((q', b, M), ...)
+DeltaND = Dict[Tuple[State, Symbol], Tuple[Tuple[State, Symbol, Move], ...]]
+
+# Se agotó el presupuesto de configuraciones distintas
+MOTIVO_MAX_CONFIGS = 'max_configs'
+
+# Presupuesto por defecto de configuraciones distintas (None = sin límite)
+MAX_CONFIGURACIONES = 1_000_000
+
+# Niveles con al menos esta cantidad de configuraciones se reparten en el pool
+UMBRAL_POOL = 4096
+
+AVISOS_ND = {
+    MOTIVO_MAX_STEPS: AVISOS[MOTIVO_MAX_STEPS],
+    MOTIVO_MAX_CONFIGS: "# [Aviso] Se alcanzó el límite de configuraciones ({max_configs}) "
+                        "en la profundidad {pasos} sin aceptar.",
+    None: "# Ninguna rama acepta: el árbol se agotó en la profundidad {pasos} "
+          "({configs} configuraciones distintas).",
+}
+
+# Cabecera de cada configuración: estado y cabeza (índice en la cinta)
+_CAB = struct.Struct('<II')
+_TAM_CAB = _CAB.size
+
+# Tabla del proceso trabajador (ver _iniciar_trabajador)
+_TABLA: Optional['TablaND'] = None
+
+
+@dataclass
+class ResultadoND:
+    """
+    Resultado de `MaquinaTuringND.explorar`.
+
+    Atributos:
+        veredicto: ACEPTA, RECHAZA (ninguna rama acepta) o LOOP (se agotó
+            el presupuesto)
+        motivo: Con LOOP, MOTIVO_MAX_STEPS o MOTIVO_MAX_CONFIGS
+        profundidad: Pasos del camino de aceptación, o niveles explorados
+        configuraciones: Configuraciones distintas vistas
+        frontera_max: Tamaño del nivel más grande
+        ramas_paradas: Ramas que pararon sin aceptar (qrej o δ indefinida)
+        camino: Configuraciones (u q v) desde la inicial hasta la de
+            aceptación; solo la inicial si no se aceptó
+    """
+    veredicto: str
+    motivo: Optional[str]
+    profundidad: int
+    configuraciones: int
+    frontera_max: int
+    ramas_paradas: int
+    camino: List[str] = field(default_factory=list)
+    # Claves de las configuraciones de `camino`
+    _claves: List[bytes] = field(default_factory=list, repr=False)
+
+
+class TablaND:
+    """
+    Forma compilada de una MaquinaTuringND.
+
+    Atributos:
+        estados / simbolos: Nombre de cada estado / símbolo por índice (el
+            blanco siempre es el símbolo 0)
+        id_estado / id_simbolo: Mapas inversos nombre -> índice
+        G: |Γ|
+        movs: Por `estado * |Γ| + símbolo`, tupla de (q', b, d) con d el
+            desplazamiento de la cabeza (-1, 0, 1); vacía si δ no está definida
+        lbp: Tope izquierdo como índice de la cinta
+    """
+
+    def __init__(self, mt: 'MaquinaTuringND'):
+        if len(mt.Gamma) > 256:
+            raise ValueError("Las máquinas no deterministas admiten a lo sumo 256 símbolos en Gamma.")
+
+        self.mt = mt
+        self.estados: List[State] = sorted(mt.Q)
+        self.simbolos: List[Symbol] = [mt.blank] + sorted(mt.Gamma - {mt.blank})
+        self.id_estado: Dict[State, int] = {q: i for i, q in enumerate(self.estados)}
+        self.id_simbolo: Dict[Symbol, int] = {s: i for i, s in enumerate(self.simbolos)}
+        self.G = len(self.simbolos)
+        self.q0 = self.id_estado[mt.q0]
+        self.qacc = self.id_estado[mt.qacc]
+        self.qrej = self.id_estado[mt.qrej]
+        # La celda i está en cinta[i - base]
+        self.base = min(0, mt.left_boundary)
+        self.lbp = mt.left_boundary - self.base
+
+        desplazamiento = {'L': -1, 'R': 1, 'S': 0}
+        self.movs: List[tuple] = [()] * (len(self.estados) * self.G)
+        for (q, a), movimientos in mt.delta.items():
+            self.movs[self.id_estado[q] * self.G + self.id_simbolo[a]] = tuple(
+                (self.id_estado[qp], self.id_simbolo[b], desplazamiento[m])
+                for qp, b, m in movimientos
+            )
+
+        self._mapa_dec = dict(enumerate(self.simbolos))
+        self._firma = self.firma_de(mt)
+
+    @staticmethod
+    def firma_de(mt: 'MaquinaTuringND') -> tuple:
+        """Datos de la MT de los que depende una compilación."""
+        return (id(mt.delta), len(mt.delta), mt.allow_S, mt.blank, mt.left_boundary,
+                mt.q0, mt.qacc, mt.qrej, len(mt.Q), len(mt.Gamma))
+
+    def firma(self) -> tuple:
+        """Firma de la MT en el momento de compilar."""
+        return self._firma
+
+    def raiz(self, w: str) -> bytes:
+        """Configuración inicial para la palabra w."""
+        ids = self.id_simbolo
+        cinta = bytes(-self.base) + bytes(ids[ch] for ch in w)
+        return _CAB.pack(self.q0, self.lbp) + cinta.rstrip(b'\x00')
+
+    def formatear(self, clave: bytes, sep: str) -> str:
+        """Configuración `clave` en notación u q v (misma ventana que una MT)."""
+        q, p = _CAB.unpack_from(clave)
+        cinta = clave[_TAM_CAB:]
+        L = min(self.lbp, p)
+        R = p
+        if cinta:
+            lo = len(cinta) - len(cinta.lstrip(b'\x00'))
+            L = min(L, lo)
+            R = max(R, len(cinta) - 1)
+        cinta = cinta.ljust(R + 1, b'\x00')
+        dec = self._mapa_dec
+        return (cinta[L:p].decode('latin-1').translate(dec) + sep + self.estados[q] + sep
+                + cinta[p:R + 1].decode('latin-1').translate(dec))
+
+    def expandir(self, nivel: List[bytes], implicit_reject_on_undef: bool):
+        """
+        Sucesores de las configuraciones de un nivel, en orden.
+
+        Returns:
+            Tupla (hijos, aceptada, paradas): hijos es una lista de (i, hijo)
+            con i el índice del padre en `nivel`; aceptada es el primer
+            (i, hijo) en qacc, o None (y entonces ya no se sigue); paradas
+            cuenta las ramas que pararon sin aceptar
+        """
+        movs, G, qacc, qrej, lbp = self.movs, self.G, self.qacc, self.qrej, self.lbp
+        unpack, pack = _CAB.unpack_from, _CAB.pack
+        hijos = []
+        paradas = 0
+        for i, clave in enumerate(nivel):
+            q, p = unpack(clave)
+            cinta = clave[_TAM_CAB:]
+            n = len(cinta)
+            opciones = movs[q * G + (cinta[p] if p < n else 0)]
+            if not opciones:
+                # Con o sin rechazo implícito la rama para sin aceptar
+                paradas += 1
+                continue
+            for qp, b, d in opciones:
+                if qp == qrej:
+                    paradas += 1
+                    continue
+                if p < n:
+                    t = cinta[:p] + bytes((b,)) + cinta[p + 1:]
+                    if not b:
+                        t = t.rstrip(b'\x00')
+                elif b:
+                    t = cinta + bytes(p - n) + bytes((b,))
+                else:
+                    t = cinta
+                np = p + d
+                if np < lbp:
+                    np = lbp
+                hijo = pack(qp, np) + t
+                if qp == qacc:
+                    return hijos, (i, hijo), paradas
+                hijos.append((i, hijo))
+        return hijos, None, paradas
+
+
+def _iniciar_trabajador(tabla: TablaND):
+    """Inicializador del pool: guarda la tabla una vez por proceso."""
+    global _TABLA
+    _TABLA = tabla
+
+
+def _expandir_bloque(args):
+    """Expande un bloque de un nivel con la tabla del proceso."""
+    bloque, implicit_reject_on_undef = args
+    return _TABLA.expandir(bloque, implicit_reject_on_undef)
+
+
+def _bloques(nivel: List[bytes], jobs: int) -> Iterable[List[bytes]]:
+    """Parte un nivel en unos 4 bloques por proceso."""
+    tam = max(UMBRAL_POOL // 4, -(-len(nivel) // (4 * jobs)))
+    for k in range(0, len(nivel), tam):
+        yield nivel[k:k + tam]
+
+
+class MaquinaTuringND(MaquinaTuring):
+    """
+    Máquina de Turing no determinista de una cinta.
+
+    Igual que MaquinaTuring, pero δ(q, a) es una tupla de movimientos
+    (ver `DeltaND`). `run`, `simulate` e `iter_configs` exploran el árbol de
+    configuraciones (ver `explorar`); la traza es el camino de aceptación.
+    """
+
+    def validate(self):
+        """Valida la especificación de la MT."""
+        if self.cintas != 1:
+            raise ValueError("Las máquinas no deterministas solo admiten una cinta.")
+        movimientos = self.delta
+        try:
+            # La validación de MaquinaTuring, sobre cada movimiento posible
+            self.delta = {(q, a): mov for (q, a), movs in movimientos.items() for mov in movs}
+            super().validate()
+        finally:
+            self.delta = movimientos
+        for (q, a), movs in movimientos.items():
+            if not movs:
+                raise ValueError(f"δ({q},{a}) no tiene movimientos.")
+
+    def _transiciones(self):
+        """Pares ((q, a), (q', b, M)), uno por movimiento posible."""
+        return [(clave, mov) for clave, movs in self.delta.items() for mov in movs]
+
+    def compilar(self) -> TablaND:
+        """
+        Devuelve la forma compilada de la MT (ver TablaND), reutilizando la
+        última compilación mientras la especificación no cambie.
+        """
+        tabla = getattr(self, '_compilada', None)
+        if tabla is None or tabla.firma() != tabla.firma_de(self):
+            tabla = self._compilada = TablaND(self)
+        return tabla
+
+    def explorar(self,
+                 w: str,
+                 max_steps: Optional[int] = None,
+                 implicit_reject_on_undef: bool = True,
+                 max_configs: Optional[int] = MAX_CONFIGURACIONES,
+                 jobs: Optional[int] = 1,
+                 config_variant: str = 'u q v') -> ResultadoND:
+        """
+        Busca en anchura una rama que acepte w.
+
+        Args:
+            w: Cadena de entrada
+            max_steps: Profundidad máxima (None = sin límite)
+            implicit_reject_on_undef: Si True, una δ indefinida rechaza; si
+                no, la rama se detiene. En ambos casos para sin aceptar
+            max_configs: Máximo de configuraciones distintas (None = sin límite)
+            jobs: Procesos para expandir los niveles grandes (None = núcleos
+                disponibles; 1 = sin pool)
+            config_variant: Formato del camino ('u q v' o 'uqv')
+
+        Returns:
+            ResultadoND
+        """
+        for ch in w:
+            if ch not in self.Sigma:
+                raise ValueError(f"Símbolo de entrada '{ch}' no pertenece a Sigma.")
+        if config_variant == 'u q v':
+            sep = ' '
+        elif config_variant == 'uqv':
+            sep = ''
+        else:
+            raise ValueError("config_variant debe ser 'uqv' o 'u q v'")
+        jobs = jobs or os.cpu_count() or 1
+
+        tabla = self.compilar()
+        raiz = tabla.raiz(w)
+        padre: Dict[bytes, Optional[bytes]] = {raiz: None}
+        nivel = [raiz]
+        profundidad = 0
+        frontera_max = 1
+        paradas = 0
+        veredicto, motivo, final = RECHAZA, None, None
+        if self.q0 == self.qacc:
+            veredicto, final = ACEPTA, raiz
+        elif self.q0 == self.qrej:
+            nivel = []
+
+        pool = None
+        try:
+            while nivel and final is None:
+                if max_steps is not None and profundidad >= max_steps:
+                    veredicto, motivo = LOOP, MOTIVO_MAX_STEPS
+                    break
+                if jobs > 1 and len(nivel) >= UMBRAL_POOL:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(max_workers=jobs,
+                                                   initializer=_iniciar_trabajador,
+                                                   initargs=(tabla,))
+                    hijos, aceptada, k = [], None, 0
+                    bloques = list(_bloques(nivel, jobs))
+                    for bloque, (h, a, p) in zip(bloques, pool.map(
+                            _expandir_bloque, ((b, implicit_reject_on_undef) for b in bloques))):
+                        hijos.extend((k + i, hijo) for i, hijo in h)
+                        paradas += p
+                        if a is not None:
+                            aceptada = (k + a[0], a[1])
+                            break
+                        k += len(bloque)
+                else:
+                    hijos, aceptada, p = tabla.expandir(nivel, implicit_reject_on_undef)
+                    paradas += p
+                profundidad += 1
+
+                if aceptada is not None:
+                    i, final = aceptada
+                    padre[final] = nivel[i]
+                    veredicto = ACEPTA
+                    break
+                siguiente = []
+                lleno = max_configs is not None and len(padre) >= max_configs
+                for i, hijo in hijos:
+                    if hijo not in padre:
+                        if lleno:
+                            veredicto, motivo = LOOP, MOTIVO_MAX_CONFIGS
+                            break
+                        padre[hijo] = nivel[i]
+                        siguiente.append(hijo)
+                        lleno = max_configs is not None and len(padre) >= max_configs
+                nivel = siguiente
+                frontera_max = max(frontera_max, len(nivel))
+                if motivo is not None:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        claves = [raiz]
+        if final is not None:
+            claves = []
+            while final is not None:
+                claves.append(final)
+                final = padre[final]
+            claves.reverse()
+        return ResultadoND(
+            veredicto=veredicto,
+            motivo=motivo,
+            profundidad=len(claves) - 1 if veredicto == ACEPTA else profundidad,
+            configuraciones=len(padre),
+            frontera_max=frontera_max,
+            ramas_paradas=paradas,
+            camino=[tabla.formatear(c, sep) for c in claves],
+            _claves=claves,
+        )
+
+    def iter_configs(self,
+                     w: str,
+                     max_steps: Optional[int] = None,
+                     config_variant: str = 'u q v',
+                     implicit_reject_on_undef: bool = True,
+                     engine: str = 'auto',
+                     detect_loops: bool = False,
+                     desde: Optional[PuntoControl] = None,
+                     cada_pasos: Optional[int] = None,
+                     al_punto=None,
+                     limites: Optional[Limites] = None,
+                     max_configs: Optional[int] = MAX_CONFIGURACIONES,
+                     jobs: Optional[int] = 1) -> EjecucionMT:
+        """
+        Explora el árbol (ver `explorar`) al pedir la primera configuración
+        y entrega el camino de aceptación. Si no se aceptó, entrega la
+        configuración inicial y una línea '#' con el motivo. `engine` y
+        `detect_loops` no aplican (las configuraciones repetidas siempre se
+        descartan).
+        """
+        if desde is not None or cada_pasos:
+            raise ValueError("Los puntos de control no admiten máquinas no deterministas.")
+        if limites is not None and limites.activos():
+            raise ValueError("Los límites de recursos no admiten máquinas no deterministas.")
+        for ch in w:
+            if ch not in self.Sigma:
+                raise ValueError(f"Símbolo de entrada '{ch}' no pertenece a Sigma.")
+        ejecucion = EjecucionMT(self)
+        ejecucion._gen = self._generar_camino(ejecucion, w, max_steps, config_variant,
+                                              implicit_reject_on_undef, max_configs, jobs)
+        return ejecucion
+
+    def _generar_camino(self, ejecucion: EjecucionMT, w: str, max_steps: Optional[int],
+                        config_variant: str, implicit_reject_on_undef: bool,
+                        max_configs: Optional[int], jobs: Optional[int]):
+        """Generador de `iter_configs`."""
+        res = self.explorar(w, max_steps, implicit_reject_on_undef, max_configs, jobs,
+                            config_variant)
+        yield from res.camino
+        q, cabeza = _CAB.unpack_from(res._claves[-1])
+        tabla = self.compilar()
+        if res.veredicto == ACEPTA:
+            ejecucion._terminar(self.qacc, cabeza + tabla.base, res.profundidad,
+                                len(res.camino))
+            return
+        estado = self.qrej if res.veredicto == RECHAZA else tabla.estados[q]
+        ejecucion._terminar(estado, cabeza + tabla.base, res.profundidad, 1, res.motivo)
+        yield AVISOS_ND[res.motivo].format(max_steps=max_steps, max_configs=max_configs,
+                                           pasos=res.profundidad,
+                                           configs=res.configuraciones)
+
+    def run(self,
+            w: str,
+            max_steps: Optional[int] = None,
+            implicit_reject_on_undef: bool = True,
+            engine: str = 'auto',
+            detect_loops: bool = True,
+            limites: Optional[Limites] = None,
+            max_configs: Optional[int] = MAX_CONFIGURACIONES,
+            jobs: Optional[int] = 1) -> ResultadoMT:
+        """
+        Como `explorar`, pero con el resultado como ResultadoMT: la cinta es
+        la de la configuración de aceptación (o la inicial si no se aceptó)
+        y `pasos` es la profundidad.
+        """
+        if limites is not None and limites.activos():
+            raise ValueError("Los límites de recursos no admiten máquinas no deterministas.")
+        res = self.explorar(w, max_steps, implicit_reject_on_undef, max_configs, jobs)
+        tabla = self.compilar()
+        q, p = _CAB.unpack_from(res._claves[-1])
+        cinta = res._claves[-1][_TAM_CAB:]
+        recorte = cinta.lstrip(b'\x00')
+        inicio = len(cinta) - len(recorte)
+        if recorte:
+            texto, inicio = recorte.decode('latin-1').translate(tabla._mapa_dec), inicio + tabla.base
+        else:
+            texto, inicio = '', p + tabla.base
+        cabeza_max = max(_CAB.unpack_from(c)[1] for c in res._claves) + tabla.base
+        if res.veredicto == ACEPTA:
+            estado = self.qacc
+        elif res.veredicto == RECHAZA:
+            estado = self.qrej
+        else:
+            estado = tabla.estados[q]
+        return self._resultado(estado, p + tabla.base, res.profundidad, res.motivo,
+                               texto, inicio, len(w), cabeza_max)
+
+    def estadisticas(self, w: str, *args, **kwargs):
+        """No aplica: las estadísticas siguen una sola ejecución."""
+        raise ValueError("Las estadísticas no admiten máquinas no deterministas.")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Optimización de máquinas de Turing: poda y fusión de estados equivalentes.
+
+`optimizar` devuelve una MT más pequeña que acepta, rechaza y deja la cinta
+exactamente igual, paso a paso, sobre toda entrada:
+
+1. Quita los estados inalcanzables desde q0 y sus transiciones.
+2. Quita las transiciones que salen de qacc o qrej (nunca se aplican).
+3. Fusiona los estados cuyas filas de δ son iguales salvo renombrar
+   estados, por refinamiento de particiones (como la minimización de
+   autómatas): se parte de clases por el patrón (símbolo escrito,
+   movimiento) de cada fila y se separan estados mientras sus destinos
+   caigan en clases distintas.
+
+Las trazas de la MT optimizada muestran el representante de cada clase.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from maquina_turing import MaquinaTuring, State
+
+
+@dataclass
+class InformeOptimizacion:
+    """
+    Qué cambió al optimizar una MT.
+
+    Atributos:
+        estados_antes / estados_despues: |Q| antes y después
+        transiciones_antes / transiciones_despues: |δ| antes y después
+        inalcanzables: Estados quitados por no alcanzarse desde q0
+        desde_paro: Transiciones quitadas por salir de qacc o qrej
+        fusionados: Representante -> estados fusionados en él
+    """
+    estados_antes: int
+    estados_despues: int
+    transiciones_antes: int
+    transiciones_despues: int
+    inalcanzables: List[State] = field(default_factory=list)
+    desde_paro: int = 0
+    fusionados: Dict[State, List[State]] = field(default_factory=dict)
+
+    def resumen(self) -> str:
+        """Una línea con los totales."""
+        return (f"{self.estados_antes} → {self.estados_despues} estados, "
+                f"{self.transiciones_antes} → {self.transiciones_despues} transiciones "
+                f"({len(self.inalcanzables)} inalcanzables, "
+                f"{sum(len(v) for v in self.fusionados.values())} fusionados, "
+                f"{self.desde_paro} desde estados de paro)")
+
+    def detalle(self) -> List[str]:
+        """Líneas con los estados quitados y cada fusión."""
+        lineas = []
+        if self.inalcanzables:
+            lineas.append(f"Inalcanzables: {', '.join(self.inalcanzables)}")
+        for rep, otros in sorted(self.fusionados.items()):
+            lineas.append(f"{', '.join(otros)} → {rep}")
+        return lineas
+
+
+def alcanzables(mt: MaquinaTuring) -> List[State]:
+    """Estados alcanzables desde q0 siguiendo δ (sin salir de qacc/qrej)."""
+    sucesores: Dict[State, set] = {}
+    for (q, _), (qp, _, _) in mt.delta.items():
+        sucesores.setdefault(q, set()).add(qp)
+    paro = (mt.qacc, mt.qrej)
+    vistos = {mt.q0}
+    pendientes = [mt.q0]
+    while pendientes:
+        q = pendientes.pop()
+        if q in paro:
+            continue
+        for qp in sucesores.get(q, ()):
+            if qp not in vistos:
+                vistos.add(qp)
+                pendientes.append(qp)
+    return sorted(vistos)
+
+
+def clases_equivalentes(mt: MaquinaTuring, estados: List[State]) -> Dict[State, int]:
+    """
+    Particiona `estados` en clases de estados con el mismo comportamiento.
+
+    qacc y qrej quedan cada uno en su propia clase. Dos estados que no son
+    de paro son equivalentes si, para cada símbolo leído, ambos tienen δ
+    indefinida, o ambos escriben lo mismo, mueven igual y van a estados
+    equivalentes.
+
+    Usa el algoritmo de Hopcroft: cada clase pendiente separa a las demás
+    según qué estados llegan a ella con cada símbolo, y de una clase
+    partida solo se encola la mitad menor, así que el costo es
+    O(|δ| log |Q|) en lugar de una pasada completa por nivel de
+    refinamiento.
+
+    Returns:
+        Estado -> número de clase
+    """
+    vivos = set(estados)
+    paro = (mt.qacc, mt.qrej)
+    patron: Dict[State, list] = {q: [] for q in estados}
+    inversa: Dict[State, List[tuple]] = {}
+    for (q, a), (qp, b, m) in mt.delta.items():
+        if q in vivos and q not in paro:
+            patron[q].append((a, b, m))
+            inversa.setdefault(qp, []).append((a, q))
+
+    # Partición inicial: los estados de paro aparte, el resto por el patrón
+    # (símbolo leído, escrito, movimiento) de su fila sin mirar el destino.
+    # Como una clase comparte los símbolos con δ definida, las transiciones
+    # indefinidas ya no separan a nadie
+    iniciales: Dict[tuple, set] = {}
+    for q in estados:
+        firma = (('paro', q),) if q in paro else tuple(sorted(patron[q]))
+        iniciales.setdefault(firma, set()).add(q)
+    bloques = list(iniciales.values())
+    bloque_de = {q: i for i, bloque in enumerate(bloques) for q in bloque}
+
+    pendientes = set(range(len(bloques)))
+    while pendientes:
+        divisor = list(bloques[pendientes.pop()])
+        # Para cada símbolo, los estados que con él llegan al divisor
+        llegan: Dict[object, List[State]] = {}
+        for qp in divisor:
+            for a, q in inversa.get(qp, ()):
+                llegan.setdefault(a, []).append(q)
+        for origen in llegan.values():
+            tocados: Dict[int, List[State]] = {}
+            for q in origen:
+                tocados.setdefault(bloque_de[q], []).append(q)
+            for b, dentro in tocados.items():
+                bloque = bloques[b]
+                if len(dentro) == len(bloque):
+                    continue
+                nuevo = set(dentro)
+                bloque -= nuevo
+                n = len(bloques)
+                bloques.append(nuevo)
+                for q in nuevo:
+                    bloque_de[q] = n
+                if b in pendientes or len(nuevo) <= len(bloque):
+                    pendientes.add(n)
+                else:
+                    pendientes.add(b)
+    return bloque_de
+
+
+def optimizar(mt: MaquinaTuring) -> Tuple[MaquinaTuring, InformeOptimizacion]:
+    """
+    Devuelve una MT equivalente sin estados inalcanzables, sin transiciones
+    desde estados de paro y con los estados equivalentes fusionados.
+
+    La MT original no se modifica. El representante de cada clase es q0,
+    qacc o qrej si pertenecen a ella y, si no, el menor nombre.
+
+    Args:
+        mt: Máquina a optimizar
+
+    Returns:
+        Tupla (MT optimizada, InformeOptimizacion)
+    """
+    estados = alcanzables(mt)
+    # qacc y qrej siguen en Q aunque no se alcancen (la MT los exige)
+    for q in (mt.qacc, mt.qrej):
+        if q not in estados:
+            estados.append(q)
+    vivos = set(estados)
+    inalcanzables = sorted(mt.Q - vivos)
+    desde_paro = sum(1 for (q, _) in mt.delta if q == mt.qacc or q == mt.qrej)
+
+    clase = clases_equivalentes(mt, estados)
+    miembros: Dict[int, List[State]] = {}
+    for q in sorted(estados):
+        miembros.setdefault(clase[q], []).append(q)
+    preferidos = (mt.q0, mt.qacc, mt.qrej)
+    rep: Dict[State, State] = {}
+    fusionados: Dict[State, List[State]] = {}
+    for grupo in miembros.values():
+        r = next((q for q in preferidos if q in grupo), grupo[0])
+        for q in grupo:
+            rep[q] = r
+        if len(grupo) > 1:
+            fusionados[r] = [q for q in grupo if q != r]
+
+    delta = {}
+    for (q, a), (qp, b, m) in mt.delta.items():
+        if rep.get(q) == q and q != mt.qacc and q != mt.qrej:
+            delta[(q, a)] = (rep[qp], b, m)
+
+    optimizada = MaquinaTuring(
+        Q=set(rep.values()),
+        Sigma=set(mt.Sigma),
+        Gamma=set(mt.Gamma),
+        blank=mt.blank,
+        q0=mt.q0,
+        qacc=mt.qacc,
+        qrej=mt.qrej,
+        delta=delta,
+        allow_S=mt.allow_S,
+        left_boundary=mt.left_boundary,
+        validar=False,
+        cintas=mt.cintas
+    )
+    informe = InformeOptimizacion(
+        estados_antes=len(mt.Q),
+        estados_despues=len(optimizada.Q),
+        transiciones_antes=len(mt.delta),
+        transiciones_despues=len(delta),
+        inalcanzables=inalcanzables,
+        desde_paro=desde_paro,
+        fusionados=fusionados,
+    )
+    return optimizada, informe
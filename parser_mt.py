@@ -3,46 +3,114 @@
 """
 Parser de especificaciones de Máquina de Turing.
 Lee archivos .txt con el formato de clase y construye la MT.
+
+El parseo es de una sola pasada: el flujo se lee por trozos, cada
+transición se valida contra Q y Γ en cuanto aparece y la MT se construye
+sin volver a recorrer δ. Los tramos de transiciones consecutivas se
+procesan de una vez con operaciones sobre cadenas y conjuntos; si un tramo
+trae algo fuera de lo común se reprocesa línea por línea con la expresión
+regular, que es la que decide qué es válido. Los errores no detienen el
+parseo: se reúnen todos, con su número de línea.
 """
 
+import gc
+import io
+import os
 import re
-from typing import Set, Tuple
+from typing import List, Optional, Set, TextIO, Tuple, Union
+
 from maquina_turing import MaquinaTuring, Delta, State, Symbol
+from no_determinista_mt import MaquinaTuringND
 
 # Expresiones regulares para parsing
 _keyval = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.+?)\s*$')
 _set = re.compile(r'^\{\s*(.*?)\s*\}$')
 _trans = re.compile(r'^\s*\(\s*([A-Za-z0-9_]+)\s*,\s*(.)\s*\)\s*->\s*\(\s*([A-Za-z0-9_]+)\s*,\s*(.)\s*,\s*([LRS])\s*\)\s*$')
+_nombre_estado = re.compile(r'[A-Za-z0-9_]+')
+# Con k > 1 cintas: (q, a1, ..., ak) -> (p, b1, ..., bk, M1, ..., Mk)
+_trans_k = re.compile(r'^\s*\(\s*([A-Za-z0-9_]+)\s*,(.*?)\)\s*->\s*\(\s*([A-Za-z0-9_]+)\s*,(.*)\)\s*$')
+
+# Camino rápido: espacios entre dos caracteres que no son separadores
+# (p. ej. "q 0" o "- >"), que obligan a usar la expresión regular
+_hueco = re.compile(r'[^\s(),][ \t\r\f\v]+[^\s(),]')
+
+# Fin de la última línea de un tramo que empieza con '('
+_fin_tramo = re.compile(r'\n[^(]')
+
+# Caracteres leídos por vez del flujo (el parseo nunca tiene más en memoria)
+TAM_TROZO = 1 << 20
+
+# Errores que se listan en el mensaje de ErrorEspecificacion
+MAX_ERRORES_MOSTRADOS = 20
+
+# Nombre canónico de cada clave admitida
+_CLAVES = {
+    'q': 'Q',
+    'sigma': 'Sigma',
+    'gamma': 'Gamma',
+    'blank': 'blank', 'blanco': 'blank',
+    'q0': 'q0', 'inicial': 'q0', 'estado_inicial': 'q0',
+    'qaccept': 'qaccept', 'q_accept': 'qaccept', 'aceptacion': 'qaccept', 'qacc': 'qaccept',
+    'qreject': 'qreject', 'q_reject': 'qreject', 'rechazo': 'qreject', 'qrej': 'qreject',
+    'input': 'input', 'entrada': 'input', 'w': 'input',
+    'tapes': 'cintas', 'cintas': 'cintas',
+    'nondeterministic': 'no_determinista', 'no_determinista': 'no_determinista',
+    'ntm': 'no_determinista',
+}
+
+# Valores admitidos para `no_determinista`
+_SI = {'si', 'sí', 'yes', 'true', '1'}
+_NO = {'no', 'false', '0'}
+
+_OBLIGATORIAS = ('Q', 'Sigma', 'Gamma', 'blank', 'q0', 'qaccept', 'qreject')
+
+
+class ErrorEspecificacion(ValueError):
+    """
+    Errores encontrados al parsear una especificación.
+
+    Atributos:
+        errores: Lista de (número de línea o None, mensaje), en orden
+    """
+
+    def __init__(self, errores: List[Tuple[Optional[int], str]]):
+        self.errores = errores
+        lineas = [f"Línea {n}: {msg}" if n is not None else msg
+                  for n, msg in errores[:MAX_ERRORES_MOSTRADOS]]
+        if len(errores) > MAX_ERRORES_MOSTRADOS:
+            lineas.append(f"... y {len(errores) - MAX_ERRORES_MOSTRADOS} errores más.")
+        super().__init__('\n'.join(lineas))
 
 
 def parse_set(s: str) -> Set[str]:
     """
     Parse un conjunto en formato {a, b, c}.
-    
+
     Args:
         s: String con el conjunto
-        
+
     Returns:
         Set con los elementos
-        
+
     Raises:
         ValueError: Si el formato es inválido
     """
     m = _set.match(s)
     if not m:
         raise ValueError(f"Conjunto mal formado: {s}")
-    
+
     body = m.group(1).strip()
     if not body:
         return set()
-    
+
     return {p.strip() for p in body.split(',')}
 
 
-def parse_spec(path: str, allow_S: bool = False) -> Tuple[MaquinaTuring, str]:
+def parse_spec(fuente: Union[str, os.PathLike, TextIO],
+               allow_S: bool = False) -> Tuple[MaquinaTuring, str]:
     """
-    Parse un archivo de especificación de MT.
-    
+    Parse una especificación de MT desde un archivo o un flujo de texto.
+
     Formato esperado:
     ```
     Q = {q0, q1, qacc, qrej}
@@ -52,136 +120,411 @@ def parse_spec(path: str, allow_S: bool = False) -> Tuple[MaquinaTuring, str]:
     q0 = q0
     qaccept = qacc
     qreject = qrej
-    
+
     delta:
     (q0, 0) -> (q1, 0, R)
     (q0, 1) -> (qacc, 1, R)
-    
+
     input = 0101
     ```
-    
+
     Args:
-        path: Ruta al archivo de especificación
+        fuente: Ruta al archivo de especificación, o flujo de texto abierto
         allow_S: Si True, permite movimiento S (quedarse)
-        
+
     Returns:
         Tupla (MaquinaTuring, cadena_entrada)
-        
+
     Raises:
-        ValueError: Si hay errores en la especificación
+        ErrorEspecificacion: Si hay errores en la especificación (todos,
+            con su número de línea)
     """
-    # Variables para almacenar la especificación
-    Q = Sigma = Gamma = None
-    blank = None
-    q0 = qacc = qrej = None
-    delta: Delta = {}
-    input_w = ''
-    in_delta = False
-
-    # Leer archivo
-    with open(path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    # Parsear línea por línea
-    for line_num, raw in enumerate(lines, 1):
+    if hasattr(fuente, 'read'):
+        return _Parser(allow_S).parse(fuente)
+    with open(fuente, 'r', encoding='utf-8') as f:
+        return _Parser(allow_S).parse(f)
+
+
+def parse_texto(texto: str, allow_S: bool = False) -> Tuple[MaquinaTuring, str]:
+    """
+    Como `parse_spec`, pero con la especificación ya en memoria.
+
+    Args:
+        texto: Contenido de la especificación
+        allow_S: Si True, permite movimiento S (quedarse)
+
+    Returns:
+        Tupla (MaquinaTuring, cadena_entrada)
+
+    Raises:
+        ErrorEspecificacion: Si hay errores en la especificación
+    """
+    return _Parser(allow_S).parse(io.StringIO(texto, newline=None))
+
+
+class _Parser:
+    """Estado de un parseo en curso (una sola pasada sobre las líneas)."""
+
+    def __init__(self, allow_S: bool):
+        self.allow_S = allow_S
+        self.valores = {}
+        self.linea_de = {}
+        self.delta: Delta = {}
+        self.errores: List[Tuple[Optional[int], str]] = []
+        # Se fija con la primera transición: True si Q y Γ ya se conocen y
+        # cada transición se valida al llegar; False si hay que esperar
+        # al final (las transiciones quedan en `diferidas`)
+        self.directo: Optional[bool] = None
+        self.diferidas: List[tuple] = []
+        self.en_delta = False
+        # Número de cintas y no determinismo; solo pueden cambiar antes de
+        # la primera transición
+        self.k = 1
+        self.nd = False
+
+    def error(self, num: Optional[int], msg: str) -> None:
+        self.errores.append((num, msg))
+
+    def parse(self, f: TextIO) -> Tuple[MaquinaTuring, str]:
+        """Lee el flujo por trozos de líneas completas y construye la MT."""
+        # δ son cientos de miles de tuplas sin ciclos: con el recolector
+        # activo se recorrerían una y otra vez mientras crece
+        reactivar = gc.isenabled()
+        gc.disable()
+        try:
+            resto = ''
+            num = 1
+            while True:
+                leido = f.read(TAM_TROZO)
+                texto = resto + leido
+                resto = ''
+                if leido:
+                    corte = texto.rfind('\n') + 1
+                    texto, resto = texto[:corte], texto[corte:]
+                num = self.trozo(texto, num)
+                if not leido:
+                    break
+            return self.terminar()
+        finally:
+            if reactivar:
+                gc.enable()
+
+    def trozo(self, texto: str, num: int) -> int:
+        """
+        Procesa un trozo de líneas completas cuya primera línea es `num`.
+
+        Returns:
+            Número de la línea siguiente al trozo
+        """
+        pos = 0
+        fin_texto = len(texto)
+        while pos < fin_texto:
+            # Transiciones en la columna 0: todo el tramo va en un bloque
+            if self.en_delta and texto.startswith('(', pos):
+                m = _fin_tramo.search(texto, pos)
+                fin = m.start() + 1 if m else fin_texto
+                k = texto.count('\n', pos, fin)
+                if not texto.endswith('\n', pos, fin):
+                    k += 1
+                self.bloque(texto[pos:fin], num, k)
+                num += k
+                pos = fin
+                continue
+            fin = texto.find('\n', pos) + 1 or fin_texto
+            self.linea(num, texto[pos:fin])
+            num += 1
+            pos = fin
+        return num
+
+    def linea(self, num: int, raw: str) -> None:
+        """Procesa una línea suelta (definición, comentario, etc.)."""
         line = raw.strip()
-        
+
         # Ignorar comentarios y líneas vacías
         if not line or line.startswith('#'):
-            continue
-        
+            return
+
         # Detectar inicio de sección delta
         if line.lower().startswith('delta'):
-            in_delta = True
-            continue
-        
-        # Parsear transiciones
-        if in_delta:
-            m = _trans.match(line)
-            if m:
-                # Es una transición válida
-                q, a, qp, b, M = m.groups()
-                
-                # Validar movimiento S
-                if not allow_S and M == 'S':
-                    raise ValueError(
-                        f"Línea {line_num}: Este archivo usa 'S' pero la variante "
-                        f"base solo permite L/R (use --allow-S si es necesario)."
-                    )
-                
-                # Verificar determinismo
-                if (q, a) in delta:
-                    raise ValueError(
-                        f"Línea {line_num}: Determinismo violado, "
-                        f"ya existe δ({q},{a})."
-                    )
-                
-                delta[(q, a)] = (qp, b, M)
-                continue
-            else:
-                # No es una transición, salir del modo delta
-                in_delta = False
-        
-        # Parsear definiciones (Q = {...}, q0 = ..., etc.)
+            self.en_delta = True
+            return
+
+        if self.en_delta and self.transicion(num, line):
+            return
+
+        # Parsear definiciones (Q = {...}, q0 = ..., etc.); una línea
+        # no reconocida dentro de delta no cierra la sección
         m = _keyval.match(line)
         if not m:
-            raise ValueError(f"Línea {line_num}: Línea no reconocida: '{line}'")
-        
-        key, val = m.groups()
-        kl = key.strip().lower()
-        
-        try:
-            if kl == 'q':
-                Q = parse_set(val)
-            elif kl == 'sigma':
-                Sigma = parse_set(val)
-            elif kl == 'gamma':
-                Gamma = parse_set(val)
-            elif kl in ('blank', 'blanco'):
-                blank = val.strip()
-                if len(blank) != 1:
-                    raise ValueError(
-                        "El símbolo blanco debe tener un solo carácter (ej: '⊔')."
-                    )
-            elif kl in ('q0', 'inicial', 'estado_inicial'):
-                q0 = val.strip()
-            elif kl in ('qaccept', 'q_accept', 'aceptacion', 'qacc'):
-                qacc = val.strip()
-            elif kl in ('qreject', 'q_reject', 'rechazo', 'qrej'):
-                qrej = val.strip()
-            elif kl in ('input', 'entrada', 'w'):
-                input_w = val.strip()
+            self.error(num, f"Línea no reconocida: '{line}'")
+            return
+        self.en_delta = False
+        self.clave(num, *m.groups())
+
+    def clave(self, num: int, key: str, val: str) -> None:
+        """Procesa una definición `clave = valor`."""
+        nombre = _CLAVES.get(key.strip().lower())
+        if nombre is None:
+            self.error(num, f"Clave desconocida: '{key}'")
+            return
+        if nombre in self.linea_de:
+            self.error(num, f"'{key}' ya se definió en la línea {self.linea_de[nombre]}.")
+            return
+        self.linea_de[nombre] = num
+
+        if nombre in ('Q', 'Sigma', 'Gamma'):
+            try:
+                self.valores[nombre] = parse_set(val)
+            except ValueError as e:
+                self.error(num, str(e))
+        elif nombre == 'cintas':
+            if self.directo is not None:
+                self.error(num, f"'{key}' debe definirse antes de las transiciones.")
+            elif not val.strip().isdigit() or int(val) < 1:
+                self.error(num, "El número de cintas debe ser un entero mayor o igual que 1.")
+            else:
+                self.k = int(val)
+        elif nombre == 'no_determinista':
+            valor = val.strip().lower()
+            if self.directo is not None:
+                self.error(num, f"'{key}' debe definirse antes de las transiciones.")
+            elif valor not in _SI | _NO:
+                self.error(num, f"'{key}' debe ser 'si' o 'no'.")
             else:
-                raise ValueError(f"Clave desconocida: '{key}'")
-        except ValueError as e:
-            raise ValueError(f"Línea {line_num}: {e}")
-
-    # Validar que todos los campos obligatorios estén presentes
-    required = [
-        ('Q', Q),
-        ('Sigma', Sigma),
-        ('Gamma', Gamma),
-        ('blank', blank),
-        ('q0', q0),
-        ('qaccept', qacc),
-        ('qreject', qrej)
-    ]
-    
-    missing = [name for name, value in required if value is None]
-    if missing:
-        raise ValueError(f"Faltan especificar los siguientes campos: {', '.join(missing)}")
-
-    # Crear la Máquina de Turing
-    mt = MaquinaTuring(
-        Q=Q,
-        Sigma=Sigma,
-        Gamma=Gamma,
-        blank=blank,
-        q0=q0,
-        qacc=qacc,
-        qrej=qrej,
-        delta=delta,
-        allow_S=allow_S
-    )
-    
-    return mt, input_w
+                self.nd = valor in _SI
+        elif nombre == 'blank':
+            blank = val.strip()
+            if len(blank) != 1:
+                self.error(num, "El símbolo blanco debe tener un solo carácter (ej: '⊔').")
+            else:
+                self.valores[nombre] = blank
+        else:
+            self.valores[nombre] = val.strip()
+
+    def preparar(self) -> None:
+        """Fija el modo de validación al llegar la primera transición."""
+        Q = self.valores.get('Q')
+        Gamma = self.valores.get('Gamma')
+        self.directo = Q is not None and Gamma is not None
+        if not self.directo:
+            return
+        self.Q, self.Gamma = Q, Gamma
+        # Lo que el camino rápido acepta sin consultar la expresión regular
+        self.estados_ok = {q for q in Q if _nombre_estado.fullmatch(q)}
+        self.simbolos_ok = {s for s in Gamma if len(s) == 1}
+        self.movs_ok = {'L', 'R', 'S'} if self.allow_S else {'L', 'R'}
+
+    def bloque(self, texto: str, primera: int, k: int) -> None:
+        """
+        Procesa k transiciones consecutivas (la primera en la línea `primera`).
+
+        Con los separadores unificados, "(q, a) -> (p, b, M)" por línea queda
+        como una lista plana q, a, p, b, M, '\\n', q, ... que se valida por
+        columnas con operaciones de conjuntos. Cualquier cosa rara (un
+        error, un formato dudoso) manda el bloque al camino lento.
+        """
+        if self.directo is None:
+            self.preparar()
+        if self.directo and self.k == 1 and not self.nd:
+            if not texto.endswith('\n'):
+                texto += '\n'
+            # Espaciado canónico; si no, se quitan los espacios salvo que
+            # separen dos nombres
+            if self.rapido(texto, k, ') -> (', ', '):
+                return
+            if not _hueco.search(texto):
+                t = texto.replace(' ', '').replace('\t', '').replace('\r', '')
+                if self.rapido(t, k, ')->(', ','):
+                    return
+
+        lineas = texto.split('\n')
+        for num, linea in enumerate(lineas[:k], primera):
+            linea = linea.strip()
+            if not self.transicion(num, linea):
+                self.error(num, f"Línea no reconocida: '{linea}'")
+
+    def rapido(self, t: str, k: int, flecha: str, coma: str) -> bool:
+        """
+        Camino rápido de `bloque` con el espaciado dado.
+
+        Returns:
+            False si algo no cuadra (y δ queda como estaba)
+        """
+        t = t.replace(flecha, coma).replace(')\n(', coma + '\n' + coma)
+        if not (t[0] == '(' and t.endswith(')\n')):
+            return False
+        toks = t[1:-2].split(coma)
+        if len(toks) != 6 * k - 1 or toks[5::6].count('\n') != k - 1:
+            return False
+        qs, as_, qps, bs, ms = toks[0::6], toks[1::6], toks[2::6], toks[3::6], toks[4::6]
+        if not (self.estados_ok.issuperset(qs) and self.estados_ok.issuperset(qps)
+                and self.simbolos_ok.issuperset(as_) and self.simbolos_ok.issuperset(bs)
+                and self.movs_ok.issuperset(ms)):
+            return False
+
+        delta = self.delta
+        claves = list(zip(qs, as_))
+        if delta and not delta.keys().isdisjoint(claves):
+            return False
+        antes = len(delta)
+        delta.update(zip(claves, zip(qps, bs, ms)))
+        if len(delta) != antes + k:
+            # δ(q, a) repetida dentro del bloque
+            for clave in claves:
+                delta.pop(clave, None)
+            return False
+        return True
+
+    def transicion(self, num: int, line: str) -> bool:
+        """
+        Camino lento: una transición con la expresión regular.
+
+        Returns:
+            False si la línea no tiene forma de transición
+        """
+        if self.k > 1:
+            return self.transicion_k(num, line)
+        m = _trans.match(line)
+        if not m:
+            return False
+        if self.directo is None:
+            self.preparar()
+        q, a, qp, b, M = m.groups()
+        return self.agregar(num, q, a, qp, b, M)
+
+    def transicion_k(self, num: int, line: str) -> bool:
+        """Como `transicion`, con una tupla de k símbolos y movimientos."""
+        m = _trans_k.match(line)
+        if not m:
+            return False
+        q, leidos, qp, resto = m.groups()
+        a = tuple(x.strip() for x in leidos.split(','))
+        resto = [x.strip() for x in resto.split(',')]
+        if self.directo is None:
+            self.preparar()
+        if len(a) != self.k or len(resto) != 2 * self.k:
+            self.error(num, f"Con {self.k} cintas, una transición lee {self.k} símbolos "
+                            f"y escribe {self.k} símbolos con {self.k} movimientos.")
+            return True
+        b, M = tuple(resto[:self.k]), tuple(resto[self.k:])
+        if any(len(x) != 1 for x in a + b) or any(x not in ('L', 'R', 'S') for x in M):
+            return False
+        return self.agregar(num, q, a, qp, b, M)
+
+    def agregar(self, num: int, q: State, a, qp: State, b, M) -> bool:
+        """Comprueba y agrega δ(q, a) = (qp, b, M) leída en la línea `num`."""
+        # Validar movimiento S
+        if not self.allow_S and 'S' in M:
+            self.error(num, "Este archivo usa 'S' pero la variante base solo permite "
+                            "L/R (use --allow-S si es necesario).")
+            return True
+
+        if self.nd:
+            # δ(q, a) es la lista de movimientos; los repetidos se ignoran
+            if (qp, b, M) in self.delta.get((q, a), ()):
+                return True
+            if not self.directo:
+                self.delta.setdefault((q, a), []).append((qp, b, M))
+                self.diferidas.append((num, q, a, qp, b, M))
+            elif self.validar(num, q, a, qp, b):
+                self.delta.setdefault((q, a), []).append((qp, b, M))
+            return True
+
+        # Verificar determinismo
+        if (q, a) in self.delta:
+            self.error(num, f"Determinismo violado, ya existe δ({q},{self.nombre(a)}) "
+                            f"(use 'no_determinista = si' para una MT no determinista).")
+            return True
+
+        if not self.directo:
+            self.delta[(q, a)] = (qp, b, M)
+            self.diferidas.append((num, q, a, qp, b, M))
+        elif self.validar(num, q, a, qp, b):
+            self.delta[(q, a)] = (qp, b, M)
+        return True
+
+    def nombre(self, a) -> str:
+        """Símbolo(s) leídos tal como se muestran en δ(q, ...)."""
+        return ','.join(a) if self.k > 1 else a
+
+    def validar(self, num: int, q: State, a, qp: State, b) -> bool:
+        """Comprueba que los estados y símbolos de δ(q, a) estén en Q y Γ."""
+        if q not in self.Q or qp not in self.Q:
+            self.error(num, f"Estados en δ({q},{self.nombre(a)}) deben pertenecer a Q.")
+            return False
+        if self.k > 1:
+            ok = self.Gamma.issuperset(a) and self.Gamma.issuperset(b)
+        else:
+            ok = a in self.Gamma and b in self.Gamma
+        if not ok:
+            self.error(num, f"Símbolos en δ({q},{self.nombre(a)}) deben pertenecer a Gamma.")
+            return False
+        return True
+
+    def terminar(self) -> Tuple[MaquinaTuring, str]:
+        """Validaciones globales y construcción de la MT."""
+        v = self.valores
+        missing = [name for name in _OBLIGATORIAS
+                   if name not in v and name not in self.linea_de]
+        if missing:
+            self.error(None, f"Faltan especificar los siguientes campos: {', '.join(missing)}")
+
+        Q, Sigma, Gamma, blank = v.get('Q'), v.get('Sigma'), v.get('Gamma'), v.get('blank')
+        if Q is not None:
+            for nombre, texto in (('q0', 'Estado inicial'),
+                                  ('qaccept', 'Estado de aceptación'),
+                                  ('qreject', 'Estado de rechazo')):
+                if nombre in v and v[nombre] not in Q:
+                    self.error(self.linea_de[nombre], f"{texto} {v[nombre]} no está en Q.")
+        if Gamma is not None:
+            if blank is not None and blank not in Gamma:
+                self.error(self.linea_de['blank'], f"Símbolo blanco '{blank}' no está en Gamma.")
+            if Sigma is not None and not Sigma.issubset(Gamma):
+                self.error(self.linea_de['Sigma'], "Sigma debe ser subconjunto de Gamma.")
+        if self.nd and self.k > 1:
+            self.error(self.linea_de['no_determinista'],
+                       "Las máquinas no deterministas solo admiten una cinta.")
+        if Sigma is not None and blank is not None and blank in Sigma:
+            self.error(self.linea_de['Sigma'],
+                       f"El símbolo blanco '{blank}' NO debe pertenecer a Sigma.")
+
+        if self.diferidas and Q is not None and Gamma is not None:
+            self.Q, self.Gamma = Q, Gamma
+            for num, q, a, qp, b, _ in self.diferidas:
+                self.validar(num, q, a, qp, b)
+
+        if self.errores:
+            self.errores.sort(key=lambda e: (e[0] is None, e[0] or 0))
+            raise ErrorEspecificacion(self.errores)
+
+        # Todo se validó arriba; no hace falta recorrer δ otra vez
+        if self.nd:
+            mt = MaquinaTuringND(
+                Q=Q,
+                Sigma=Sigma,
+                Gamma=Gamma,
+                blank=blank,
+                q0=v['q0'],
+                qacc=v['qaccept'],
+                qrej=v['qreject'],
+                delta={clave: tuple(movs) for clave, movs in self.delta.items()},
+                allow_S=self.allow_S,
+                validar=False
+            )
+            return mt, v.get('input', '')
+
+        mt = MaquinaTuring(
+            Q=Q,
+            Sigma=Sigma,
+            Gamma=Gamma,
+            blank=blank,
+            q0=v['q0'],
+            qacc=v['qaccept'],
+            qrej=v['qreject'],
+            delta=self.delta,
+            allow_S=self.allow_S,
+            validar=False,
+            cintas=self.k
+        )
+
+        return mt, v.get('input', '')
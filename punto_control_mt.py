@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Puntos de control para simulaciones largas con traza.
+
+Un punto de control es un JSON con la huella de la MT, las opciones de la
+simulación, el PuntoControl del motor (estado, cabeza, pasos, tramo no-blanco
+de la cinta y detector de ciclos) y el offset del archivo de traza hasta el
+que llegan las configuraciones ya escritas. Su tamaño depende de la cinta,
+no de la longitud de la traza.
+
+Se escribe en un temporal del mismo directorio y se renombra con os.replace:
+si el proceso muere a mitad de escritura, el punto anterior queda intacto.
+"""
+
+import json
+import os
+from dataclasses import asdict
+from typing import Tuple
+
+from maquina_turing import PuntoControl
+
+VERSION = 1
+
+# Con --checkpoint-secs, cada cuántos pasos se consulta el reloj
+PASOS_ENTRE_CONSULTAS = 16384
+
+
+def guardar_punto(path: str, datos: dict, punto: PuntoControl) -> None:
+    """
+    Escribe el punto de control de forma atómica.
+
+    Args:
+        path: Archivo destino
+        datos: Huella, spec, salida, offset y opciones de la simulación
+        punto: Estado de la ejecución en el paso guardado
+    """
+    contenido = dict(datos, version=VERSION, ejecucion=asdict(punto))
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(contenido, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def cargar_punto(path: str) -> Tuple[dict, PuntoControl]:
+    """
+    Lee un punto de control escrito por `guardar_punto`.
+
+    Returns:
+        Tupla (datos, punto)
+
+    Raises:
+        ValueError: Si el archivo no es un punto de control válido
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            datos = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Punto de control ilegible '{path}': {e}")
+    if datos.get('version') != VERSION:
+        raise ValueError(f"Versión de punto de control no soportada en '{path}'.")
+    punto = PuntoControl(**datos.pop('ejecucion'))
+    return datos, punto
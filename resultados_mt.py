@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de resultados: (máquina, palabra, opciones) -> ResultadoMT.
+
+Las barridas de regresión ejecutan una y otra vez las mismas máquinas sobre
+las mismas palabras; con esta caché (SQLite, en el directorio de cache_mt)
+cada combinación se simula una sola vez. La clave tiene tres partes:
+
+    - La huella canónica de la máquina (`huella_canonica`): δ normalizada
+      (estados renombrados en el orden en que se alcanzan desde q0, sin los
+      inalcanzables ni las transiciones desde qacc/qrej), blanco, Σ, Γ, tope
+      izquierdo y número de cintas. Dos especificaciones que solo difieren
+      en los nombres de los estados o en partes que no se ejecutan comparten
+      entradas; el estado final se guarda con su nombre canónico y se
+      traduce al de cada máquina
+    - La palabra de entrada
+    - max_steps, implicit_reject_on_undef y detect_loops
+
+Se guarda el ResultadoMT completo (veredicto, pasos, estado, cabeza, cinta
+final, extensión, motivo y las demás cintas). Las entradas se desalojan en
+orden LRU al pasar de `max_entradas`; no se guardan las cintas de más de
+MAX_CINTA símbolos ni los resultados cortados por un límite de recursos
+(dependen de los `Limites`, que no forman parte de la clave). Como en cache_mt, la base lleva la huella del
+código de los motores: si el simulador cambia, se vacía al abrirla.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+import analisis_mt
+import cinta_mt
+import maquina_turing
+import motor_mt
+import motor_multicinta
+from cache_mt import directorio_cache
+from maquina_turing import (MaquinaTuring, Limites, ResultadoMT, MOTIVO_MAX_CELDAS,
+                            MOTIVO_MAX_MEMORIA, MOTIVO_MAX_TIEMPO)
+from no_determinista_mt import MaquinaTuringND
+
+# Subir si cambia el esquema o la forma de la huella canónica
+VERSION = 1
+
+# Entradas por defecto antes de desalojar
+MAX_ENTRADAS = 100_000
+
+# Símbolos de cinta a partir de los cuales un resultado no se guarda
+MAX_CINTA = 1 << 20
+
+# Motivos de los resultados cortados por un límite de recursos (no se guardan)
+_MOTIVOS_LIMITE = frozenset((MOTIVO_MAX_CELDAS, MOTIVO_MAX_TIEMPO, MOTIVO_MAX_MEMORIA))
+
+# Al desalojar se baja hasta esta fracción de max_entradas, así el
+# desalojo no se repite en cada inserción
+_FRACCION_DESALOJO = 0.9
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    maquina TEXT NOT NULL,
+    palabra TEXT NOT NULL,
+    opciones TEXT NOT NULL,
+    veredicto TEXT NOT NULL,
+    pasos INTEGER NOT NULL,
+    estado TEXT NOT NULL,
+    cabeza INTEGER NOT NULL,
+    cinta TEXT NOT NULL,
+    inicio_cinta INTEGER NOT NULL,
+    extension INTEGER NOT NULL,
+    motivo TEXT,
+    cintas TEXT,
+    usado INTEGER NOT NULL,
+    PRIMARY KEY (maquina, palabra, opciones)
+);
+CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor
+);
+"""
+
+_version_codigo: Optional[str] = None
+
+
+def ruta_por_defecto() -> str:
+    """Base de datos de resultados dentro del directorio de la caché."""
+    return os.path.join(directorio_cache(), 'resultados.sqlite')
+
+
+def _codigo() -> str:
+    """Huella del código que produce los resultados (se calcula una vez)."""
+    global _version_codigo
+    if _version_codigo is None:
+        h = hashlib.sha256(b'%d' % VERSION)
+        for modulo in (maquina_turing, motor_mt, motor_multicinta, cinta_mt, analisis_mt):
+            with open(modulo.__file__, 'rb') as f:
+                h.update(f.read())
+        _version_codigo = h.hexdigest()
+    return _version_codigo
+
+
+def huella_canonica(mt: MaquinaTuring) -> Tuple[str, Dict[str, str]]:
+    """
+    Huella de la máquina independiente de los nombres de los estados.
+
+    Los estados se numeran en el orden en que los alcanza un recorrido en
+    anchura desde q0 que sigue δ por símbolo leído en orden; qacc y qrej
+    se llaman '+' y '-'. Solo entran las transiciones de los estados
+    alcanzados que no son de paro.
+
+    Returns:
+        Tupla (huella SHA-256, nombre canónico de cada estado alcanzado)
+
+    Raises:
+        ValueError: Si la máquina es no determinista
+    """
+    if isinstance(mt, MaquinaTuringND):
+        raise ValueError("La caché de resultados no admite máquinas no deterministas.")
+    salidas: Dict[str, list] = {}
+    for (q, a), mov in mt.delta.items():
+        salidas.setdefault(q, []).append((a, mov))
+
+    nombres = {mt.qacc: '+', mt.qrej: '-'}
+    orden = []
+
+    def nombrar(q):
+        if q not in nombres:
+            nombres[q] = str(len(orden))
+            orden.append(q)
+
+    nombrar(mt.q0)
+    i = 0
+    while i < len(orden):
+        for _, (qp, _, _) in sorted(salidas.get(orden[i], ())):
+            nombrar(qp)
+        i += 1
+
+    delta = sorted((nombres[q], a, nombres[qp], b, m)
+                   for q in orden
+                   for a, (qp, b, m) in salidas.get(q, ()))
+    partes = [
+        repr((VERSION, mt.cintas, mt.left_boundary, mt.blank, nombres[mt.q0])),
+        repr(sorted(mt.Sigma)), repr(sorted(mt.Gamma)),
+        repr(delta),
+    ]
+    huella = hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()
+    return huella, nombres
+
+
+def _clave_opciones(max_steps: Optional[int], implicit_reject_on_undef: bool,
+                    detect_loops: bool) -> str:
+    return f"{max_steps}|{int(implicit_reject_on_undef)}|{int(detect_loops)}"
+
+
+class CacheResultados:
+    """
+    Caché de resultados de `MaquinaTuring.run` sobre SQLite.
+
+    Uso:
+        with CacheResultados() as cache:
+            res = cache.run(mt, w, max_steps=1000)
+            print(cache.resumen())
+
+    Atributos:
+        aciertos, fallos: Consultas de esta sesión servidas desde la caché
+            y simuladas
+    """
+
+    def __init__(self, ruta: Optional[str] = None, max_entradas: int = MAX_ENTRADAS):
+        """
+        Abre (o crea) la base de resultados.
+
+        Args:
+            ruta: Archivo SQLite (default: `ruta_por_defecto()`)
+            max_entradas: Entradas a conservar; al pasarlas se desalojan
+                las usadas hace más tiempo
+        """
+        if max_entradas < 1:
+            raise ValueError("max_entradas debe ser positivo")
+        self.ruta = ruta or ruta_por_defecto()
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        # Huella canónica por máquina, para no recalcularla en cada palabra
+        self._huellas: Dict[int, Tuple[MaquinaTuring, str, Dict[str, str], Dict[str, str]]] = {}
+
+        directorio = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(directorio, mode=0o700, exist_ok=True)
+        self._db = sqlite3.connect(self.ruta, timeout=30)
+        with self._db:
+            self._db.executescript(_ESQUEMA)
+            if self._meta('codigo') != _codigo():
+                # Resultados de otra versión del simulador: no se reutilizan
+                self._db.execute("DELETE FROM resultados")
+                self._db.execute("DELETE FROM meta")
+                self._poner_meta('codigo', _codigo())
+        self._reloj = self._meta('reloj') or 0
+        self._entradas = self._db.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+    # -- contexto --------------------------------------------------------
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        """Guarda los contadores acumulados y cierra la base."""
+        if self._db is None:
+            return
+        with self._db:
+            self._poner_meta('reloj', self._reloj)
+            for nombre in ('aciertos', 'fallos'):
+                self._poner_meta(nombre, (self._meta(nombre) or 0) + getattr(self, nombre))
+        self._db.close()
+        self._db = None
+
+    # -- meta ------------------------------------------------------------
+
+    def _meta(self, clave: str):
+        fila = self._db.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def _poner_meta(self, clave: str, valor) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)",
+                         (clave, valor))
+
+    def _huella(self, mt: MaquinaTuring):
+        guardada = self._huellas.get(id(mt))
+        if guardada is None or guardada[0] is not mt:
+            huella, nombres = huella_canonica(mt)
+            inversos = {c: q for q, c in nombres.items()}
+            guardada = self._huellas[id(mt)] = (mt, huella, nombres, inversos)
+        return guardada[1:]
+
+    # -- consultas -------------------------------------------------------
+
+    def consultar_muchos(self, mt: MaquinaTuring, palabras: Iterable[str],
+                         max_steps: Optional[int] = None,
+                         implicit_reject_on_undef: bool = True,
+                         detect_loops: bool = True) -> Dict[str, ResultadoMT]:
+        """
+        Busca varias palabras a la vez.
+
+        Returns:
+            Diccionario palabra -> ResultadoMT con los aciertos (las que no
+            están, no aparecen); cuenta aciertos y fallos
+        """
+        huella, _, inversos = self._huella(mt)
+        opciones = _clave_opciones(max_steps, implicit_reject_on_undef, detect_loops)
+        palabras = list(dict.fromkeys(palabras))
+        encontrados = {}
+        # Por tramos: SQLite limita los parámetros de una consulta
+        for i in range(0, len(palabras), 500):
+            tramo = palabras[i:i + 500]
+            filas = self._db.execute(
+                "SELECT palabra, veredicto, pasos, estado, cabeza, cinta, inicio_cinta,"
+                " extension, motivo, cintas FROM resultados"
+                " WHERE maquina = ? AND opciones = ? AND palabra IN (%s)"
+                % ','.join('?' * len(tramo)),
+                [huella, opciones, *tramo])
+            for w, veredicto, pasos, estado, cabeza, cinta, inicio, ext, motivo, cintas in filas:
+                encontrados[w] = ResultadoMT(
+                    veredicto, pasos, inversos[estado], cabeza, cinta, inicio, ext, motivo,
+                    [tuple(c) for c in json.loads(cintas)] if cintas is not None else None)
+        if encontrados:
+            with self._db:
+                self._db.executemany(
+                    "UPDATE resultados SET usado = ?"
+                    " WHERE maquina = ? AND palabra = ? AND opciones = ?",
+                    [(self._tic(), huella, w, opciones) for w in encontrados])
+        self.aciertos += len(encontrados)
+        self.fallos += len(palabras) - len(encontrados)
+        return encontrados
+
+    def consultar(self, mt: MaquinaTuring, w: str,
+                  max_steps: Optional[int] = None,
+                  implicit_reject_on_undef: bool = True,
+                  detect_loops: bool = True) -> Optional[ResultadoMT]:
+        """El resultado guardado para (mt, w, opciones), o None."""
+        return self.consultar_muchos(mt, [w], max_steps, implicit_reject_on_undef,
+                                     detect_loops).get(w)
+
+    def guardar_muchos(self, mt: MaquinaTuring,
+                       resultados: Iterable[Tuple[str, ResultadoMT]],
+                       max_steps: Optional[int] = None,
+                       implicit_reject_on_undef: bool = True,
+                       detect_loops: bool = True) -> None:
+        """Guarda pares (palabra, ResultadoMT) en una sola transacción."""
+        huella, nombres, _ = self._huella(mt)
+        opciones = _clave_opciones(max_steps, implicit_reject_on_undef, detect_loops)
+        filas = []
+        for w, res in resultados:
+            if res.motivo in _MOTIVOS_LIMITE:
+                continue
+            if len(res.cinta) > MAX_CINTA or any(len(c[1]) > MAX_CINTA
+                                                 for c in res.cintas or ()):
+                continue
+            cintas = json.dumps(res.cintas, ensure_ascii=False) if res.cintas else None
+            filas.append((huella, w, opciones, res.veredicto, res.pasos, nombres[res.estado],
+                          res.cabeza, res.cinta, res.inicio_cinta, res.extension,
+                          res.motivo, cintas, self._tic()))
+        if not filas:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO resultados VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)", filas)
+            self._entradas += len(filas)
+            if self._entradas > self.max_entradas:
+                self._desalojar()
+
+    def guardar(self, mt: MaquinaTuring, w: str, res: ResultadoMT,
+                max_steps: Optional[int] = None,
+                implicit_reject_on_undef: bool = True,
+                detect_loops: bool = True) -> None:
+        """Guarda el resultado de (mt, w, opciones)."""
+        self.guardar_muchos(mt, [(w, res)], max_steps, implicit_reject_on_undef, detect_loops)
+
+    def run(self, mt: MaquinaTuring, w: str,
+            max_steps: Optional[int] = None,
+            implicit_reject_on_undef: bool = True,
+            detect_loops: bool = True,
+            limites: Optional[Limites] = None) -> ResultadoMT:
+        """
+        Como `mt.run`, pero sin simular si el resultado ya está guardado (un
+        acierto no consume recursos, así que `limites` solo rige al simular).
+        """
+        res = self.consultar(mt, w, max_steps, implicit_reject_on_undef, detect_loops)
+        if res is None:
+            res = mt.run(w, max_steps, implicit_reject_on_undef, detect_loops=detect_loops,
+                         limites=limites)
+            self.guardar(mt, w, res, max_steps, implicit_reject_on_undef, detect_loops)
+        return res
+
+    # -- LRU -------------------------------------------------------------
+
+    def _tic(self) -> int:
+        self._reloj += 1
+        return self._reloj
+
+    def _desalojar(self) -> None:
+        """Borra las entradas usadas hace más tiempo (dentro de una transacción)."""
+        self._entradas = self._db.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+        sobran = self._entradas - int(self.max_entradas * _FRACCION_DESALOJO)
+        if self._entradas <= self.max_entradas or sobran <= 0:
+            return
+        self._db.execute(
+            "DELETE FROM resultados WHERE rowid IN"
+            " (SELECT rowid FROM resultados ORDER BY usado LIMIT ?)", (sobran,))
+        self._entradas -= sobran
+
+    # -- estadísticas ----------------------------------------------------
+
+    def estadisticas(self) -> dict:
+        """Entradas guardadas y aciertos/fallos de la sesión y acumulados."""
+        aciertos = (self._meta('aciertos') or 0) + self.aciertos
+        fallos = (self._meta('fallos') or 0) + self.fallos
+        return {
+            'entradas': self._entradas,
+            'max_entradas': self.max_entradas,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa': self.aciertos / (self.aciertos + self.fallos)
+                    if self.aciertos + self.fallos else 0.0,
+            'aciertos_total': aciertos,
+            'fallos_total': fallos,
+            'tasa_total': aciertos / (aciertos + fallos) if aciertos + fallos else 0.0,
+        }
+
+    def resumen(self) -> str:
+        """Una línea con la tasa de aciertos de la sesión y la acumulada."""
+        e = self.estadisticas()
+        return (f"{e['aciertos']} de {e['aciertos'] + e['fallos']} sin simular "
+                f"({e['tasa']:.0%}); acumulado {e['tasa_total']:.0%} de "
+                f"{e['aciertos_total'] + e['fallos_total']} consultas; "
+                f"entradas: {e['entradas']}/{e['max_entradas']}")
@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servicio local de simulación: máquinas compiladas en memoria, pedidos en
+JSON por líneas sobre un socket Unix o TCP en localhost.
+
+Cada especificación se parsea y compila una sola vez (con la caché en disco
+de cache_mt) y queda en una LRU de máquinas. Dónde corre una ejecución se
+decide antes de empezarla, y nunca se repite: en el propio bucle de eventos
+si su presupuesto no pasa de PASOS_EN_LINEA pasos; en un hilo si ejecuciones
+anteriores de la misma máquina con entradas de igual o mayor longitud
+terminaron en a lo sumo PASOS_EN_LINEA pasos; y si no, en un pool de
+procesos, para que el servidor siga respondiendo mientras tanto.
+Cada proceso del pool guarda también sus máquinas por huella, así que la MT
+solo viaja al proceso la primera vez que la necesita. Si un proceso muere
+(p. ej. por falta de memoria), el pool se reemplaza y el pedido se reintenta
+una vez en el nuevo.
+
+Protocolo: una línea JSON por pedido y por respuesta. El "id" del pedido
+(opcional) se copia en todas sus respuestas; con varios pedidos en vuelo
+por conexión, las respuestas pueden llegar en otro orden.
+
+    {"id": 1, "op": "load", "spec": "MT2/mt_suma.txt", "allow_S": false}
+    -> {"id": 1, "ok": true, "machine": "<huella>", "input": "11#111", ...}
+
+    {"id": 2, "op": "run", "machine": "<huella>", "input": "1#1",
+     "max_steps": 100000, "implicit_reject": true, "detect_loops": true}
+    -> {"id": 2, "ok": true, "veredicto": "ACEPTA", "pasos": 9, ...}
+
+    {"id": 3, "op": "run", "spec": "MT2/mt_suma.txt", "input": "1#1",
+     "trace": true, "format": "u q v"}
+    -> {"id": 3, "configs": ["q0 1#1", ...]}    (varias, en trozos)
+    -> {"id": 3, "ok": true, "veredicto": "ACEPTA", "pasos": 9, ...}
+
+    {"id": 4, "op": "stats"}
+    -> {"id": 4, "ok": true, "maquinas": 1, "en_curso": 0, ...}
+
+Los errores se responden con {"id": ..., "ok": false, "error": "..."}.
+
+Contrapresión: cada conexión tiene un máximo de pedidos en vuelo (no se
+leen más líneas hasta que alguno termine), cada escritura espera a que el
+cliente consuma (`drain`) y el número de ejecuciones simultáneas de todo
+el servidor está acotado. Las trazas se generan por trozos en un hilo, y
+cada trozo se envía desde el bucle de eventos.
+
+El servidor lee las especificaciones que el pedido nombre con los permisos
+de quien lo lanzó, pero solo dentro de su raíz (`--root`, por defecto el
+directorio actual; las rutas relativas se toman desde ahí y los enlaces
+simbólicos se resuelven antes de comprobarlo). De una especificación con
+errores solo se responde cuántos hay y en qué líneas, no su contenido. El
+socket Unix se crea solo para el usuario y el TCP escucha en 127.0.0.1
+salvo que se indique otra dirección.
+
+Uso:
+    python servidor_mt.py --socket /tmp/mt.sock
+    python servidor_mt.py --port 8765 --jobs 4 --max-steps 10000000 --root MT2
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import pickle
+import signal
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from itertools import islice
+from typing import Dict, Optional, Tuple
+
+from cache_mt import cargar_spec
+from maquina_turing import MaquinaTuring, ResultadoMT
+from parser_mt import ErrorEspecificacion
+
+# Máquinas compiladas en memoria (en el servidor y en cada proceso del pool)
+CAPACIDAD = 32
+
+# Presupuesto de pasos por defecto y tope para un pedido
+MAX_STEPS = 10_000_000
+
+# Pasos que se ejecutan en el bucle de eventos antes de pasar al pool
+PASOS_EN_LINEA = 50_000
+
+# Configuraciones por línea de traza enviada
+TAM_TROZO = 256
+
+# Pedidos en vuelo por conexión
+POR_CONEXION = 16
+
+# Longitud máxima de una línea de pedido
+MAX_LINEA = 1 << 20
+
+# Longitudes de entrada con pasos anotados por máquina (ver _Maquina.estimar)
+MAX_LONGITUDES = 4096
+
+# Máquinas del proceso trabajador, por huella
+_MAQUINAS: 'OrderedDict[str, MaquinaTuring]' = OrderedDict()
+
+
+# Números de línea que se informan de una especificación con errores
+MAX_LINEAS_ERROR = 20
+
+
+class ErrorPedido(Exception):
+    """Pedido mal formado o imposible de atender; se responde con ok=false."""
+
+
+def _error_spec(e: ValueError) -> str:
+    """
+    El error de carga sin el contenido del archivo: los mensajes del parser
+    citan las líneas que no entiende.
+    """
+    if not isinstance(e, ErrorEspecificacion):
+        return "Especificación inválida."
+    lineas = sorted({n for n, _ in e.errores if n is not None})
+    texto = f"Especificación inválida: {len(e.errores)} error(es)"
+    if lineas:
+        texto += " en las líneas " + ', '.join(map(str, lineas[:MAX_LINEAS_ERROR]))
+        if len(lineas) > MAX_LINEAS_ERROR:
+            texto += ", ..."
+    return texto + "."
+
+
+def _compilar(mt: MaquinaTuring):
+    """Compila la MT si el motor compilado la admite."""
+    if mt.cintas > 1 or len(mt.Gamma) <= 256:
+        mt.compilar()
+
+
+def _resultado(res: ResultadoMT) -> dict:
+    d = asdict(res)
+    if d['cintas'] is None:
+        del d['cintas']
+    return d
+
+
+def _ejecutar_en_trabajador(huella: str, datos: Optional[bytes], w: str,
+                            max_steps: int, implicit: bool,
+                            detect_loops: bool) -> Optional[dict]:
+    """
+    Ejecuta `run` en un proceso del pool.
+
+    Returns:
+        El resultado como dict, o None si el proceso no tiene la máquina y
+        `datos` (la MT serializada) no vino en el pedido
+    """
+    mt = _MAQUINAS.get(huella)
+    if mt is None:
+        if datos is None:
+            return None
+        mt = pickle.loads(datos)
+        _compilar(mt)
+        _MAQUINAS[huella] = mt
+        while len(_MAQUINAS) > CAPACIDAD:
+            _MAQUINAS.popitem(last=False)
+    else:
+        _MAQUINAS.move_to_end(huella)
+    return _resultado(mt.run(w, max_steps, implicit, detect_loops=detect_loops))
+
+
+class _Maquina:
+    """
+    Entrada de la LRU: la MT compilada, su entrada por defecto, su pickle y
+    los pasos de sus ejecuciones por longitud de entrada.
+    """
+
+    __slots__ = ('mt', 'entrada', 'huella', '_datos', '_pasos')
+
+    def __init__(self, mt: MaquinaTuring, entrada: str, huella: str):
+        self.mt = mt
+        self.entrada = entrada
+        self.huella = huella
+        self._datos: Optional[bytes] = None
+        # Longitud de la entrada -> máximo de pasos visto
+        self._pasos: Dict[int, int] = {}
+
+    def anotar(self, longitud: int, pasos: int):
+        """Anota los pasos de una ejecución terminada."""
+        if longitud in self._pasos:
+            self._pasos[longitud] = max(self._pasos[longitud], pasos)
+        elif len(self._pasos) < MAX_LONGITUDES:
+            self._pasos[longitud] = pasos
+
+    def estimar(self, longitud: int) -> Optional[int]:
+        """
+        Pasos esperados con una entrada de esa longitud: los de la longitud
+        anotada más cercana que no sea menor, o None si no hay ninguna.
+        """
+        mayores = [n for n in self._pasos if n >= longitud]
+        return self._pasos[min(mayores)] if mayores else None
+
+    def datos(self) -> bytes:
+        """La MT serializada para el pool (se calcula una vez)."""
+        if self._datos is None:
+            self._datos = pickle.dumps(self.mt, protocol=pickle.HIGHEST_PROTOCOL)
+        return self._datos
+
+
+class _Conexion:
+    """Escritura serializada de respuestas sobre una conexión."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.lock = asyncio.Lock()
+
+    async def enviar(self, obj: dict):
+        datos = (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+        async with self.lock:
+            self.writer.write(datos)
+            await self.writer.drain()
+
+
+class ServidorMT:
+    """
+    Atiende pedidos de simulación (ver el protocolo en el docstring del módulo).
+
+    Args:
+        capacidad: Máquinas compiladas que se mantienen en memoria
+        max_steps: Presupuesto por defecto y tope de pasos por pedido
+        pasos_en_linea: Presupuesto hasta el que una ejecución corre en el
+            bucle de eventos, y pasos estimados hasta los que corre en un
+            hilo en lugar del pool
+        jobs: Procesos del pool (None = núcleos disponibles)
+        max_concurrentes: Ejecuciones simultáneas en todo el servidor
+            (None = 2 por proceso del pool)
+        por_conexion: Pedidos en vuelo por conexión
+        usar_cache: Usar la caché en disco al cargar especificaciones
+        raiz: Directorio fuera del cual no se leen especificaciones
+            (None = el directorio actual)
+    """
+
+    def __init__(self,
+                 capacidad: int = CAPACIDAD,
+                 max_steps: int = MAX_STEPS,
+                 pasos_en_linea: int = PASOS_EN_LINEA,
+                 jobs: Optional[int] = None,
+                 max_concurrentes: Optional[int] = None,
+                 por_conexion: int = POR_CONEXION,
+                 usar_cache: bool = True,
+                 raiz: Optional[str] = None):
+        self.capacidad = capacidad
+        self.max_steps = max_steps
+        self.pasos_en_linea = pasos_en_linea
+        self.jobs = jobs or os.cpu_count() or 1
+        self.por_conexion = por_conexion
+        self.usar_cache = usar_cache
+        self.raiz = os.path.realpath(raiz or os.getcwd())
+        self.maquinas: 'OrderedDict[str, _Maquina]' = OrderedDict()
+        # (ruta, allow_S, mtime, tamaño) -> huella, para no releer el archivo
+        self._rutas: Dict[Tuple[str, bool, int, int], str] = {}
+        self._cupo = asyncio.Semaphore(max_concurrentes or 2 * self.jobs)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.en_curso = 0
+        self.atendidos = 0
+
+    # -- máquinas ---------------------------------------------------------
+
+    def _guardar(self, maquina: _Maquina):
+        self.maquinas[maquina.huella] = maquina
+        self.maquinas.move_to_end(maquina.huella)
+        while len(self.maquinas) > self.capacidad:
+            self.maquinas.popitem(last=False)
+
+    def _buscar(self, huella: str) -> _Maquina:
+        maquina = self.maquinas.get(huella)
+        if maquina is None:
+            raise ErrorPedido(f"Máquina desconocida: {huella} (cargarla con 'load').")
+        self.maquinas.move_to_end(huella)
+        return maquina
+
+    def _resolver(self, ruta: str) -> str:
+        """La ruta real de la especificación, que debe quedar dentro de la raíz."""
+        real = os.path.realpath(os.path.join(self.raiz, ruta))
+        if os.path.commonpath([real, self.raiz]) != self.raiz:
+            raise ErrorPedido("La especificación está fuera de la raíz del servidor.")
+        return real
+
+    async def cargar(self, ruta: str, allow_S: bool = False) -> _Maquina:
+        """Devuelve la máquina de la especificación `ruta`, cargándola si hace falta."""
+        ruta = self._resolver(ruta)
+        try:
+            st = os.stat(ruta)
+        except OSError as e:
+            raise ErrorPedido(f"No se puede leer la especificación: {e.strerror}")
+        clave = (ruta, allow_S, st.st_mtime_ns, st.st_size)
+        huella = self._rutas.get(clave)
+        if huella is not None and huella in self.maquinas:
+            return self._buscar(huella)
+
+        def construir():
+            mt, w = cargar_spec(ruta, allow_S=allow_S, usar_cache=self.usar_cache)
+            _compilar(mt)
+            return mt, w, mt.huella()
+
+        # Parsear bloquea: en un hilo, para no frenar a las demás conexiones
+        try:
+            mt, w, huella = await asyncio.get_running_loop().run_in_executor(None, construir)
+        except OSError as e:
+            raise ErrorPedido(f"No se puede leer la especificación: {e.strerror}")
+        except ValueError as e:
+            raise ErrorPedido(_error_spec(e))
+        self._rutas[clave] = huella
+        maquina = self.maquinas.get(huella)
+        if maquina is None:
+            maquina = _Maquina(mt, w, huella)
+        self._guardar(maquina)
+        return maquina
+
+    # -- ejecución --------------------------------------------------------
+
+    def _presupuesto(self, pedido: dict) -> int:
+        max_steps = pedido.get('max_steps', self.max_steps)
+        if not isinstance(max_steps, int) or isinstance(max_steps, bool) or max_steps < 1:
+            raise ErrorPedido("max_steps debe ser un entero >= 1.")
+        return min(max_steps, self.max_steps)
+
+    def _descartar_pool(self, pool: ProcessPoolExecutor):
+        """Cierra un pool roto; el próximo pedido crea otro."""
+        # Otros pedidos en vuelo pueden haber creado ya el reemplazo
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _en_pool(self, maquina: _Maquina, w: str, max_steps: int,
+                       implicit: bool, detect_loops: bool) -> dict:
+        loop = asyncio.get_running_loop()
+        for intento in range(2):
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.jobs)
+            pool = self._pool
+            try:
+                # Primero sin la máquina: solo se envía al proceso que no la tiene
+                res = await loop.run_in_executor(pool, _ejecutar_en_trabajador, maquina.huella,
+                                                 None, w, max_steps, implicit, detect_loops)
+                if res is None:
+                    res = await loop.run_in_executor(pool, _ejecutar_en_trabajador,
+                                                     maquina.huella, maquina.datos(), w,
+                                                     max_steps, implicit, detect_loops)
+                return res
+            except BrokenProcessPool:
+                # Murió un proceso: se reintenta una vez en un pool nuevo, y si
+                # vuelve a pasar, el error es solo de este pedido
+                self._descartar_pool(pool)
+                if intento:
+                    raise ErrorPedido("Un proceso del pool murió durante la ejecución.")
+
+    async def _traza(self, conexion: _Conexion, id_pedido, maquina: _Maquina, w: str,
+                     max_steps: int, implicit: bool, detect_loops: bool,
+                     formato: str) -> dict:
+        ejecucion = maquina.mt.iter_configs(w, max_steps, formato, implicit,
+                                            detect_loops=detect_loops)
+        loop = asyncio.get_running_loop()
+
+        def trozo():
+            return list(islice(ejecucion, TAM_TROZO))
+
+        # Cada trozo se simula en un hilo: una traza larga no frena el bucle
+        while True:
+            configs = await loop.run_in_executor(None, trozo)
+            if not configs:
+                break
+            await conexion.enviar({'id': id_pedido, 'configs': configs})
+        maquina.anotar(len(w), ejecucion.pasos)
+        return {
+            'veredicto': ejecucion.veredicto,
+            'pasos': ejecucion.pasos,
+            'estado': ejecucion.estado,
+            'cabeza': ejecucion.cabeza,
+            'configuraciones': ejecucion.configuraciones,
+            'motivo': ejecucion.motivo,
+        }
+
+    async def _run(self, pedido: dict, conexion: _Conexion) -> dict:
+        if 'machine' in pedido:
+            maquina = self._buscar(pedido['machine'])
+        elif 'spec' in pedido:
+            maquina = await self.cargar(pedido['spec'], bool(pedido.get('allow_S', False)))
+        else:
+            raise ErrorPedido("Falta 'machine' o 'spec'.")
+        w = pedido.get('input', maquina.entrada)
+        if not isinstance(w, str):
+            raise ErrorPedido("input debe ser una cadena.")
+        max_steps = self._presupuesto(pedido)
+        implicit = bool(pedido.get('implicit_reject', True))
+        detect_loops = bool(pedido.get('detect_loops', True))
+        formato = pedido.get('format', 'u q v')
+        if formato not in ('u q v', 'uqv'):
+            raise ErrorPedido("format debe ser 'u q v' o 'uqv'.")
+
+        async with self._cupo:
+            self.en_curso += 1
+            try:
+                if pedido.get('trace'):
+                    return await self._traza(conexion, pedido.get('id'), maquina, w,
+                                             max_steps, implicit, detect_loops, formato)
+                # Los pedidos cortos no pagan el viaje al pool: con un
+                # presupuesto pequeño, en el bucle de eventos; si la máquina ya
+                # terminó rápido con entradas así de largas, en un hilo
+                estimado = maquina.estimar(len(w))
+                if max_steps <= self.pasos_en_linea:
+                    res = _resultado(maquina.mt.run(w, max_steps, implicit,
+                                                    detect_loops=detect_loops))
+                elif estimado is not None and estimado <= self.pasos_en_linea:
+                    res = _resultado(await asyncio.get_running_loop().run_in_executor(
+                        None, functools.partial(maquina.mt.run, w, max_steps, implicit,
+                                                detect_loops=detect_loops)))
+                else:
+                    res = await self._en_pool(maquina, w, max_steps, implicit, detect_loops)
+                maquina.anotar(len(w), res['pasos'])
+                return res
+            finally:
+                self.en_curso -= 1
+
+    async def atender(self, pedido: dict, conexion: _Conexion) -> dict:
+        """Atiende un pedido ya decodificado y devuelve la respuesta final."""
+        op = pedido.get('op')
+        if op == 'run':
+            return await self._run(pedido, conexion)
+        if op == 'load':
+            ruta = pedido.get('spec')
+            if not isinstance(ruta, str):
+                raise ErrorPedido("Falta 'spec'.")
+            maquina = await self.cargar(ruta, bool(pedido.get('allow_S', False)))
+            mt = maquina.mt
+            return {'machine': maquina.huella, 'input': maquina.entrada,
+                    'estados': len(mt.Q), 'transiciones': len(mt.delta),
+                    'cintas': mt.cintas}
+        if op == 'stats':
+            return {'maquinas': len(self.maquinas), 'capacidad': self.capacidad,
+                    'en_curso': self.en_curso, 'atendidos': self.atendidos,
+                    'procesos': self.jobs, 'max_steps': self.max_steps}
+        raise ErrorPedido(f"Operación desconocida: {op!r}")
+
+    async def _pedido(self, linea: bytes, conexion: _Conexion):
+        id_pedido = None
+        try:
+            pedido = json.loads(linea)
+            if not isinstance(pedido, dict):
+                raise ErrorPedido("Cada pedido debe ser un objeto JSON.")
+            id_pedido = pedido.get('id')
+            respuesta = {'id': id_pedido, 'ok': True}
+            respuesta.update(await self.atender(pedido, conexion))
+        except ConnectionError:
+            raise
+        except (ErrorPedido, ValueError, RuntimeError) as e:
+            # ValueError cubre el JSON inválido y los símbolos fuera de Sigma;
+            # RuntimeError, los movimientos no permitidos
+            respuesta = {'id': id_pedido, 'ok': False, 'error': str(e)}
+        except Exception as e:
+            # Un error inesperado solo afecta a este pedido: el servidor sigue
+            respuesta = {'id': id_pedido, 'ok': False,
+                         'error': f"Error interno: {type(e).__name__}: {e}"}
+        self.atendidos += 1
+        await conexion.enviar(respuesta)
+
+    # -- conexiones -------------------------------------------------------
+
+    async def atender_conexion(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Lee pedidos de una conexión y los atiende concurrentemente."""
+        conexion = _Conexion(writer)
+        en_vuelo = asyncio.Semaphore(self.por_conexion)
+        tareas = set()
+
+        def terminada(tarea: asyncio.Task):
+            tareas.discard(tarea)
+            en_vuelo.release()
+            if not tarea.cancelled() and isinstance(tarea.exception(), ConnectionError):
+                writer.close()
+
+        try:
+            while True:
+                # Con el cupo lleno no se leen más pedidos: el cliente queda
+                # bloqueado por el control de flujo del socket
+                await en_vuelo.acquire()
+                try:
+                    linea = await reader.readline()
+                except ValueError:
+                    en_vuelo.release()
+                    await conexion.enviar({'id': None, 'ok': False,
+                                           'error': f"Línea de más de {MAX_LINEA} bytes."})
+                    break
+                if not linea:
+                    en_vuelo.release()
+                    break
+                if not linea.strip():
+                    en_vuelo.release()
+                    continue
+                tarea = asyncio.create_task(self._pedido(linea, conexion))
+                tareas.add(tarea)
+                tarea.add_done_callback(terminada)
+            if tareas:
+                await asyncio.gather(*tareas, return_exceptions=True)
+        except ConnectionError:
+            for tarea in tareas:
+                tarea.cancel()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def cerrar(self):
+        """Detiene el pool de procesos."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+async def servir(servidor: ServidorMT, socket_unix: Optional[str] = None,
+                 host: str = '127.0.0.1', puerto: Optional[int] = None):
+    """Escucha en el socket Unix o en host:puerto hasta que se cancele."""
+    if socket_unix:
+        if os.path.exists(socket_unix):
+            os.remove(socket_unix)
+        srv = await asyncio.start_unix_server(servidor.atender_conexion, socket_unix, limit=MAX_LINEA)
+        os.chmod(socket_unix, 0o600)
+        donde = socket_unix
+    else:
+        srv = await asyncio.start_server(servidor.atender_conexion, host, puerto, limit=MAX_LINEA)
+        donde = ', '.join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in srv.sockets)
+    print(f"Escuchando en {donde}", file=sys.stderr, flush=True)
+    # SIGTERM/SIGINT cancelan la espera para que se borre el socket y se cierre el pool
+    tarea = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, tarea.cancel)
+    try:
+        async with srv:
+            await srv.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        servidor.cerrar()
+        if socket_unix and os.path.exists(socket_unix):
+            os.remove(socket_unix)
+
+
+def main():
+    """Punto de entrada del servidor."""
+    parser = argparse.ArgumentParser(
+        description='Servicio local de simulación de MT (JSON por líneas).',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python servidor_mt.py --socket /tmp/mt.sock
+  python servidor_mt.py --port 8765 --jobs 4
+
+  echo '{"id": 1, "op": "run", "spec": "MT2/mt_suma.txt", "input": "11#1"}' | nc -q1 localhost 8765
+        """
+    )
+    donde = parser.add_mutually_exclusive_group(required=True)
+    donde.add_argument('--socket', metavar='RUTA', help='Escuchar en un socket Unix.')
+    donde.add_argument('--port', type=int, help='Escuchar por TCP en este puerto.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Dirección TCP (default: 127.0.0.1).')
+    parser.add_argument('--capacity', type=int, default=CAPACIDAD,
+                        help=f'Máquinas compiladas en memoria (default: {CAPACIDAD}).')
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS,
+                        help=f'Presupuesto por defecto y tope de pasos por pedido (default: {MAX_STEPS}).')
+    parser.add_argument('--inline-steps', type=int, default=PASOS_EN_LINEA,
+                        help=f'Pasos hasta los que una ejecución no va al pool (default: {PASOS_EN_LINEA}).')
+    parser.add_argument('--jobs', type=int,
+                        help='Procesos del pool (default: núcleos disponibles).')
+    parser.add_argument('--max-concurrent', type=int,
+                        help='Ejecuciones simultáneas en todo el servidor (default: 2 por proceso).')
+    parser.add_argument('--per-connection', type=int, default=POR_CONEXION,
+                        help=f'Pedidos en vuelo por conexión (default: {POR_CONEXION}).')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='No usar la caché en disco de especificaciones.')
+    parser.add_argument('--root', metavar='DIR',
+                        help='Solo leer especificaciones dentro de DIR (default: directorio actual).')
+    args = parser.parse_args()
+    if args.root is not None and not os.path.isdir(args.root):
+        parser.error(f"--root: {args.root} no es un directorio")
+
+    for nombre in ('capacity', 'max_steps', 'per_connection', 'jobs', 'max_concurrent'):
+        valor = getattr(args, nombre)
+        if valor is not None and valor < 1:
+            parser.error(f"--{nombre.replace('_', '-')} debe ser >= 1")
+
+    async def principal():
+        servidor = ServidorMT(capacidad=args.capacity, max_steps=args.max_steps,
+                              pasos_en_linea=args.inline_steps, jobs=args.jobs,
+                              max_concurrentes=args.max_concurrent,
+                              por_conexion=args.per_connection,
+                              usar_cache=not args.no_cache, raiz=args.root)
+        await servir(servidor, args.socket, args.host, args.port)
+
+    try:
+        asyncio.run(principal())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,196 @@ Simulador de Máquina de Turing Determinista - Programa principal
 """
 
 import argparse
+import json
+import os
 import sys
-from parser_mt import parse_spec
+import time
+from cache_mt import cargar_spec
+from lote_mt import ejecutar_lote, palabras_de_archivo, enumerar_palabras
+from punto_control_mt import guardar_punto, cargar_punto, PASOS_ENTRE_CONSULTAS
+from traza_bin import escribir_traza_bin, TrazaBinaria
+from optimizar_mt import optimizar
+from analisis_mt import analizar
+from no_determinista_mt import MaquinaTuringND, MAX_CONFIGURACIONES
+from resultados_mt import CacheResultados, MAX_ENTRADAS
+from maquina_turing import (ACEPTA, RECHAZA, PASOS_POR_LOTE, Limites, RESULTADOS,
+                            describir_resultado)
+
+# Sufijos aceptados por --max-trace-bytes y --max-memory
+_SUFIJOS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def tamano(texto: str) -> int:
+    """Tamaño en bytes para argparse: un entero con sufijo K, M o G opcional."""
+    t = texto.strip().upper().rstrip('B')
+    factor = 1
+    if t and t[-1] in _SUFIJOS:
+        factor = _SUFIJOS[t[-1]]
+        t = t[:-1]
+    try:
+        valor = int(float(t) * factor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamaño inválido: '{texto}' (p. ej. 500M)")
+    if valor < 1:
+        raise argparse.ArgumentTypeError("el tamaño debe ser positivo")
+    return valor
+
+
+def modo_lote(args, mt, resultados=None) -> None:
+    """
+    Ejecuta la MT sobre muchas palabras (--inputs / --enumerate) y escribe
+    una tabla 'palabra<TAB>veredicto<TAB>pasos' a medida que llegan resultados.
+    """
+    if args.inputs:
+        palabras = palabras_de_archivo(args.inputs)
+    else:
+        palabras = enumerar_palabras(mt.Sigma, args.enumerate)
+
+    salida = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    conteo = {}
+    t0 = time.perf_counter()
+    try:
+        salida.write("palabra\tveredicto\tpasos\n")
+        for _, w, veredicto, pasos, _ in ejecutar_lote(
+                mt, palabras,
+                max_steps=args.max_steps,
+                implicit_reject_on_undef=not args.no_implicit_reject,
+                detect_loops=args.detect_loops,
+                jobs=args.jobs,
+                ordenado=args.ordered,
+                backend=args.backend,
+                resultados=resultados,
+                limites=args.limites):
+            salida.write(f"{w or 'ε'}\t{veredicto}\t{pasos}\n")
+            conteo[veredicto] = conteo.get(veredicto, 0) + 1
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    dt = time.perf_counter() - t0
+
+    total = sum(conteo.values())
+    resumen = ', '.join(f"{v}: {n}" for v, n in sorted(conteo.items()))
+    destino = sys.stdout if args.out else sys.stderr
+    if args.out:
+        print(f"Resultados escritos en: {args.out}", file=destino)
+    print(f"Palabras: {total} ({resumen}) en {dt:.2f}s", file=destino)
+    if resultados is not None:
+        print(f"Caché de resultados: {resultados.resumen()}", file=destino)
+
+
+def modo_traza(args, mt, w, reanudar=None):
+    """
+    Escribe la traza en args.out en flujo, con puntos de control periódicos
+    si se pidió --checkpoint.
+
+    Args:
+        args: Argumentos de la línea de comandos
+        mt: Máquina a simular
+        w: Palabra de entrada
+        reanudar: PuntoControl desde el que continuar (--resume), o None
+
+    Returns:
+        La EjecucionMT ya agotada y la primera y última línea escritas
+    """
+    cada_pasos = al_punto = None
+    if args.checkpoint:
+        datos = {
+            'huella': mt.huella(),
+            'spec': os.path.abspath(args.spec),
+            'salida': os.path.abspath(args.out),
+            'opciones': {
+                'max_steps': args.max_steps,
+                'conf': args.conf,
+                'allow_S': args.allow_S,
+                'no_implicit_reject': args.no_implicit_reject,
+                'detect_loops': args.detect_loops,
+                'optimize': args.optimize,
+                'checkpoint_every': args.checkpoint_every,
+                'checkpoint_secs': args.checkpoint_secs,
+                'max_cells': args.max_cells,
+                'max_time': args.max_time,
+                'max_trace_bytes': args.max_trace_bytes,
+                'max_memory': args.max_memory,
+                'limits_every': args.limits_every,
+            },
+        }
+        if args.checkpoint_every:
+            cada_pasos = args.checkpoint_every
+        else:
+            cada_pasos = PASOS_ENTRE_CONSULTAS
+        ultimo = [time.monotonic()]
+
+        def guardar(punto):
+            if not args.checkpoint_every:
+                ahora = time.monotonic()
+                if ahora - ultimo[0] < args.checkpoint_secs:
+                    return
+                ultimo[0] = ahora
+            # La traza en disco debe llegar al menos hasta el offset guardado
+            f.flush()
+            os.fsync(f.fileno())
+            datos['offset'] = f.tell()
+            guardar_punto(args.checkpoint, datos, punto)
+        al_punto = guardar
+
+    # Con una MT no determinista, la traza es el camino de aceptación
+    extra = {}
+    if isinstance(mt, MaquinaTuringND):
+        extra = dict(max_configs=args.max_configs, jobs=args.jobs)
+    elif args.limites is not None:
+        extra = dict(limites=args.limites)
+    ejecucion = mt.iter_configs(
+        w,
+        max_steps=args.max_steps,
+        config_variant=args.conf,
+        implicit_reject_on_undef=not args.no_implicit_reject,
+        detect_loops=args.detect_loops,
+        desde=reanudar,
+        cada_pasos=cada_pasos,
+        al_punto=al_punto,
+        **extra
+    )
+
+    # Escribir salida en flujo (memoria acotada, sin acumular configuraciones)
+    primera = ultima = None
+    if reanudar is None:
+        f = open(args.out, 'w', encoding='utf-8')
+    else:
+        # Descartar lo escrito después del punto de control y seguir al final
+        if os.path.getsize(args.out) < args.offset:
+            raise ValueError(f"La traza '{args.out}' es más corta que el punto de control.")
+        os.truncate(args.out, args.offset)
+        f = open(args.out, 'a', encoding='utf-8')
+    # Con varias cintas cada configuración ocupa k líneas: se separan con una en blanco
+    fin = '\n\n' if mt.cintas > 1 else '\n'
+    with f:
+        for c in ejecucion:
+            if primera is None:
+                primera = c
+            ultima = c
+            f.write(c)
+            f.write(fin)
+    return ejecucion, primera, ultima
+
+
+def modo_traza_bin(args, mt, w):
+    """
+    Escribe la traza en formato binario (ver traza_bin).
+
+    Returns:
+        La EjecucionMT ya agotada y la primera y última configuración
+    """
+    ejecucion = escribir_traza_bin(
+        mt, w, args.out,
+        max_steps=args.max_steps,
+        implicit_reject_on_undef=not args.no_implicit_reject,
+        detect_loops=args.detect_loops,
+        limites=args.limites
+    )
+    with TrazaBinaria(args.out) as traza:
+        primera = traza.config(0, args.conf)
+        ultima = traza.config(len(traza) - 1, args.conf)
+    return ejecucion, primera, ultima
 
 
 def main():
@@ -19,6 +207,15 @@ Ejemplos de uso:
   python sim_mt.py mt_acepta.txt -o salida_acepta.txt
   python sim_mt.py mt_infinito.txt -o salida_infinito.txt --max-steps 100
   python sim_mt.py mt_custom.txt -o salida.txt --conf uqv --allow-S
+  python sim_mt.py mt_palindromo.txt --summary
+  python sim_mt.py mt_generada.txt --summary --optimize --dot diagrama.dot
+  python sim_mt.py mt_infinito.txt --analyze --dot diagrama.dot
+  python sim_mt.py mt_palindromo.txt --enumerate 12 --ordered -o tabla.txt
+  python sim_mt.py mt_largo.txt -o traza.txt --checkpoint traza.ckpt --checkpoint-secs 60
+  python sim_mt.py --resume traza.ckpt
+  python sim_mt.py mt_largo.txt -o traza.bin --trace-format bin
+  python sim_mt.py mt_infinito.txt -o traza.txt --max-trace-bytes 50M --max-time 30
+  python traza_bin.py traza.bin -o salida.txt
 
 Formato de especificación:
   Q = {q0, q1, qacc, qrej}
@@ -40,13 +237,55 @@ Formato de especificación:
     # Argumentos
     parser.add_argument(
         'spec',
+        nargs='?',
         help='Archivo de especificación (MT + cadena de entrada).'
     )
     
     parser.add_argument(
         '-o', '--out',
-        required=True,
-        help='Archivo de salida con las configuraciones.'
+        help='Archivo de salida con las configuraciones (obligatorio salvo con --summary).'
+    )
+    
+    parser.add_argument(
+        '--summary', '--no-trace',
+        dest='summary',
+        action='store_true',
+        help='Solo ejecutar y mostrar el resultado, sin generar configuraciones.'
+    )
+    
+    parser.add_argument(
+        '--inputs',
+        metavar='ARCHIVO',
+        help='Modo lote: ejecutar cada palabra del archivo (una por línea).'
+    )
+    
+    parser.add_argument(
+        '--enumerate',
+        metavar='N',
+        type=int,
+        help='Modo lote: ejecutar todas las palabras sobre Sigma de longitud <= N.'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=None,
+        help='Procesos para el modo lote y para explorar los niveles grandes '
+             'de una MT no determinista (default: núcleos disponibles).'
+    )
+    
+    parser.add_argument(
+        '--backend',
+        choices=['python', 'numpy'],
+        default='python',
+        help='Motor del modo lote: pool de procesos o vectorizado con NumPy '
+             '(este requiere --max-steps).'
+    )
+    
+    parser.add_argument(
+        '--ordered',
+        action='store_true',
+        help='Modo lote: escribir los resultados en el orden de entrada.'
     )
     
     parser.add_argument(
@@ -56,6 +295,70 @@ Formato de especificación:
         help='Cortar tras N pasos (útil para el caso infinito).'
     )
     
+    parser.add_argument(
+        '--max-cells',
+        metavar='N',
+        type=int,
+        help='Cortar si el tramo de cinta en uso pasa de N celdas '
+             '(en modo lote, por palabra).'
+    )
+    
+    parser.add_argument(
+        '--max-time',
+        metavar='SEGUNDOS',
+        type=float,
+        help='Cortar tras SEGUNDOS de tiempo de pared (en modo lote, por palabra).'
+    )
+    
+    parser.add_argument(
+        '--max-trace-bytes',
+        metavar='TAMAÑO',
+        type=tamano,
+        help='Traza de texto: cortar si las configuraciones escritas pasan de TAMAÑO '
+             '(bytes, o con sufijo K, M o G).'
+    )
+    
+    parser.add_argument(
+        '--max-memory',
+        metavar='TAMAÑO',
+        type=tamano,
+        help='Cortar si la memoria residente del proceso pasa de TAMAÑO '
+             '(aproximada; bytes, o con sufijo K, M o G; en modo lote, la de '
+             'cada proceso del pool).'
+    )
+    
+    parser.add_argument(
+        '--limits-every',
+        metavar='N',
+        type=int,
+        default=PASOS_POR_LOTE,
+        help=f'Pasos entre comprobaciones de --max-cells, --max-time, '
+             f'--max-trace-bytes y --max-memory (default: {PASOS_POR_LOTE}).'
+    )
+    
+    parser.add_argument(
+        '--max-configs',
+        type=int,
+        default=MAX_CONFIGURACIONES,
+        help='MT no determinista: máximo de configuraciones distintas a explorar '
+             f'(default: {MAX_CONFIGURACIONES}; 0 = sin límite).'
+    )
+    
+    parser.add_argument(
+        '--detect-loops',
+        dest='detect_loops',
+        action='store_true',
+        default=None,
+        help='Cortar en cuanto se pruebe un ciclo infinito (por defecto solo con --summary).'
+    )
+    
+    parser.add_argument(
+        '--no-detect-loops',
+        dest='detect_loops',
+        action='store_false',
+        help='Desactivar la detección de ciclos (también con --summary).'
+    )
+    
     parser.add_argument(
         '--conf',
         choices=['uqv', 'u q v'],
@@ -75,12 +378,94 @@ Formato de especificación:
         help='NO enviar a q_reject cuando δ no está definida.'
     )
     
+    parser.add_argument(
+        '--trace-format',
+        choices=['text', 'bin'],
+        default='text',
+        help='Formato de la traza: texto (u q v por línea) o binario compacto (ver traza_bin.py).'
+    )
+    
+    parser.add_argument(
+        '--checkpoint',
+        metavar='ARCHIVO',
+        help='Guardar puntos de control periódicos de la traza en ARCHIVO.'
+    )
+    
+    parser.add_argument(
+        '--checkpoint-every',
+        metavar='N',
+        type=int,
+        help='Guardar un punto de control cada N pasos.'
+    )
+    
+    parser.add_argument(
+        '--checkpoint-secs',
+        metavar='T',
+        type=float,
+        help='Guardar un punto de control cada T segundos (default: 60).'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        metavar='ARCHIVO',
+        help='Reanudar la simulación guardada en ARCHIVO, añadiendo a la misma traza.'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Parsear siempre la especificación, sin usar la caché de máquinas compiladas.'
+    )
+    
+    parser.add_argument(
+        '--result-cache',
+        action='store_true',
+        help='Con --summary o en modo lote: servir desde la caché de resultados '
+             '(SQLite en el directorio de la caché) lo ya simulado con las mismas '
+             'opciones, y guardar lo nuevo.'
+    )
+    
+    parser.add_argument(
+        '--result-cache-size',
+        metavar='N',
+        type=int,
+        default=MAX_ENTRADAS,
+        help=f'Entradas de la caché de resultados antes de desalojar las menos '
+             f'usadas recientemente (default: {MAX_ENTRADAS}).'
+    )
+    
+    parser.add_argument(
+        '--optimize',
+        action='store_true',
+        help='Simular la MT optimizada: sin estados inalcanzables ni '
+             'transiciones desde qacc/qrej, y con los estados equivalentes '
+             'fusionados (las configuraciones muestran el representante).'
+    )
+    
+    parser.add_argument(
+        '--analyze',
+        action='store_true',
+        help='Analizar δ sin ejecutar: informar los estados condenados (desde '
+             'los que ninguna transición lleva a parar) y los de deriva. Sin '
+             '-o ni --summary no se simula; con --dot, el diagrama resalta '
+             'los estados condenados.'
+    )
+    
     parser.add_argument(
         '--dot',
         metavar='ARCHIVO',
         help='Generar diagrama DOT en el archivo especificado.'
     )
     
+    parser.add_argument(
+        '--stats',
+        metavar='ARCHIVO',
+        help='Guardar en ARCHIVO (JSON) las estadísticas de la ejecución: '
+             'uso de cada transición, pasos por estado, movimientos e '
+             'inversiones de la cabeza. Con --dot, el diagrama marca las '
+             'transiciones más usadas.'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -88,13 +473,107 @@ Formato de especificación:
     )
     
     args = parser.parse_args()
+    reanudar = None
+    if args.resume:
+        # Se reanuda con las mismas opciones; el punto se sigue actualizando
+        # en el mismo archivo salvo que se indique otro --checkpoint
+        try:
+            datos, reanudar = cargar_punto(args.resume)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        opciones = datos['opciones']
+        args.spec = args.spec or datos['spec']
+        args.out = datos['salida']
+        args.offset = datos['offset']
+        args.checkpoint = args.checkpoint or args.resume
+        for nombre, valor in opciones.items():
+            setattr(args, nombre, valor)
+    if args.spec is None:
+        parser.error("se requiere el archivo de especificación (o --resume)")
+    if args.max_configs is not None and args.max_configs < 1:
+        args.max_configs = None
+    if args.checkpoint_every is not None and args.checkpoint_every < 1:
+        parser.error("--checkpoint-every debe ser positivo")
+    args.limites = Limites(max_celdas=args.max_cells, max_segundos=args.max_time,
+                           max_bytes_traza=args.max_trace_bytes,
+                           max_memoria=args.max_memory, cada_pasos=args.limits_every)
+    if not args.limites.activos():
+        args.limites = None
+    if args.limits_every < 1:
+        parser.error("--limits-every debe ser positivo")
+    for valor, opcion in ((args.max_cells, '--max-cells'), (args.max_time, '--max-time')):
+        if valor is not None and valor <= 0:
+            parser.error(f"{opcion} debe ser positivo")
+    if args.checkpoint and not args.checkpoint_every and not args.checkpoint_secs:
+        args.checkpoint_secs = 60.0
+    lote = args.inputs is not None or args.enumerate is not None
+    if args.inputs is not None and args.enumerate is not None:
+        parser.error("--inputs y --enumerate son excluyentes")
+    if not (args.summary or lote or args.analyze) and not args.out:
+        parser.error("se requiere -o/--out (o use --summary para omitir la traza)")
+    if args.detect_loops is None:
+        args.detect_loops = args.summary or lote
+    if args.checkpoint and (args.summary or lote):
+        parser.error("--checkpoint y --resume solo aplican al modo con traza")
+    if args.checkpoint and args.trace_format == 'bin':
+        parser.error("--checkpoint y --resume solo aplican a la traza de texto")
+    if args.max_trace_bytes is not None and (args.summary or lote
+                                             or args.trace_format == 'bin'):
+        parser.error("--max-trace-bytes solo aplica a la traza de texto")
+    if lote and args.backend == 'numpy' and args.max_steps is None:
+        parser.error("--backend numpy requiere --max-steps (no detecta ciclos)")
+    if args.limites is not None and lote and args.backend == 'numpy':
+        parser.error("--max-cells, --max-time y --max-memory no aplican a --backend numpy")
+    if args.stats and lote:
+        parser.error("--stats no aplica a --inputs/--enumerate")
+    simular = args.summary or lote or args.out is not None
+    if args.result_cache and not (args.summary or lote):
+        parser.error("--result-cache solo aplica a --summary y al modo lote")
+    if args.result_cache and lote and args.backend == 'numpy':
+        parser.error("--result-cache no aplica a --backend numpy")
+    if args.result_cache_size < 1:
+        parser.error("--result-cache-size debe ser positivo")
+    resultados = None
+    if args.stats and not simular:
+        parser.error("--stats requiere simular (-o, --summary o modo lote)")
     
     try:
         # Parsear especificación
         if args.verbose:
             print(f"Leyendo especificación desde: {args.spec}")
         
-        mt, w = parse_spec(args.spec, allow_S=args.allow_S)
+        mt, w = cargar_spec(args.spec, allow_S=args.allow_S, usar_cache=not args.no_cache)
+        if isinstance(mt, MaquinaTuringND):
+            for activa, opcion in ((args.checkpoint, '--checkpoint/--resume'),
+                                   (args.trace_format == 'bin', '--trace-format bin'),
+                                   (args.stats, '--stats'),
+                                   (args.optimize, '--optimize'),
+                                   (args.analyze, '--analyze'),
+                                   (args.result_cache, '--result-cache'),
+                                   (args.limites, '--max-cells/--max-time/--max-trace-bytes/'
+                                                  '--max-memory'),
+                                   (lote and args.backend == 'numpy', '--backend numpy')):
+                if activa:
+                    raise ValueError(f"{opcion} no admite máquinas no deterministas.")
+        # Antes de comparar la huella: el punto de control guarda la de la MT optimizada
+        if args.optimize:
+            mt, informe = optimizar(mt)
+            print(f"MT optimizada: {informe.resumen()}")
+            if args.verbose:
+                for linea in informe.detalle():
+                    print(f"  {linea}")
+        if reanudar is not None and mt.huella() != datos['huella']:
+            raise ValueError(f"La máquina de '{args.spec}' no coincide con la del punto de control.")
+        if mt.cintas > 1:
+            # Solo la simulación, el modo lote y el diagrama conocen varias cintas
+            for activa, opcion in ((args.checkpoint, '--checkpoint/--resume'),
+                                   (args.trace_format == 'bin', '--trace-format bin'),
+                                   (args.stats, '--stats'),
+                                   (lote and args.backend == 'numpy', '--backend numpy')):
+                if activa:
+                    raise ValueError(f"{opcion} solo admite máquinas de una cinta "
+                                     f"(la de '{args.spec}' tiene {mt.cintas}).")
         
         if args.verbose:
             print(f"MT parseada exitosamente:")
@@ -104,48 +583,105 @@ Formato de especificación:
             print(f"  Entrada: '{w}' (longitud {len(w)})")
             print()
         
+        condenados = None
+        if args.analyze:
+            analisis = analizar(mt)
+            print(f"Análisis: {analisis.resumen()}")
+            for linea in analisis.detalle():
+                print(f"  {linea}")
+            condenados = set(analisis.condenados)
+        
         # Simular
-        if args.verbose:
+        if args.verbose and simular:
             print("Iniciando simulación...")
         
-        configs = mt.simulate(
-            w,
-            max_steps=args.max_steps,
-            config_variant=args.conf,
-            implicit_reject_on_undef=not args.no_implicit_reject
-        )
-        
-        # Escribir salida
-        with open(args.out, 'w', encoding='utf-8') as f:
-            for c in configs:
-                f.write(c + '\n')
+        if args.result_cache:
+            resultados = CacheResultados(max_entradas=args.result_cache_size)
         
-        # Determinar resultado
-        ultima_config = [c for c in configs if not c.startswith('#')][-1] if configs else ""
-        
-        if mt.qacc in ultima_config:
-            resultado = "ACEPTADO"
-            simbolo = "[OK]"
-        elif mt.qrej in ultima_config:
-            resultado = "RECHAZADO"
-            simbolo = "[X]"
+        if not simular:
+            pass
+        elif lote:
+            modo_lote(args, mt, resultados)
+        elif args.summary and isinstance(mt, MaquinaTuringND):
+            res = mt.explorar(
+                w,
+                max_steps=args.max_steps,
+                implicit_reject_on_undef=not args.no_implicit_reject,
+                max_configs=args.max_configs,
+                jobs=args.jobs,
+                config_variant=args.conf
+            )
+            resultado, simbolo = RESULTADOS[res.veredicto]
+            if res.veredicto == RECHAZA:
+                resultado += " (ninguna rama acepta)"
+            print(f"Resultado: {resultado} {simbolo}")
+            print(f"Profundidad: {res.profundidad}")
+            print(f"Configuraciones exploradas: {res.configuraciones}")
+            print(f"Frontera máxima: {res.frontera_max}")
+            print(f"Ramas que pararon sin aceptar: {res.ramas_paradas}")
+            if res.veredicto == ACEPTA:
+                print(f"Configuración de aceptación: {res.camino[-1]}")
+        elif args.summary:
+            opciones = dict(
+                max_steps=args.max_steps,
+                implicit_reject_on_undef=not args.no_implicit_reject,
+                detect_loops=args.detect_loops,
+                limites=args.limites
+            )
+            if resultados is not None:
+                res = resultados.run(mt, w, **opciones)
+            else:
+                res = mt.run(w, **opciones)
+            resultado, simbolo = describir_resultado(res.veredicto, res.motivo, res.pasos)
+            print(f"Resultado: {resultado} {simbolo}")
+            print(f"Pasos: {res.pasos}")
+            print(f"Estado final: {res.estado}")
+            print(f"Cabeza: {res.cabeza}")
+            print(f"Cinta final: '{res.cinta}' (desde la celda {res.inicio_cinta})")
+            for i, (cabeza, cinta, inicio) in enumerate((res.cintas or [])[1:], 2):
+                print(f"Cinta {i}: '{cinta}' (desde la celda {inicio}), cabeza en {cabeza}")
+            print(f"Extensión máxima de cinta: {res.extension}")
+            if resultados is not None:
+                print(f"Caché de resultados: {resultados.resumen()}")
         else:
-            resultado = "NO TERMINO (posible bucle infinito)"
-            simbolo = "[LOOP]"
-        
-        # Mostrar resumen
-        print(f"Configuraciones escritas en: {args.out}")
-        print(f"Total de configuraciones: {len([c for c in configs if not c.startswith('#')])}")
-        print(f"Resultado: {resultado} {simbolo}")
+            if args.trace_format == 'bin':
+                ejecucion, primera, ultima = modo_traza_bin(args, mt, w)
+            else:
+                ejecucion, primera, ultima = modo_traza(args, mt, w, reanudar)
+            
+            # Determinar resultado a partir del estado final de la ejecución
+            resultado, simbolo = describir_resultado(
+                ejecucion.veredicto, ejecucion.motivo, ejecucion.pasos)
+            
+            # Mostrar resumen
+            print(f"Configuraciones escritas en: {args.out}")
+            print(f"Total de configuraciones: {ejecucion.configuraciones}")
+            print(f"Resultado: {resultado} {simbolo}")
+            
+            if args.verbose:
+                print(f"\nPrimera configuración: {primera}")
+                if ejecucion.configuraciones > 1:
+                    print(f"Última configuración:  {ultima}")
         
-        if args.verbose:
-            print(f"\nPrimera configuración: {configs[0]}")
-            if len(configs) > 1:
-                print(f"Última configuración:  {configs[-1]}")
+        # Estadísticas: una pasada aparte e instrumentada, así la simulación
+        # normal no paga nada por ellas
+        conteos = None
+        if args.stats:
+            stats = mt.estadisticas(
+                w,
+                max_steps=args.max_steps,
+                implicit_reject_on_undef=not args.no_implicit_reject,
+                detect_loops=args.detect_loops
+            )
+            with open(args.stats, 'w', encoding='utf-8') as f:
+                json.dump(stats.a_json(), f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            conteos = stats.transiciones
+            print(f"Estadísticas guardadas en: {args.stats}")
         
         # Generar diagrama DOT si se solicita
         if args.dot:
-            dot_content = mt.to_dot()
+            dot_content = mt.to_dot(conteos, condenados)
             with open(args.dot, 'w', encoding='utf-8') as f:
                 f.write(dot_content)
             print(f"Diagrama DOT generado en: {args.dot}")
@@ -168,6 +704,10 @@ Formato de especificación:
             import traceback
             traceback.print_exc()
         return 1
+    
+    finally:
+        if resultados is not None:
+            resultados.cerrar()
 
 
 if __name__ == '__main__':
@@ -5,9 +5,13 @@ Menú interactivo para ejecutar Máquinas de Turing
 """
 
 import os
-import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from cache_mt import cargar_spec
+from maquina_turing import describir_resultado
+
 def listar_maquinas():
     """Lista todas las máquinas disponibles en MT1/ y MT2/"""
     maquinas = {}
@@ -41,55 +45,111 @@ def mostrar_menu(maquinas):
         carpeta = Path(ruta).parent.name
         print(f"  {i}. [{carpeta}] {nombre}")
     
-    print(f"\n  0. Salir")
+    print("\n  T. Ejecutar todas (en paralelo)")
+    print("  0. Salir")
     print("="*60)
     
     return items
 
-def ejecutar_maquina(ruta_spec, max_steps=200):
-    """Ejecuta una máquina de Turing"""
+def rutas_salida(ruta_spec):
+    """Rutas de la traza y del diagrama DOT de una máquina."""
     ruta = Path(ruta_spec)
     carpeta = ruta.parent
     nombre = ruta.stem
-    
-    # Generar nombres de salida
     salida_txt = carpeta / f"salida_{nombre.replace('mt_', '')}.txt"
     salida_dot = carpeta / f"{nombre}.dot"
+    return salida_txt, salida_dot
+
+def simular(ruta_spec, max_steps=200):
+    """
+    Parsea y simula una máquina en este proceso, escribiendo la traza y el
+    diagrama DOT junto a la especificación.
+
+    Returns:
+        dict con ruta, salidas, resultado, configuraciones, tiempos (s) y
+        error (None si todo fue bien)
+    """
+    salida_txt, salida_dot = rutas_salida(ruta_spec)
+    info = {'ruta': str(ruta_spec), 'salida_txt': str(salida_txt),
+            'salida_dot': str(salida_dot), 'resultado': None, 'simbolo': '',
+            'configuraciones': 0, 't_parse': 0.0, 't_sim': 0.0, 'error': None}
+    try:
+        t0 = time.perf_counter()
+        mt, w = cargar_spec(str(ruta_spec))
+        t1 = time.perf_counter()
+        ejecucion = mt.iter_configs(w, max_steps=max_steps, detect_loops=True)
+        # Igual que sim_mt: con varias cintas, una línea en blanco entre configuraciones
+        fin = '\n\n' if mt.cintas > 1 else '\n'
+        with open(salida_txt, 'w', encoding='utf-8') as f:
+            write = f.write
+            for c in ejecucion:
+                write(c)
+                write(fin)
+        with open(salida_dot, 'w', encoding='utf-8') as f:
+            f.write(mt.to_dot())
+        t2 = time.perf_counter()
+    except (OSError, ValueError, RuntimeError) as e:
+        info['error'] = str(e)
+        return info
+    info['resultado'], info['simbolo'] = describir_resultado(
+        ejecucion.veredicto, ejecucion.motivo, ejecucion.pasos)
+    info['configuraciones'] = ejecucion.configuraciones
+    info['t_parse'] = t1 - t0
+    info['t_sim'] = t2 - t1
+    return info
+
+def ejecutar_maquina(ruta_spec, max_steps=200):
+    """Ejecuta una máquina de Turing"""
+    print(f"\n{'='*60}")
+    print(f"Ejecutando: {ruta_spec}")
+    print(f"{'='*60}\n")
+    
+    info = simular(ruta_spec, max_steps)
+    if info['error'] is not None:
+        print(f"\n[X] Error al ejecutar: {info['error']}")
+        return False
+    
+    print(f"Configuraciones escritas en: {info['salida_txt']}")
+    print(f"Total de configuraciones: {info['configuraciones']}")
+    print(f"Resultado: {info['resultado']} {info['simbolo']}")
     
     print(f"\n{'='*60}")
-    print(f"Ejecutando: {ruta}")
+    print(f"[OK] Salida guardada en: {info['salida_txt']}")
+    print(f"[OK] Diagrama guardado en: {info['salida_dot']}")
+    print(f"{'='*60}")
+    
+    return True
+
+def ejecutar_todas(maquinas, max_steps=200, jobs=None):
+    """
+    Ejecuta todas las máquinas a la vez en un pool de procesos y muestra
+    una tabla con el resultado y los tiempos de cada una.
+    """
+    rutas = list(maquinas.values())
+    print(f"\n{'='*60}")
+    print(f"Ejecutando {len(rutas)} máquinas en paralelo...")
     print(f"{'='*60}\n")
     
-    # Comando para ejecutar
-    cmd = [
-        "python", "sim_mt.py", 
-        str(ruta),
-        "-o", str(salida_txt),
-        "--dot", str(salida_dot),
-        "--max-steps", str(max_steps)
-    ]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        resultados = list(pool.map(simular, rutas, [max_steps] * len(rutas)))
+    total = time.perf_counter() - t0
     
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
-        
-        # Mostrar salida
-        print(result.stdout)
-        if result.stderr:
-            # Filtrar errores de encoding que no son críticos
-            stderr_lines = [line for line in result.stderr.split('\n') 
-                           if 'UnicodeDecodeError' not in line and 'Thread' not in line and 'Traceback' not in line]
-            if stderr_lines:
-                print("Errores:", '\n'.join(stderr_lines))
-        
-        print(f"\n{'='*60}")
-        print(f"[OK] Salida guardada en: {salida_txt}")
-        print(f"[OK] Diagrama guardado en: {salida_dot}")
-        print(f"{'='*60}")
-        
-        return True
-    except Exception as e:
-        print(f"\n[X] Error al ejecutar: {e}")
-        return False
+    ancho = max(len(Path(r).stem) for r in rutas)
+    print(f"  {'Máquina':<{ancho}}  {'Resultado':<9}  {'Configs':>8}  "
+          f"{'Parseo':>9}  {'Simulación':>10}")
+    print(f"  {'-'*ancho}  {'-'*9}  {'-'*8}  {'-'*9}  {'-'*10}")
+    for info in resultados:
+        nombre = Path(info['ruta']).stem
+        if info['error'] is not None:
+            print(f"  {nombre:<{ancho}}  [X] Error: {info['error']}")
+            continue
+        print(f"  {nombre:<{ancho}}  {info['simbolo']:<9}  {info['configuraciones']:>8}  "
+              f"{info['t_parse'] * 1000:>7.1f}ms  {info['t_sim'] * 1000:>8.1f}ms")
+    print(f"\n  Tiempo total: {total * 1000:.1f}ms")
+    print(f"{'='*60}")
+    
+    return all(info['error'] is None for info in resultados)
 
 def main():
     """Función principal del menú"""
@@ -112,6 +172,11 @@ def main():
                 print("\n¡Hasta luego!\n")
                 break
             
+            if opcion.lower() == "t":
+                ejecutar_todas(maquinas)
+                input("\nPresione ENTER para continuar...")
+                continue
+            
             num = int(opcion)
             if 1 <= num <= len(items):
                 nombre, ruta = items[num - 1]
@@ -0,0 +1,70 @@
+"""
+Pruebas de regresión de cache_mt: las entradas viejas no se acumulan.
+
+Ejecutar con:
+    python -m pytest -q
+"""
+
+import os
+import shutil
+
+import cache_mt
+from cache_mt import cargar_spec
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+SUMA = os.path.join(AQUI, 'MT2', 'mt_suma.txt')
+
+
+def _entradas(directorio) -> list:
+    return sorted(n for n in os.listdir(directorio) if n.endswith('.pickle'))
+
+
+def test_reutiliza_la_entrada(tmp_path):
+    cache = str(tmp_path / 'cache')
+    mt, w = cargar_spec(SUMA, directorio=cache)
+    assert len(_entradas(cache)) == 1
+    mt2, w2 = cargar_spec(SUMA, directorio=cache)
+    assert (mt2.huella(), w2) == (mt.huella(), w)
+    assert len(_entradas(cache)) == 1
+
+
+def test_editar_la_spec_borra_la_entrada_vieja(tmp_path):
+    cache = str(tmp_path / 'cache')
+    spec = tmp_path / 'suma.txt'
+    shutil.copy(SUMA, spec)
+    cargar_spec(str(spec), directorio=cache)
+    vieja, = _entradas(cache)
+    with open(spec, 'a', encoding='utf-8') as f:
+        f.write("\n# editada\n")
+    cargar_spec(str(spec), directorio=cache)
+    nueva, = _entradas(cache)
+    assert nueva != vieja
+    # Otra ruta con el mismo contenido no borra la de la primera
+    otra = tmp_path / 'otra.txt'
+    shutil.copy(spec, otra)
+    cargar_spec(str(otra), directorio=cache)
+    assert nueva in _entradas(cache) and len(_entradas(cache)) == 2
+
+
+def test_poda_las_usadas_hace_mas_tiempo(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_mt, 'MAX_ENTRADAS', 3)
+    cache = str(tmp_path / 'cache')
+    specs = []
+    for k in range(4):
+        spec = tmp_path / f'suma{k}.txt'
+        shutil.copy(SUMA, spec)
+        specs.append(str(spec))
+    for spec in specs[:3]:
+        cargar_spec(spec, directorio=cache)
+        # Fechas distintas sin depender de la resolución del reloj
+        for nombre in _entradas(cache):
+            ruta = os.path.join(cache, nombre)
+            os.utime(ruta, (os.stat(ruta).st_mtime - 10,) * 2)
+    # Un acierto la vuelve la más reciente
+    cargar_spec(specs[0], directorio=cache)
+    primera = cache_mt._prefijo(specs[0])
+    cargar_spec(specs[3], directorio=cache)
+    nombres = _entradas(cache)
+    assert len(nombres) == 3
+    assert any(n.startswith(primera) for n in nombres)
+    assert not any(n.startswith(cache_mt._prefijo(specs[1])) for n in nombres)
@@ -0,0 +1,110 @@
+"""
+Pruebas de regresión de la detección de ciclos: cada motor, también el
+código generado, debe terminar con LOOP y el motivo probado (ciclo, deriva
+o condenado), y la traza con su aviso.
+
+Ejecutar con:
+    python -m pytest -q
+"""
+
+import pytest
+
+from analisis_mt import analizar, estados_condenados
+from maquina_turing import (MaquinaTuring, ACEPTA, AVISOS, LOOP, MOTIVO_CICLO,
+                            MOTIVO_CONDENADO, MOTIVO_DERIVA, MOTIVO_MAX_STEPS)
+
+B = '⊔'
+
+
+def _mt(delta, Q=('q0', 'q1', 'qacc', 'qrej'), cintas=1) -> MaquinaTuring:
+    return MaquinaTuring(set(Q), {'0', '1'}, {'0', '1', B}, B, 'q0', 'qacc', 'qrej',
+                         delta, cintas=cintas)
+
+
+# Va y vuelve entre dos celdas en blanco: se repite la configuración
+VAIVEN = _mt({('q0', B): ('q1', B, 'R'), ('q1', B): ('q0', B, 'L')})
+
+# Salta la entrada y sigue a la derecha sobre blancos buscando un 1
+DERIVA = _mt({('q0', '0'): ('q0', '0', 'R'),
+              ('q0', B): ('q1', B, 'R'),
+              ('q1', B): ('q1', B, 'R'),
+              ('q1', '1'): ('qacc', '1', 'R')})
+
+# q1 tiene δ para todo símbolo y nunca sale de q1
+CONDENADA = _mt({('q0', '0'): ('q1', '0', 'R'),
+                 ('q0', '1'): ('qacc', '1', 'R'),
+                 ('q1', '0'): ('q1', '0', 'R'),
+                 ('q1', '1'): ('q1', '1', 'R'),
+                 ('q1', B): ('q1', B, 'L')})
+
+
+def _correr(mt: MaquinaTuring, w: str, motor: str, max_steps=1000):
+    if motor == 'paso_a_paso':
+        return mt.compilar().run(w, max_steps, True, sweep=False, detect_loops=True)
+    return mt.run(w, max_steps, engine=motor)
+
+
+MOTORES = ['referencia', 'compilado', 'paso_a_paso', 'generado']
+
+CASOS = [
+    (VAIVEN, '', MOTIVO_CICLO),
+    (DERIVA, '000', MOTIVO_DERIVA),
+    (CONDENADA, '0', MOTIVO_CONDENADO),
+]
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+@pytest.mark.parametrize('mt, w, motivo', CASOS)
+def test_motivo_de_loop(mt, w, motivo, motor):
+    res = _correr(mt, w, motor)
+    assert (res.veredicto, res.motivo) == (LOOP, motivo)
+    assert res.pasos < 1000
+
+
+@pytest.mark.parametrize('mt, w, motivo', CASOS)
+def test_traza_termina_con_el_aviso(mt, w, motivo):
+    lineas = mt.simulate(w, 1000, detect_loops=True)
+    res = mt.run(w, 1000, engine='referencia')
+    assert lineas[-1] == AVISOS[motivo].format(pasos=res.pasos, max_steps=1000)
+    # La traza sin detección es la misma hasta ese paso
+    completa = mt.simulate(w, 1000)
+    assert completa[:len(lineas) - 1] == lineas[:-1]
+
+
+@pytest.mark.parametrize('mt, w, motivo', CASOS)
+def test_sin_deteccion_agota_max_steps(mt, w, motivo):
+    res = mt.run(w, 50, detect_loops=False)
+    assert (res.veredicto, res.motivo, res.pasos) == (LOOP, MOTIVO_MAX_STEPS, 50)
+
+
+def test_condenado_en_el_paso_en_que_entra():
+    res = CONDENADA.run('0', 1000)
+    assert (res.pasos, res.estado) == (1, 'q1')
+    # Sin entrar en q1 la máquina para
+    assert CONDENADA.run('1', 1000).veredicto == ACEPTA
+
+
+def test_estados_condenados():
+    assert estados_condenados(CONDENADA) == {'q1'}
+    # Una δ indefinida es una salida (rechazo implícito)
+    assert estados_condenados(DERIVA) == set()
+    informe = analizar(CONDENADA)
+    assert 'q1' in informe.condenados
+
+
+def test_sin_prueba_agota_max_steps():
+    # Alarga la cinta y vuelve al 1 del principio: nunca se repite ni deriva
+    mt = _mt({('q0', '1'): ('q0', '1', 'R'),
+              ('q0', '0'): ('q0', '0', 'R'),
+              ('q0', B): ('q1', '0', 'L'),
+              ('q1', '0'): ('q1', '0', 'L'),
+              ('q1', '1'): ('q0', '1', 'R')})
+    res = mt.run('1', 200)
+    assert (res.veredicto, res.motivo, res.pasos) == (LOOP, MOTIVO_MAX_STEPS, 200)
+
+
+def test_varias_cintas():
+    mt = _mt({('q0', (B, B)): ('q1', (B, B), ('R', 'R')),
+              ('q1', (B, B)): ('q0', (B, B), ('L', 'L'))}, cintas=2)
+    res = mt.run('', 1000)
+    assert (res.veredicto, res.motivo) == (LOOP, MOTIVO_CICLO)
@@ -0,0 +1,135 @@
+"""
+Pruebas de regresión de los límites de recursos (`Limites`): el primer
+límite agotado termina con LOOP, su MOTIVO_MAX_* y la línea AVISO_LIMITE,
+igual en la traza, en `run` y en la traza binaria.
+
+Ejecutar con:
+    python -m pytest -q
+"""
+
+import io
+
+import pytest
+
+from maquina_turing import (MaquinaTuring, ACEPTA, AVISO_LIMITE, Limites, LOOP,
+                            MOTIVO_MAX_CELDAS, MOTIVO_MAX_STEPS, MOTIVO_MAX_TIEMPO,
+                            MOTIVO_MAX_TRAZA, _control_limites)
+from resultados_mt import CacheResultados
+from traza_bin import a_texto, escribir_traza_bin
+
+B = '⊔'
+
+
+def _mt(delta, cintas=1) -> MaquinaTuring:
+    return MaquinaTuring({'q0', 'q1', 'qacc', 'qrej'}, {'0', '1'}, {'0', '1', B}, B,
+                         'q0', 'qacc', 'qrej', delta, cintas=cintas)
+
+
+# Escribe 0 hacia la derecha sin parar: la cinta crece un paso por celda
+CRECE = _mt({('q0', B): ('q0', '0', 'R'), ('q0', '0'): ('q0', '0', 'R')})
+
+# Recorre la entrada y acepta en el primer blanco
+RECORRE = _mt({('q0', '0'): ('q0', '0', 'R'), ('q0', B): ('qacc', B, 'R')})
+
+
+def _aviso(linea: str) -> dict:
+    assert linea.startswith('# [Límite] ')
+    return dict(campo.split('=') for campo in linea.split(' ')[2:])
+
+
+def _correr(mt, w, motor, max_steps, limites):
+    if motor == 'paso_a_paso':
+        return mt.compilar().run(w, max_steps, True, sweep=False, detect_loops=False,
+                                 control=_control_limites(limites, mt))
+    return mt.run(w, max_steps, engine=motor, detect_loops=False, limites=limites)
+
+
+@pytest.mark.parametrize('cada_pasos', [1, 7, 1000])
+def test_traza_max_celdas(cada_pasos):
+    lineas = CRECE.simulate('', 10_000, limites=Limites(max_celdas=20, cada_pasos=cada_pasos))
+    aviso = _aviso(lineas[-1])
+    assert aviso['motivo'] == MOTIVO_MAX_CELDAS
+    assert aviso['limite'] == '20'
+    assert int(aviso['valor']) > 20
+    # Se corta en cuanto la cinta pasa de 20 celdas, no un lote después
+    assert int(aviso['pasos']) == len(lineas) - 2
+    assert int(aviso['pasos']) <= 21
+
+
+@pytest.mark.parametrize('motor', ['referencia', 'compilado', 'paso_a_paso'])
+def test_run_max_celdas_como_la_traza(motor):
+    limites = Limites(max_celdas=20)
+    lineas = CRECE.simulate('', 10_000, limites=limites)
+    res = _correr(CRECE, '', motor, 10_000, limites)
+    assert (res.veredicto, res.motivo) == (LOOP, MOTIVO_MAX_CELDAS)
+    assert res.pasos == int(_aviso(lineas[-1])['pasos'])
+
+
+def test_run_max_celdas_varias_cintas():
+    mt = _mt({('q0', (B, B)): ('q0', ('0', '0'), ('R', 'R'))}, cintas=2)
+    res = mt.run('', 10_000, detect_loops=False, limites=Limites(max_celdas=20))
+    assert (res.veredicto, res.motivo) == (LOOP, MOTIVO_MAX_CELDAS)
+    assert res.pasos <= 11
+    lineas = mt.simulate('', 10_000, limites=Limites(max_celdas=20))
+    assert int(_aviso(lineas[-1])['pasos']) == res.pasos
+
+
+def test_parar_gana_al_limite():
+    # Para en el mismo paso en que la cinta pasa del límite
+    res = RECORRE.run('0000', 100, limites=Limites(max_celdas=5, cada_pasos=1))
+    assert (res.veredicto, res.motivo) == (ACEPTA, None)
+    lineas = RECORRE.simulate('0000', 100, limites=Limites(max_celdas=5, cada_pasos=1))
+    assert not lineas[-1].startswith('#')
+
+
+def test_traza_max_bytes():
+    limite = 500
+    lineas = CRECE.simulate('', 10_000, limites=Limites(max_bytes_traza=limite))
+    aviso = _aviso(lineas[-1])
+    assert aviso['motivo'] == MOTIVO_MAX_TRAZA
+    configs = lineas[:-1]
+    # Se corta con lo justo para pasar del límite
+    assert sum(len(c.encode('utf-8')) + 1 for c in configs[:-1]) <= limite
+    assert int(aviso['valor']) > limite
+
+
+def test_max_tiempo():
+    lineas = CRECE.simulate('', None, limites=Limites(max_segundos=0.05))
+    assert _aviso(lineas[-1])['motivo'] == MOTIVO_MAX_TIEMPO
+    res = CRECE.run('', None, detect_loops=False, limites=Limites(max_segundos=0.05))
+    assert (res.veredicto, res.motivo) == (LOOP, MOTIVO_MAX_TIEMPO)
+
+
+def test_formato_del_aviso():
+    linea = AVISO_LIMITE.format(motivo=MOTIVO_MAX_CELDAS, limite=3, valor=4, pasos=9)
+    assert _aviso(linea) == {'motivo': 'max_celdas', 'limite': '3', 'valor': '4', 'pasos': '9'}
+
+
+def test_run_rechaza_opciones_sin_sentido():
+    with pytest.raises(ValueError):
+        CRECE.run('', 100, limites=Limites(max_bytes_traza=100))
+    with pytest.raises(ValueError):
+        CRECE.run('', 100, engine='generado', limites=Limites(max_celdas=10))
+    with pytest.raises(ValueError):
+        CRECE.run('', 100, limites=Limites(max_celdas=10, cada_pasos=0))
+
+
+def test_traza_binaria(tmp_path):
+    limites = Limites(max_celdas=30, cada_pasos=4)
+    ruta = str(tmp_path / 'traza.bin')
+    ejecucion = escribir_traza_bin(CRECE, '', ruta, 10_000, limites=limites)
+    out = io.StringIO()
+    a_texto(ruta, out)
+    assert out.getvalue().splitlines() == CRECE.simulate('', 10_000, limites=limites)
+    assert _aviso(ejecucion.aviso_limite)['motivo'] == MOTIVO_MAX_CELDAS
+
+
+def test_cache_no_guarda_cortes_por_limite(tmp_path):
+    cache = CacheResultados(str(tmp_path / 'resultados.sqlite'))
+    res = cache.run(CRECE, '', 1000, detect_loops=False, limites=Limites(max_celdas=20))
+    assert res.motivo == MOTIVO_MAX_CELDAS
+    assert cache.consultar(CRECE, '', 1000, True, False) is None
+    # Sin límites la misma consulta llega a max_steps
+    res = cache.run(CRECE, '', 1000, detect_loops=False)
+    assert (res.motivo, res.pasos) == (MOTIVO_MAX_STEPS, 1000)
+    assert cache.consultar(CRECE, '', 1000, True, False) == res
@@ -0,0 +1,92 @@
+"""
+Pruebas de regresión del modo lote (lote_mt y `sim_mt.py --enumerate`).
+
+Ejecutar con:
+    python -m pytest -q
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from lote_mt import ejecutar_lote, enumerar_palabras
+from maquina_turing import ACEPTA, Limites, MaquinaTuring, RECHAZA
+from parser_mt import parse_texto
+
+# Acepta las palabras con algún 1 (adivinando dónde está)
+ND = """\
+Q = {q0, q1, qacc, qrej}
+Sigma = {0,1}
+Gamma = {0,1,⊔}
+blank = ⊔
+q0 = q0
+qaccept = qacc
+qreject = qrej
+no_determinista = si
+
+delta:
+(q0, 0) -> (q0, 0, R)
+(q0, 1) -> (q0, 1, R)
+(q0, 1) -> (qacc, 1, R)
+"""
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+
+def _esperado(w: str) -> str:
+    return ACEPTA if '1' in w else RECHAZA
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_lote_no_determinista(jobs):
+    mt, _ = parse_texto(ND)
+    palabras = list(enumerar_palabras(mt.Sigma, 4))
+    filas = list(ejecutar_lote(mt, palabras, max_steps=50, jobs=jobs, ordenado=True,
+                               tam_bloque=5))
+    assert [w for _, w, *_ in filas] == palabras
+    assert [veredicto for _, _, veredicto, _, _ in filas] == [_esperado(w) for w in palabras]
+
+
+def test_lote_no_determinista_rechaza_limites():
+    mt, _ = parse_texto(ND)
+    with pytest.raises(ValueError):
+        list(ejecutar_lote(mt, ['01'], max_steps=50, jobs=1, limites=Limites(max_celdas=5)))
+
+
+def test_cli_enumerate_no_determinista(tmp_path):
+    spec = tmp_path / 'nd.txt'
+    spec.write_text(ND + "input = 01\n", encoding='utf-8')
+    entorno = dict(os.environ, MT_CACHE_DIR=str(tmp_path / 'cache'))
+    proc = subprocess.run([sys.executable, os.path.join(AQUI, 'sim_mt.py'), str(spec),
+                           '--enumerate', '2', '--ordered', '--max-steps', '50', '--jobs', '2'],
+                          capture_output=True, text=True, encoding='utf-8', env=entorno)
+    assert proc.returncode == 0, proc.stderr
+    filas = [linea.split('\t') for linea in proc.stdout.splitlines()[1:8]]
+    palabras = list(enumerar_palabras({'0', '1'}, 2))
+    assert [w for w, _, _ in filas] == ['ε'] + palabras[1:]
+    assert [veredicto for _, veredicto, _ in filas] == [_esperado(w) for w in palabras]
+
+
+def test_orden_con_memoria_acotada():
+    # La primera palabra tarda; las demás paran en un paso
+    B = '⊔'
+    mt = MaquinaTuring({'q0', 'q1', 'qacc', 'qrej'}, {'0'}, {'0', B}, B, 'q0', 'qacc', 'qrej',
+                       {('q0', B): ('q1', B, 'R'), ('q1', B): ('q0', B, 'L'),
+                        ('q0', '0'): ('qacc', '0', 'R')})
+    leidas = []
+
+    def palabras():
+        for k in range(300):
+            leidas.append(k)
+            yield '' if k == 0 else '0'
+
+    jobs = 2
+    filas = ejecutar_lote(mt, palabras(), max_steps=5_000_000, detect_loops=False,
+                          jobs=jobs, ordenado=True, tam_bloque=1)
+    primera = next(filas)
+    assert primera[:4] == (0, '', 'LOOP', 5_000_000)
+    # Mientras la primera corría no se leyó la entrada más allá del tope
+    assert len(leidas) <= 2 * jobs + 1
+    assert [f[0] for f in filas] == list(range(1, 300))
@@ -0,0 +1,122 @@
+"""
+Pruebas de regresión de parser_mt: una δ(q, a) repetida es un error.
+
+Ejecutar con:
+    python -m pytest -q
+"""
+
+import pytest
+
+from parser_mt import ErrorEspecificacion, parse_texto
+
+ENCABEZADO = """\
+Q = {q0, q1, qacc, qrej}
+Sigma = {0,1}
+Gamma = {0,1,⊔}
+blank = ⊔
+q0 = q0
+qaccept = qacc
+qreject = qrej
+"""
+
+
+def _errores(texto: str, allow_S: bool = False):
+    with pytest.raises(ErrorEspecificacion) as exc:
+        parse_texto(texto, allow_S=allow_S)
+    return exc.value.errores
+
+
+def _bloque(n: int) -> str:
+    """n transiciones distintas y bien formadas (entran por el camino rápido)."""
+    estados = [f"s{i}" for i in range(n)]
+    lineas = ["Q = {" + ", ".join(estados + ['qacc', 'qrej']) + "}",
+              "Sigma = {0,1}", "Gamma = {0,1,⊔}", "blank = ⊔",
+              "q0 = s0", "qaccept = qacc", "qreject = qrej", "", "delta:"]
+    lineas += [f"({q}, 0) -> (qacc, 1, R)" for q in estados]
+    return "\n".join(lineas) + "\n"
+
+
+def test_repetida_en_lineas_separadas():
+    texto = ENCABEZADO + """
+delta:
+(q0, 0) -> (q1, 0, R)
+(q0, 1) -> (qacc, 1, R)
+(q0, 0) -> (qrej, 0, R)
+"""
+    errores = _errores(texto)
+    assert len(errores) == 1
+    num, msg = errores[0]
+    assert num == 12
+    assert "Determinismo violado" in msg and "δ(q0,0)" in msg
+
+
+def test_repetida_identica():
+    texto = ENCABEZADO + """
+delta:
+(q0, 0) -> (q1, 0, R)
+(q0, 0) -> (q1, 0, R)
+"""
+    assert [num for num, _ in _errores(texto)] == [11]
+
+
+def test_repetida_en_bloque_grande():
+    texto = _bloque(2000) + "(s1500, 0) -> (qrej, 0, L)\n"
+    errores = _errores(texto)
+    assert len(errores) == 1
+    assert "δ(s1500,0)" in errores[0][1]
+
+
+def test_repetida_de_un_bloque_anterior():
+    # Un bloque nuevo no puede pisar δ de uno anterior
+    texto = _bloque(100) + "\n(s1, 1) -> (qacc, 1, R)\n(s50, 0) -> (qrej, 0, L)\n"
+    errores = _errores(texto)
+    assert len(errores) == 1
+    num, msg = errores[0]
+    assert num == 112
+    assert "δ(s50,0)" in msg
+
+
+def test_repetida_dentro_del_mismo_bloque():
+    texto = _bloque(50).replace("(s20, 0) -> (qacc, 1, R)", "(s10, 0) -> (qrej, 1, R)")
+    errores = _errores(texto)
+    assert len(errores) == 1
+    assert "δ(s10,0)" in errores[0][1]
+
+
+def test_repetida_antes_de_declarar_q():
+    texto = """\
+delta:
+(q0, 0) -> (q1, 0, R)
+(q0, 0) -> (qacc, 0, R)
+""" + ENCABEZADO
+    errores = _errores(texto)
+    assert [num for num, _ in errores] == [3]
+
+
+def test_repetida_con_varias_cintas():
+    texto = ENCABEZADO + """tapes = 2
+
+delta:
+(q0, 0, ⊔) -> (q1, 0, 0, R, R)
+(q0, 0, ⊔) -> (qacc, 0, 1, R, S)
+"""
+    errores = _errores(texto, allow_S=True)
+    assert len(errores) == 1
+    assert "δ(q0,0,⊔)" in errores[0][1]
+
+
+def test_no_determinista_admite_repetidas():
+    texto = ENCABEZADO + """no_determinista = si
+
+delta:
+(q0, 0) -> (q1, 0, R)
+(q0, 0) -> (qacc, 0, R)
+(q0, 0) -> (q1, 0, R)
+"""
+    mt, _ = parse_texto(texto)
+    assert mt.delta[('q0', '0')] == (('q1', '0', 'R'), ('qacc', '0', 'R'))
+
+
+def test_sin_repetidas_se_acepta():
+    mt, _ = parse_texto(_bloque(2000))
+    assert len(mt.delta) == 2000
@@ -0,0 +1,160 @@
+"""
+Pruebas de regresión de servidor_mt (pedidos atendidos sin socket).
+
+Ejecutar con:
+    python -m pytest -q
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from maquina_turing import MaquinaTuring, MOTIVO_MAX_STEPS
+from servidor_mt import ErrorPedido, ServidorMT
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+# Con "00" avanza a la derecha sin parar
+INFINITA = os.path.join(AQUI, 'MT1', 'mt_infinito.txt')
+
+
+def _largo(max_steps: int = 100_000) -> dict:
+    """Pedido que no termina en línea y va al pool."""
+    return {'op': 'run', 'spec': INFINITA, 'input': '00', 'max_steps': max_steps,
+            'detect_loops': False}
+
+
+def test_pool_se_reemplaza_si_muere_un_proceso():
+    async def escenario():
+        servidor = ServidorMT(jobs=1, usar_cache=False, pasos_en_linea=10, raiz=AQUI)
+        try:
+            res = await servidor.atender(_largo(), None)
+            assert (res['motivo'], res['pasos']) == (MOTIVO_MAX_STEPS, 100_000)
+            for proceso in list(servidor._pool._processes.values()):
+                proceso.kill()
+                proceso.join()
+            # El pedido siguiente se atiende en un pool nuevo
+            for _ in range(2):
+                res = await servidor.atender(_largo(), None)
+                assert (res['motivo'], res['pasos']) == (MOTIVO_MAX_STEPS, 100_000)
+        finally:
+            servidor.cerrar()
+
+    asyncio.run(escenario())
+
+
+def _cargar(servidor: ServidorMT, ruta: str):
+    return asyncio.run(servidor.atender({'op': 'load', 'spec': ruta}, None))
+
+
+@pytest.mark.parametrize('ruta', ['/etc/passwd', '../fuera.txt', 'enlace.txt'])
+def test_no_lee_fuera_de_la_raiz(tmp_path, ruta):
+    raiz = tmp_path / 'specs'
+    raiz.mkdir()
+    (tmp_path / 'fuera.txt').write_text("secreto\n", encoding='utf-8')
+    os.symlink(tmp_path / 'fuera.txt', raiz / 'enlace.txt')
+    servidor = ServidorMT(jobs=1, usar_cache=False, raiz=str(raiz))
+    with pytest.raises(ErrorPedido, match="fuera de la raíz"):
+        _cargar(servidor, ruta)
+
+
+def test_error_de_spec_sin_contenido(tmp_path):
+    with open(INFINITA, encoding='utf-8') as f:
+        texto = f.read()
+    (tmp_path / 'mala.txt').write_text("clave secreta\n" + texto + "otra línea secreta\n",
+                                       encoding='utf-8')
+    servidor = ServidorMT(jobs=1, usar_cache=False, raiz=str(tmp_path))
+    with pytest.raises(ErrorPedido) as exc:
+        _cargar(servidor, 'mala.txt')
+    mensaje = str(exc.value)
+    assert 'secret' not in mensaje
+    assert mensaje.startswith("Especificación inválida: 2 error(es) en las líneas 1, ")
+
+
+def test_carga_dentro_de_la_raiz():
+    servidor = ServidorMT(jobs=1, usar_cache=False, raiz=os.path.join(AQUI, 'MT1'))
+    res = _cargar(servidor, 'mt_infinito.txt')
+    assert res['estados'] == 5
+    assert _cargar(servidor, INFINITA)['machine'] == res['machine']
+
+
+class _Recolector:
+    """Conexión falsa que cuenta los trozos de traza recibidos."""
+
+    def __init__(self):
+        self.configs = 0
+
+    async def enviar(self, obj: dict):
+        self.configs += len(obj.get('configs', ()))
+
+
+# Va y vuelve entre dos celdas sin parar: la traza no crece por configuración
+VAIVEN = """\
+Q = {q0, q1, qacc, qrej}
+Sigma = {1}
+Gamma = {1,⊔}
+blank = ⊔
+q0 = q0
+qaccept = qacc
+qreject = qrej
+
+delta:
+(q0, ⊔) -> (q1, ⊔, R)
+(q1, ⊔) -> (q0, ⊔, L)
+(q0, 1) -> (qacc, 1, R)
+"""
+
+
+def test_traza_larga_no_frena_otros_pedidos(tmp_path):
+    (tmp_path / 'vaiven.txt').write_text(VAIVEN, encoding='utf-8')
+
+    async def escenario():
+        servidor = ServidorMT(jobs=1, usar_cache=False, raiz=str(tmp_path))
+        conexion = _Recolector()
+        largo = {'op': 'run', 'spec': 'vaiven.txt', 'input': '', 'max_steps': 300_000,
+                 'detect_loops': False, 'trace': True}
+        traza = asyncio.create_task(servidor.atender(largo, conexion))
+        while conexion.configs == 0:
+            await asyncio.sleep(0.001)
+        corto = {'op': 'run', 'spec': 'vaiven.txt', 'input': '1', 'max_steps': 100}
+        res = await servidor.atender(corto, None)
+        assert res['veredicto'] == 'ACEPTA'
+        assert not traza.done()
+        res = await traza
+        assert (res['motivo'], res['pasos']) == (MOTIVO_MAX_STEPS, 300_000)
+        # Las configuraciones y el aviso final
+        assert conexion.configs == 300_002
+        servidor.cerrar()
+
+    asyncio.run(escenario())
+
+
+def test_cada_ejecucion_corre_una_vez(monkeypatch):
+    llamadas = []
+    run = MaquinaTuring.run
+
+    def contar(self, w, max_steps=None, *args, **kwargs):
+        llamadas.append(max_steps)
+        return run(self, w, max_steps, *args, **kwargs)
+
+    async def escenario():
+        servidor = ServidorMT(jobs=1, usar_cache=False, pasos_en_linea=1000, raiz=AQUI)
+        try:
+            # Sin estimación, el presupuesto grande va directo al pool
+            res = await servidor.atender(_largo(), None)
+            assert res['pasos'] == 100_000
+            assert llamadas == []
+            # Ya se sabe que con "1" termina enseguida: no va al pool
+            servidor.cerrar()
+            corto = {'op': 'run', 'spec': INFINITA, 'input': '1', 'max_steps': 100}
+            await servidor.atender(corto, None)
+            res = await servidor.atender(dict(corto, max_steps=100_000), None)
+            assert res['veredicto'] == 'ACEPTA'
+            assert llamadas == [100, 100_000]
+            assert servidor._pool is None
+        finally:
+            servidor.cerrar()
+
+    monkeypatch.setattr(MaquinaTuring, 'run', contar)
+    asyncio.run(escenario())
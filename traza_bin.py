@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Traza binaria compacta con acceso a cualquier paso.
+
+En lugar de repetir la ventana de cinta en cada línea, el archivo guarda por
+cada configuración solo el cambio que la produjo (nuevo estado, símbolo
+escrito y movimiento, 4 bytes) y, cada cierto número de pasos, una
+configuración completa ("clave"). Un índice final con el desplazamiento de
+cada clave permite reconstruir la configuración k reproduciendo a lo sumo un
+intervalo de pasos desde la clave anterior.
+
+Formato (enteros little-endian):
+
+    'MTB1' | u32 n | cabecera JSON (n bytes: estados, símbolos, tope, intervalo)
+    clave 0 | registros | clave | registros | ... | registros
+    índice: n_claves x (u64 configuración, u64 desplazamiento)
+    JSON final (pasos, configuraciones, estado, motivo, aviso)
+    pie: u64 desplazamiento del índice | u64 n_claves | 'MTBX'
+
+    clave: u64 configuración | u32 estado | i64 cabeza | i64 primera celda
+           no-blanco | u32 longitud | longitud bytes de símbolos
+    registro: u32 (q' << 10) | (b << 2) | mov  (ver motor_mt.iter_pasos)
+
+Uso como conversor a la traza de texto:
+
+    python traza_bin.py traza.bin -o salida.txt [--conf uqv] [--step K]
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from codecs import charmap_decode
+from typing import Iterator, List, Optional
+
+from maquina_turing import MaquinaTuring, EjecucionMT, Limites, AVISOS
+from motor_mt import MOV_L, MOV_R, MOV_SOLO_ESTADO, _SHIFT_ESTADO, _SHIFT_SIMBOLO
+
+MAGIA = b'MTB1'
+MAGIA_PIE = b'MTBX'
+_CLAVE = struct.Struct('<QIqqI')
+_ENTRADA_INDICE = struct.Struct('<QQ')
+_PIE = struct.Struct('<QQ4s')
+_U32 = struct.Struct('<I')
+
+# Pasos entre configuraciones completas
+INTERVALO_CLAVES = 4096
+
+# Registros acumulados antes de escribirlos al archivo
+_TAM_BUFFER = 65536
+
+
+def escribir_traza_bin(mt: MaquinaTuring,
+                       w: str,
+                       path: str,
+                       max_steps: Optional[int] = None,
+                       implicit_reject_on_undef: bool = True,
+                       detect_loops: bool = False,
+                       intervalo: int = INTERVALO_CLAVES,
+                       limites: Optional[Limites] = None) -> EjecucionMT:
+    """
+    Simula la MT sobre w y escribe la traza en formato binario.
+
+    Args:
+        mt: Máquina de una cinta (|Γ| <= 256, se usa el motor compilado)
+        w: Cadena de entrada
+        path: Archivo de salida
+        max_steps: Límite de pasos (None = sin límite)
+        implicit_reject_on_undef: Si True, rechaza cuando no hay transición
+        detect_loops: Cortar al probarse un ciclo infinito (ver `iter_configs`)
+        intervalo: Pasos entre configuraciones completas
+        limites: Presupuestos de celdas, tiempo y memoria (ver
+            `motor_mt.iter_pasos`); si se agota uno, el aviso final es su
+            línea AVISO_LIMITE
+
+    Returns:
+        La EjecucionMT ya agotada (veredicto, pasos, configuraciones...)
+    """
+    for ch in w:
+        if ch not in mt.Sigma:
+            raise ValueError(f"Símbolo de entrada '{ch}' no pertenece a Sigma.")
+    if mt.cintas > 1:
+        raise ValueError("La traza binaria solo admite máquinas de una cinta.")
+    comp = mt.compilar()
+    if len(comp.estados) >= 1 << (32 - _SHIFT_ESTADO):
+        raise ValueError("Demasiados estados para la traza binaria.")
+    ids = comp.id_simbolo
+    lb = mt.left_boundary
+
+    with open(path, 'wb') as f:
+        cabecera = json.dumps({
+            'estados': comp.estados,
+            'simbolos': comp.simbolos,
+            'left_boundary': lb,
+            'intervalo': intervalo,
+        }, ensure_ascii=False).encode('utf-8')
+        f.write(MAGIA + _U32.pack(len(cabecera)) + cabecera)
+
+        registros = array('I')
+        indice: List[tuple] = []
+
+        def volcar():
+            if sys.byteorder == 'big':
+                registros.byteswap()
+            f.write(registros.tobytes())
+            del registros[:]
+
+        def clave(config: int, q: int, cabeza: int, inicio: Optional[int], datos: bytes):
+            volcar()
+            indice.append((config, f.tell()))
+            f.write(_CLAVE.pack(config, q, cabeza, inicio or 0, len(datos)))
+            f.write(datos)
+
+        def al_punto(punto):
+            clave(punto.configuraciones - 1, comp.id_estado[punto.estado], punto.cabeza,
+                  punto.inicio_cinta, bytes(ids[s] for s in punto.cinta))
+
+        clave(0, comp.q0, lb, 0, bytes(ids[ch] for ch in w))
+        ejecucion = comp.iter_pasos(w, max_steps, implicit_reject_on_undef, detect_loops,
+                                    cada_pasos=intervalo, al_punto=al_punto, limites=limites)
+        agregar = registros.append
+        for e in ejecucion:
+            agregar(e)
+            if len(registros) >= _TAM_BUFFER:
+                volcar()
+        volcar()
+
+        pos_indice = f.tell()
+        for entrada in indice:
+            f.write(_ENTRADA_INDICE.pack(*entrada))
+        aviso = ejecucion.aviso_limite
+        if aviso is None and ejecucion.motivo is not None:
+            aviso = AVISOS[ejecucion.motivo].format(max_steps=max_steps, pasos=ejecucion.pasos)
+        f.write(json.dumps({
+            'pasos': ejecucion.pasos,
+            'configuraciones': ejecucion.configuraciones,
+            'estado': ejecucion.estado,
+            'motivo': ejecucion.motivo,
+            'aviso': aviso,
+        }, ensure_ascii=False).encode('utf-8'))
+        f.write(_PIE.pack(pos_indice, len(indice), MAGIA_PIE))
+    return ejecucion
+
+
+class _Reproduccion:
+    """Cinta, estado y cabeza reconstruidos a partir de una clave."""
+
+    __slots__ = ('tape', 'base', 'lbp', 'p', 'q', 'lo', 'hi')
+
+    def __init__(self, lb: int, q: int, cabeza: int, inicio: int, datos: bytes):
+        self.base = base = min(0, lb)
+        self.lbp = lb - base
+        self.q = q
+        self.p = cabeza - base
+        fin = max(self.p, self.lbp, inicio - base + len(datos) - 1 if datos else 0)
+        size = 64
+        while size <= fin:
+            size *= 2
+        self.tape = bytearray(size)
+        if datos:
+            self.lo = inicio - base
+            self.hi = self.lo + len(datos) - 1
+            self.tape[self.lo:self.hi + 1] = datos
+        else:
+            self.lo, self.hi = 1, 0
+
+    def aplicar(self, registros) -> None:
+        """Aplica una secuencia de registros (igual que el bucle del motor)."""
+        tape, lbp = self.tape, self.lbp
+        p, q, lo, hi = self.p, self.q, self.lo, self.hi
+        size = len(tape)
+        for e in registros:
+            q = e >> _SHIFT_ESTADO
+            mov = e & 3
+            if mov == MOV_SOLO_ESTADO:
+                continue
+            b = (e >> _SHIFT_SIMBOLO) & 0xFF
+            if b != tape[p]:
+                tape[p] = b
+                if b:
+                    if lo > hi:
+                        lo = hi = p
+                    elif p < lo:
+                        lo = p
+                    elif p > hi:
+                        hi = p
+                elif p == lo:
+                    while lo <= hi and not tape[lo]:
+                        lo += 1
+                elif p == hi:
+                    while hi >= lo and not tape[hi]:
+                        hi -= 1
+            if mov == MOV_R:
+                p += 1
+                if p == size:
+                    tape.extend(bytes(size))
+                    size += size
+            elif mov == MOV_L:
+                if p > lbp:
+                    p -= 1
+        self.p, self.q, self.lo, self.hi = p, q, lo, hi
+
+
+class TrazaBinaria:
+    """
+    Lector de una traza binaria; el archivo se proyecta en memoria (mmap).
+
+    Uso:
+        with TrazaBinaria('traza.bin') as t:
+            t.config(123456)          # configuración tras el paso k, en O(intervalo)
+            for c in t.configs():     # todas, en orden
+                ...
+
+    Atributos:
+        pasos, configuraciones, estado, motivo, aviso: Resultado de la ejecución
+    """
+
+    def __init__(self, path: str):
+        self._f = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise ValueError(f"'{path}' no es una traza binaria (archivo vacío).")
+        mm = self._mm
+        if mm[:4] != MAGIA or len(mm) < 8 + _PIE.size:
+            self.close()
+            raise ValueError(f"'{path}' no es una traza binaria.")
+        pos_indice, n_claves, magia = _PIE.unpack_from(mm, len(mm) - _PIE.size)
+        if magia != MAGIA_PIE:
+            self.close()
+            raise ValueError(f"La traza binaria '{path}' está incompleta (sin índice).")
+
+        (n,) = _U32.unpack_from(mm, 4)
+        cabecera = json.loads(mm[8:8 + n].decode('utf-8'))
+        self.estados: List[str] = cabecera['estados']
+        self.simbolos: List[str] = cabecera['simbolos']
+        self.left_boundary: int = cabecera['left_boundary']
+
+        self._claves = [_ENTRADA_INDICE.unpack_from(mm, pos_indice + i * _ENTRADA_INDICE.size)
+                        for i in range(n_claves)]
+        self._configs_clave = [c for c, _ in self._claves]
+        self._fin_registros = pos_indice
+
+        final = json.loads(mm[pos_indice + n_claves * _ENTRADA_INDICE.size:
+                              len(mm) - _PIE.size].decode('utf-8'))
+        self.pasos: int = final['pasos']
+        self.configuraciones: int = final['configuraciones']
+        self.estado: str = final['estado']
+        self.motivo: Optional[str] = final['motivo']
+        self.aviso: Optional[str] = final['aviso']
+
+        if all(len(s) == 1 for s in self.simbolos):
+            self._tabla_dec = ''.join(self.simbolos).ljust(256, '\ufffe')
+        else:
+            self._tabla_dec = None
+        self._mapa_dec = dict(enumerate(self.simbolos))
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.configuraciones
+
+    def _decodificar(self, data) -> str:
+        if self._tabla_dec is not None:
+            return charmap_decode(data, 'strict', self._tabla_dec)[0]
+        return bytes(data).decode('latin-1').translate(self._mapa_dec)
+
+    def _leer_clave(self, i: int):
+        """Devuelve (_Reproduccion en la clave i, desplazamiento de sus registros)."""
+        _, pos = self._claves[i]
+        _, q, cabeza, inicio, n = _CLAVE.unpack_from(self._mm, pos)
+        inicio_datos = pos + _CLAVE.size
+        datos = self._mm[inicio_datos:inicio_datos + n]
+        return _Reproduccion(self.left_boundary, q, cabeza, inicio, datos), inicio_datos + n
+
+    def _registros(self, desde: int, cantidad: int) -> array:
+        regs = array('I')
+        regs.frombytes(self._mm[desde:desde + 4 * cantidad])
+        if sys.byteorder == 'big':
+            regs.byteswap()
+        return regs
+
+    def _formatear(self, r: _Reproduccion, sep: str) -> str:
+        tape, p = r.tape, r.p
+        L = r.lbp if r.lbp < p else p
+        R = p
+        if r.lo <= r.hi:
+            if r.lo < L:
+                L = r.lo
+            if r.hi > R:
+                R = r.hi
+        return (self._decodificar(tape[L:p]) + sep + self.estados[r.q] + sep
+                + self._decodificar(tape[p:R + 1]))
+
+    @staticmethod
+    def _separador(config_variant: str) -> str:
+        if config_variant == 'u q v':
+            return ' '
+        if config_variant == 'uqv':
+            return ''
+        raise ValueError("config_variant debe ser 'uqv' o 'u q v'")
+
+    def config(self, k: int, config_variant: str = 'u q v') -> str:
+        """
+        Configuración número k (0 = inicial), formateada como en la traza de texto.
+
+        Se reproduce desde la clave anterior: a lo sumo `intervalo` registros.
+        """
+        if not 0 <= k < self.configuraciones:
+            raise IndexError(f"Configuración {k} fuera de rango (0..{self.configuraciones - 1}).")
+        sep = self._separador(config_variant)
+        i = bisect_right(self._configs_clave, k) - 1
+        r, pos = self._leer_clave(i)
+        r.aplicar(self._registros(pos, k - self._configs_clave[i]))
+        return self._formatear(r, sep)
+
+    def configs(self, config_variant: str = 'u q v') -> Iterator[str]:
+        """Todas las configuraciones en orden (sin la línea de aviso)."""
+        sep = self._separador(config_variant)
+        r, pos = self._leer_clave(0)
+        yield self._formatear(r, sep)
+        ultima = len(self._claves) - 1
+        for i in range(len(self._claves)):
+            if i < ultima:
+                cantidad = self._configs_clave[i + 1] - self._configs_clave[i]
+            else:
+                cantidad = (self._fin_registros - pos) // 4
+            for e in self._registros(pos, cantidad):
+                r.aplicar((e,))
+                yield self._formatear(r, sep)
+            if i < ultima:
+                # Saltar la clave siguiente: la reproducción ya está en ese punto
+                _, pos = self._claves[i + 1]
+                pos += _CLAVE.size + _CLAVE.unpack_from(self._mm, pos)[4]
+
+
+def a_texto(path_bin: str, out, config_variant: str = 'u q v') -> int:
+    """
+    Convierte una traza binaria al formato de texto de `simulate`.
+
+    Args:
+        path_bin: Traza binaria
+        out: Flujo de texto de salida
+        config_variant: Formato de configuración ('u q v' o 'uqv')
+
+    Returns:
+        Número de configuraciones escritas
+    """
+    with TrazaBinaria(path_bin) as traza:
+        write = out.write
+        for c in traza.configs(config_variant):
+            write(c)
+            write('\n')
+        if traza.aviso is not None:
+            write(traza.aviso)
+            write('\n')
+        return traza.configuraciones
+
+
+def main():
+    """Conversor de traza binaria a texto."""
+    parser = argparse.ArgumentParser(
+        description='Convierte una traza binaria (--trace-format bin) a texto.')
+    parser.add_argument('traza', help='Archivo de traza binaria.')
+    parser.add_argument('-o', '--out', help='Archivo de texto de salida (default: pantalla).')
+    parser.add_argument('--conf', choices=['uqv', 'u q v'], default='u q v',
+                        help='Formato de configuración (default: "u q v").')
+    parser.add_argument('--step', metavar='K', type=int,
+                        help='Mostrar solo la configuración número K (0 = inicial).')
+    args = parser.parse_args()
+
+    try:
+        if args.step is not None:
+            with TrazaBinaria(args.traza) as traza:
+                print(traza.config(args.step, args.conf))
+            return 0
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as f:
+                n = a_texto(args.traza, f, args.conf)
+            print(f"Configuraciones escritas en: {args.out} ({n})")
+        else:
+            a_texto(args.traza, sys.stdout, args.conf)
+        return 0
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())